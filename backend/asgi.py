@@ -5,6 +5,11 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
+
+Представления чтения (списки и карточки справочников, графики и смены, отчеты и выгрузки)
+асинхронные, поэтому под ASGI-сервером (например, uvicorn backend.asgi:application)
+один рабочий процесс обслуживает много одновременных медленных клиентов.
+Сравнение с WSGI: python manage.py benchmark_asgi.
 """
 
 import os
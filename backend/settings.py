@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -57,6 +58,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'backend.urls'
@@ -83,13 +85,86 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# Основная база принимает запись и чтение запросов, изменяющих данные. Чтение запросов GET/HEAD/OPTIONS
+# направляется на реплику (core.routers.PrimaryReplicaRouter), если задан DATABASE_REPLICA_PATH.
+# Локальная реплика SQLite - отдельный файл, который обновляет команда sync_replica.
+#
+# SQLite настроен для нескольких рабочих процессов: WAL (чтение не блокирует запись),
+# ожидание блокировки SQLITE_BUSY_TIMEOUT секунд вместо немедленной ошибки "database is locked",
+# транзакции BEGIN IMMEDIATE (блокировка записи берется в начале транзакции, а не при первой записи,
+# что исключает взаимные блокировки при повышении уровня блокировки) и постоянные соединения.
+
+DATABASE_PATH = os.environ.get('DATABASE_PATH', BASE_DIR / 'db.sqlite3')
+DATABASE_REPLICA_PATH = os.environ.get('DATABASE_REPLICA_PATH')
+DATABASE_CONN_MAX_AGE = int(os.environ.get('DATABASE_CONN_MAX_AGE', 600))
+SQLITE_BUSY_TIMEOUT = float(os.environ.get('SQLITE_BUSY_TIMEOUT', 20))
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'NAME': DATABASE_PATH,
+        'CONN_MAX_AGE': DATABASE_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': SQLITE_BUSY_TIMEOUT,
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL; PRAGMA cache_size=-20000;',
+        },
+    },
+    # Реплика только для чтения; без DATABASE_REPLICA_PATH указывает на основную базу и не используется
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': DATABASE_REPLICA_PATH or DATABASE_PATH,
+        'CONN_MAX_AGE': DATABASE_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': SQLITE_BUSY_TIMEOUT,
+            'init_command': 'PRAGMA query_only=1; PRAGMA cache_size=-20000;',
+        },
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+DATABASE_REPLICA_ALIAS = 'replica' if DATABASE_REPLICA_PATH else None
+
+
+# Cache
+# Кэш справочников (core.cache). По умолчанию - память процесса; при нескольких процессах
+# следует использовать общий бэкенд, например REFERENCE_BOOK_CACHE_BACKEND=file
+# и REFERENCE_BOOK_CACHE_LOCATION=/var/tmp/delivery_system_cache.
+
+REFERENCE_BOOK_CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'reference_books': {
+        'BACKEND': REFERENCE_BOOK_CACHE_BACKENDS[os.environ.get('REFERENCE_BOOK_CACHE_BACKEND', 'locmem')],
+        'LOCATION': os.environ.get('REFERENCE_BOOK_CACHE_LOCATION', 'reference-books'),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
 }
 
+REFERENCE_BOOK_CACHE_ALIAS = 'reference_books'
+REFERENCE_BOOK_CACHE_TIMEOUT = int(os.environ.get('REFERENCE_BOOK_CACHE_TIMEOUT', 300))
+# Серверный кэш ответов списков API справочников для каждого пользователя (0 - выключен)
+REFERENCE_API_RESPONSE_CACHE_TIMEOUT = int(os.environ.get('REFERENCE_API_RESPONSE_CACHE_TIMEOUT', 0))
+
+# Фоновая очередь заданий (core.jobs, обработчик - команда run_jobs). Файлы результатов хранятся в MEDIA_ROOT/jobs/.
+# Обработчик отмечает выполняемые задания каждые JOB_HEARTBEAT_INTERVAL секунд; задание без отметки
+# дольше JOB_STALE_TIMEOUT секунд (обработчик остановлен) при запуске обработчика возвращается в очередь
+# (не больше JOB_MAX_ATTEMPTS запусков).
+MEDIA_ROOT = Path(os.environ.get('MEDIA_ROOT', BASE_DIR / 'media'))
+MEDIA_URL = 'media/'
+JOB_HEARTBEAT_INTERVAL = int(os.environ.get('JOB_HEARTBEAT_INTERVAL', 30))
+JOB_STALE_TIMEOUT = int(os.environ.get('JOB_STALE_TIMEOUT', 600))
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 3))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -142,5 +217,55 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_PAGINATION_CLASS': 'reference_books.pagination.ReferenceBookCursorPagination',
+    'PAGE_SIZE': int(os.environ.get('API_PAGE_SIZE', 100)),
 }
 
+# Профилирование SQL-запросов (core.middleware.SQLProfilingMiddleware)
+# Включается переменной окружения SQL_PROFILING=1; сводку строит команда sql_profile_report.
+
+SQL_PROFILING = os.environ.get('SQL_PROFILING') == '1'
+SQL_PROFILING_SLOW_MS = float(os.environ.get('SQL_PROFILING_SLOW_MS', 100))
+SQL_PROFILING_TOP_QUERIES = 5
+SQL_PROFILING_LOG_DIR = Path(os.environ.get('SQL_PROFILING_LOG_DIR', BASE_DIR / 'logs'))
+
+if SQL_PROFILING:
+    SQL_PROFILING_LOG_DIR.mkdir(parents=True, exist_ok=True)
+    MIDDLEWARE.insert(0, 'core.middleware.SQLProfilingMiddleware')
+    LOGGING = {
+        'version': 1,
+        'disable_existing_loggers': False,
+        'formatters': {
+            'sql_profiling': {'format': '%(message)s'},
+        },
+        'handlers': {
+            'sql_profiling_requests': {
+                'class': 'logging.handlers.RotatingFileHandler',
+                'filename': SQL_PROFILING_LOG_DIR / 'sql_requests.log',
+                'maxBytes': 10 * 1024 * 1024,
+                'backupCount': 5,
+                'encoding': 'utf-8',
+                'formatter': 'sql_profiling',
+            },
+            'sql_profiling_slow': {
+                'class': 'logging.handlers.RotatingFileHandler',
+                'filename': SQL_PROFILING_LOG_DIR / 'sql_slow.log',
+                'maxBytes': 10 * 1024 * 1024,
+                'backupCount': 5,
+                'encoding': 'utf-8',
+                'formatter': 'sql_profiling',
+            },
+        },
+        'loggers': {
+            'core.sql_profiling.requests': {
+                'handlers': ['sql_profiling_requests'],
+                'level': 'INFO',
+                'propagate': False,
+            },
+            'core.sql_profiling.slow': {
+                'handlers': ['sql_profiling_slow'],
+                'level': 'WARNING',
+                'propagate': False,
+            },
+        },
+    }
@@ -7,4 +7,7 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('reference_books.urls_web', namespace='reference_books_web')),  # Веб-маршруты
     path('api/', include('reference_books.urls_api', namespace='reference_books_api')),  # API маршруты
+    path('api/', include('core.urls_api', namespace='core_api')),  # API фоновой очереди заданий
+    path('documents/', include('documents.urls')),  # Маршруты документов
+    path('reports/', include('reports.urls')),  # Маршруты отчетов
 ]
@@ -1,3 +1,49 @@
+# core/admin.py
+
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+from .models import BackgroundJob
+
+
+class LimitedCountPaginator(Paginator):
+    """
+    Пагинатор списка изменения для больших таблиц: количество записей считается не больше чем до count_limit.
+
+    Точный COUNT(*) по миллионам строк просматривает всю таблицу при каждом открытии списка;
+    подсчет с ограничением (SELECT COUNT(*) FROM (... LIMIT count_limit + 1)) стоит не больше
+    выборки count_limit ключей. Если записей больше, список показывает count_limit + 1 записей
+    и соответствующее количество страниц; к остальным записям переходят фильтрами и навигацией по датам.
+
+    Атрибуты:
+        count_limit (int): Наибольшее подсчитываемое количество записей.
+    """
+    count_limit = 10000
+
+    @cached_property
+    def count(self):
+        return self.object_list[:self.count_limit + 1].count()
+
+
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    """
+    Админ-класс для модели BackgroundJob (просмотр заданий фоновой очереди).
 
-# Register your models here.
+    Атрибуты:
+        list_display (tuple): Поля для отображения в списке заданий.
+        list_filter (tuple): Поля для фильтрации заданий.
+        list_select_related (tuple): Связи, загружаемые вместе со списком.
+        readonly_fields (tuple): Поля, которые нельзя изменить.
+        ordering (tuple): Поля для сортировки заданий.
+        show_full_result_count (bool): Выполнять ли подсчет всех записей при фильтрации.
+        paginator (Paginator): Пагинатор с ограниченным подсчетом записей.
+    """
+    list_display = ('id', 'kind', 'status', 'progress', 'created_by', 'created_at', 'finished_at')
+    list_filter = ('status', 'kind')
+    list_select_related = ('created_by',)
+    readonly_fields = ('status', 'progress', 'message', 'result', 'result_file', 'error', 'error_traceback',
+                       'attempts', 'worker', 'created_by', 'created_at', 'started_at', 'heartbeat_at', 'finished_at')
+    ordering = ('-id',)
+    show_full_result_count = False
+    paginator = LimitedCountPaginator
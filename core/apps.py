@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from .signals import connect_reference_book_signals  # Подключение обработчиков сигналов
+        connect_reference_book_signals()
+        autodiscover_modules('jobs')  # Регистрация задач фоновой очереди из модулей jobs.py приложений
@@ -0,0 +1,46 @@
+# core/benchmark.py
+
+import math
+from django.conf import settings
+
+
+def percentile(values, fraction):
+    """
+    Возвращает перцентиль отсортированного списка значений (метод ближайшего ранга).
+    """
+    if not values:
+        return 0
+    index = max(0, min(len(values) - 1, math.ceil(fraction * len(values)) - 1))
+    return values[index]
+
+
+def summarize_durations(durations):
+    """
+    Возвращает сводку по длительностям замеров в миллисекундах.
+
+    Аргументы:
+        durations (list): Длительности в секундах.
+
+    Возвращает:
+        dict: count, min_ms, mean_ms, p50_ms, p95_ms, p99_ms, max_ms.
+    """
+    values = sorted(durations)
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'min_ms': round(values[0] * 1000, 3),
+        'mean_ms': round(sum(values) / len(values) * 1000, 3),
+        'p50_ms': round(percentile(values, 0.5) * 1000, 3),
+        'p95_ms': round(percentile(values, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(values, 0.99) * 1000, 3),
+        'max_ms': round(values[-1] * 1000, 3),
+    }
+
+
+def get_host():
+    """
+    Возвращает имя хоста для заголовка Host, разрешенное настройкой ALLOWED_HOSTS.
+    """
+    hosts = [host for host in settings.ALLOWED_HOSTS if host != '*' and not host.startswith('.')]
+    return hosts[0] if hosts else 'localhost'
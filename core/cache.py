@@ -0,0 +1,138 @@
+# core/cache.py
+
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from .routers import use_primary
+
+_MISSING = object()
+
+
+def get_cache():
+    """
+    Возвращает кэш справочников (псевдоним REFERENCE_BOOK_CACHE_ALIAS, по умолчанию 'default').
+    """
+    return caches[getattr(settings, 'REFERENCE_BOOK_CACHE_ALIAS', 'default')]
+
+
+def get_version_key(model):
+    """
+    Возвращает ключ версии данных модели.
+    """
+    return f'refbook:version:{model._meta.label_lower}'
+
+
+def get_versions(models):
+    """
+    Возвращает текущие версии данных моделей одним обращением к кэшу.
+
+    Отсутствующая версия (первое обращение или вытеснение из кэша) инициализируется
+    текущим временем в наносекундах, а не единицей, чтобы не совпасть с версией,
+    под которой в кэше могли остаться устаревшие записи.
+
+    Аргументы:
+        models (iterable): Классы моделей.
+
+    Возвращает:
+        tuple: Версии в порядке моделей.
+    """
+    cache = get_cache()
+    keys = [get_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return tuple(versions[key] for key in keys)
+
+
+def is_changed_in_transaction(models):
+    """
+    Проверяет, изменялись ли данные моделей в текущей (еще не зафиксированной) транзакции.
+
+    Измененные модели запоминаются в соединении (bump_version) и забываются при фиксации
+    транзакции (transaction.on_commit) или, после отката, при первом обращении вне транзакции.
+    """
+    connection = transaction.get_connection()
+    changed = getattr(connection, 'reference_book_changes', None)
+    if not changed:
+        return False
+    if not connection.in_atomic_block:
+        connection.reference_book_changes = None
+        return False
+    return any(model._meta.label_lower in changed for model in models)
+
+
+def bump_version(*models):
+    """
+    Увеличивает версии данных моделей, делая недоступными все закэшированные по ним записи.
+
+    Версия увеличивается сразу и еще раз после фиксации транзакции: иначе другой процесс
+    мог бы между изменением и фиксацией прочитать старые данные и закэшировать их под новой версией.
+    Внутри транзакции модели запоминаются как измененные: до ее фиксации cached_query
+    читает их данные мимо кэша, чтобы незафиксированные (и, возможно, откатываемые) данные
+    не попали в кэш.
+
+    Аргументы:
+        models (iterable): Классы моделей.
+    """
+    connection = transaction.get_connection()
+    if connection.in_atomic_block:
+        changed = getattr(connection, 'reference_book_changes', None)
+        if changed is None:
+            changed = connection.reference_book_changes = set()
+        changed.update(model._meta.label_lower for model in models)
+
+    def bump():
+        cache = get_cache()
+        for model in models:
+            key = get_version_key(model)
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, time.time_ns(), timeout=None)
+
+    def committed():
+        connection.reference_book_changes = None
+        bump()
+
+    bump()
+    transaction.on_commit(committed)
+
+
+def cached_query(name, models, loader, timeout=None):
+    """
+    Read-through кэш: возвращает значение из кэша или вычисляет его функцией loader.
+
+    Ключ значения включает версии всех моделей, от которых оно зависит, поэтому изменение
+    любой из них (bump_version) делает значение недоступным без явного удаления ключей.
+    Кэш работает с бэкендами locmem и file-based: используются только get/get_many/add/set/incr.
+    Кэш locmem локален для процесса, поэтому при нескольких процессах версии согласованы
+    только с общим бэкендом (например, file-based). При промахе значение читается
+    из основной базы, даже если чтение запроса направлено на реплику.
+
+    Аргументы:
+        name (str): Имя значения (уникальное в пределах набора моделей), например 'employee:15'.
+        models (iterable): Модели, от данных которых зависит значение.
+        loader (callable): Функция без аргументов, вычисляющая значение.
+        timeout (int): Время жизни значения в секундах (по умолчанию REFERENCE_BOOK_CACHE_TIMEOUT).
+
+    Возвращает:
+        object: Значение из кэша или результат loader().
+    """
+    if is_changed_in_transaction(models):
+        return loader()
+    cache = get_cache()
+    versions = '.'.join(str(version) for version in get_versions(models))
+    key = f'refbook:{name}:{versions}'
+    value = cache.get(key, _MISSING)
+    if value is _MISSING:
+        # Значение читается из основной базы: отстающая реплика сохранила бы в кэше
+        # старые данные под уже новой версией
+        with use_primary():
+            value = loader()
+        if timeout is None:
+            timeout = getattr(settings, 'REFERENCE_BOOK_CACHE_TIMEOUT', 300)
+        cache.set(key, value, timeout)
+    return value
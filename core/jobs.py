@@ -0,0 +1,264 @@
+# core/jobs.py
+
+import inspect
+import logging
+import tempfile
+import traceback
+from datetime import timedelta
+from django.conf import settings
+from django.core.files import File
+from django.db import connections
+from django.db.models import F
+from django.utils import timezone
+from .models import MAX_ID, BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+# Зарегистрированные задачи: {имя: функция(job, **params)} и проверки их параметров: {имя: функция(params)}
+JOBS = {}
+JOB_VALIDATORS = {}
+# Сколько заданий-кандидатов просматривается при выборе следующего задания
+CLAIM_CANDIDATES = 10
+JOB_SPOOL_SIZE = 1024 * 1024
+
+
+class JobError(Exception):
+    """
+    Ошибка выполнения задачи, сообщение которой сохраняется в задании без трассировки
+    (например, неверные параметры или не найденный объект).
+    """
+
+
+def register_job(name, validate=None):
+    """
+    Декоратор, регистрирующий функцию как задачу фоновой очереди.
+
+    Функция вызывается как func(job, **job.params) и может обновлять прогресс (job.set_progress),
+    сохранять файл результата (save_result_file) и возвращать результат, сериализуемый в JSON.
+    Задачи объявляются в модулях jobs.py приложений, которые загружаются при запуске (CoreConfig.ready).
+
+    Аргументы:
+        name (str): Имя задачи, например 'reports.export'.
+        validate (callable): Проверка параметров при постановке в очередь (необязательно): получает
+            словарь параметров и возвращает проверенные параметры или вызывает JobError.
+    """
+    def decorator(func):
+        JOBS[name] = func
+        if validate is not None:
+            JOB_VALIDATORS[name] = validate
+        return func
+    return decorator
+
+
+def parse_id(params, name, required=True):
+    """
+    Возвращает параметр задачи name как ID объекта (для проверок параметров задач).
+
+    Аргументы:
+        params (dict): Параметры задачи.
+        name (str): Имя параметра.
+        required (bool): Обязателен ли параметр.
+
+    Возвращает:
+        int: ID или None, если необязательный параметр не задан.
+
+    Исключения:
+        JobError: Если параметр не задан или не является положительным целым числом в пределах MAX_ID.
+    """
+    value = params.get(name)
+    if value is None or value == '':
+        if required:
+            raise JobError(f'Укажите параметр {name}')
+        return None
+    try:
+        if isinstance(value, (bool, float)):
+            raise ValueError
+        value = int(value)
+    except (TypeError, ValueError):
+        raise JobError(f'Параметр {name} должен быть целым числом')
+    if not 0 < value <= MAX_ID:
+        raise JobError(f'Параметр {name} вне допустимого диапазона')
+    return value
+
+
+def validate_params(kind, params):
+    """
+    Проверяет параметры задания до постановки в очередь, чтобы ошибка возвращалась
+    пользователю сразу, а не при выполнении задания обработчиком.
+
+    Параметры сверяются с сигнатурой функции задачи (лишние и недостающие аргументы),
+    затем проверяются функцией validate задачи (см. register_job).
+
+    Возвращает:
+        dict: Проверенные параметры.
+
+    Исключения:
+        JobError: Если задача не зарегистрирована или параметры неверны.
+    """
+    if kind not in JOBS:
+        raise JobError(f'Неизвестная задача {kind!r}. Доступные: {", ".join(sorted(JOBS))}')
+    if not isinstance(params, dict):
+        raise JobError('Параметры задачи должны быть объектом')
+    try:
+        inspect.signature(JOBS[kind]).bind(None, **params)
+    except TypeError as error:
+        raise JobError(f'Неверные параметры задачи {kind}: {error}')
+    validate = JOB_VALIDATORS.get(kind)
+    return validate(params) if validate is not None else params
+
+
+def enqueue(kind, params=None, user=None):
+    """
+    Ставит задание в очередь.
+
+    Аргументы:
+        kind (str): Имя зарегистрированной задачи.
+        params (dict): Именованные аргументы задачи (сериализуемые в JSON).
+        user (User): Пользователь, поставивший задание.
+
+    Возвращает:
+        BackgroundJob: Созданное задание.
+
+    Исключения:
+        JobError: Если задача не зарегистрирована или параметры неверны (см. validate_params).
+    """
+    params = validate_params(kind, {} if params is None else params)
+    return BackgroundJob.objects.create(
+        kind=kind, params=params, created_by=user if user is not None and user.is_authenticated else None
+    )
+
+
+def claim_next_job(worker):
+    """
+    Выбирает следующее задание из очереди (в порядке постановки) и отмечает его как выполняемое.
+
+    Задание захватывается условным UPDATE ... WHERE status = 'queued': если его уже забрал
+    другой обработчик, UPDATE не изменит строк и будет взят следующий кандидат. Так очередь работает
+    без SELECT FOR UPDATE SKIP LOCKED, которого нет в SQLite.
+
+    Аргументы:
+        worker (str): Имя обработчика.
+
+    Возвращает:
+        BackgroundJob: Захваченное задание или None, если очередь пуста.
+    """
+    candidates = BackgroundJob.objects.filter(status='queued').order_by('id').values_list('id', flat=True)
+    for job_id in candidates[:CLAIM_CANDIDATES]:
+        now = timezone.now()
+        claimed = BackgroundJob.objects.filter(pk=job_id, status='queued').update(
+            status='running', worker=worker, started_at=now, heartbeat_at=now, attempts=F('attempts') + 1
+        )
+        if claimed:
+            return BackgroundJob.objects.get(pk=job_id)
+    return None
+
+
+def send_heartbeat(worker, job_ids):
+    """
+    Обновляет отметку выполнения заданий, которые выполняет обработчик worker.
+
+    Обработчик (run_jobs) вызывает функцию каждые JOB_HEARTBEAT_INTERVAL секунд для всех
+    выполняемых заданий, поэтому задача без обновлений прогресса не считается прерванной.
+
+    Возвращает:
+        int: Количество отмеченных заданий.
+    """
+    return BackgroundJob.objects.filter(pk__in=job_ids, worker=worker, status='running').update(
+        heartbeat_at=timezone.now()
+    )
+
+
+def requeue_stale_jobs(timeout=None):
+    """
+    Возвращает в очередь задания, выполнение которых прервалось (обработчик остановлен):
+    выполняемые задания без отметки выполнения (см. send_heartbeat) дольше timeout секунд.
+    Задания, исчерпавшие JOB_MAX_ATTEMPTS запусков, завершаются с ошибкой.
+
+    Возвращает:
+        tuple: (количество возвращенных в очередь, количество завершенных с ошибкой).
+    """
+    timeout = settings.JOB_STALE_TIMEOUT if timeout is None else timeout
+    stale = BackgroundJob.objects.filter(status='running', heartbeat_at__lt=timezone.now() - timedelta(seconds=timeout))
+    failed = stale.filter(attempts__gte=settings.JOB_MAX_ATTEMPTS).update(
+        status='failed', error='Выполнение прервано, попытки исчерпаны', finished_at=timezone.now()
+    )
+    requeued = stale.update(status='queued', worker='', progress=0, message='')
+    return requeued, failed
+
+
+def save_result_file(job, filename, chunks):
+    """
+    Сохраняет файл результата задания в хранилище (MEDIA_ROOT/jobs/<ID задания>/).
+
+    Аргументы:
+        job (BackgroundJob): Задание.
+        filename (str): Имя файла.
+        chunks (iterable): Фрагменты содержимого (str или bytes), записываются по мере получения.
+    """
+    # Содержимое собирается во временном файле (в памяти до JOB_SPOOL_SIZE байт, затем на диске)
+    with tempfile.SpooledTemporaryFile(max_size=JOB_SPOOL_SIZE) as buffer:
+        for chunk in chunks:
+            buffer.write(chunk.encode() if isinstance(chunk, str) else chunk)
+        buffer.seek(0)
+        job.result_file.save(filename, File(buffer), save=False)
+    BackgroundJob.objects.filter(pk=job.pk).update(result_file=job.result_file.name)
+
+
+def run_job(job_id):
+    """
+    Выполняет захваченное задание и сохраняет результат или ошибку.
+
+    Функция вызывается в потоке или процессе пула обработчика (run_jobs) и закрывает
+    соединения с базой этого потока по завершении.
+
+    Аргументы:
+        job_id (int): ID задания в состоянии 'running'.
+
+    Возвращает:
+        str: Итоговое состояние задания или 'superseded', если результат не сохранен:
+            задание тем временем было возвращено в очередь и выполняется другим обработчиком.
+    """
+    try:
+        job = BackgroundJob.objects.get(pk=job_id)
+        try:
+            func = JOBS.get(job.kind)
+            if func is None:
+                raise JobError(f'Неизвестная задача {job.kind!r}')
+            result = func(job, **job.params)
+        except JobError as error:
+            saved = finish_job(job, 'failed', error=str(error))
+        except Exception as error:
+            # Пользователю (API) доступно только сообщение ошибки, трассировка - в журнале и в админке
+            logger.exception('Задание %s завершилось с ошибкой', job)
+            saved = finish_job(
+                job, 'failed', error=str(error) or type(error).__name__, error_traceback=traceback.format_exc()
+            )
+        else:
+            saved = finish_job(job, 'succeeded', result=result)
+        if not saved:
+            logger.warning('Результат задания %s не сохранен: задание выполняется другим обработчиком', job)
+            return 'superseded'
+        return job.status
+    finally:
+        connections.close_all()
+
+
+def finish_job(job, status, result=None, error='', error_traceback=''):
+    """
+    Сохраняет итоговое состояние задания, если его по-прежнему выполняет обработчик job.worker
+    (задание не было возвращено в очередь и захвачено другим обработчиком).
+
+    Возвращает:
+        bool: Сохранено ли состояние.
+    """
+    job.status = status
+    job.result = result
+    job.error = error
+    job.error_traceback = error_traceback
+    job.finished_at = timezone.now()
+    if status == 'succeeded':
+        job.progress = 100
+    return bool(BackgroundJob.objects.filter(pk=job.pk, worker=job.worker, status='running').update(
+        status=job.status, result=job.result, error=job.error, error_traceback=job.error_traceback,
+        finished_at=job.finished_at, progress=job.progress
+    ))
@@ -0,0 +1,208 @@
+# core/loadgen.py
+
+import random
+import time
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, Request, build_opener
+from django.db import connections
+from django.test import Client
+from .benchmark import get_host, summarize_durations
+
+# Сообщения SQLite о блокировке: базы (истек busy timeout) и таблицы (общий кэш, in-memory база)
+LOCK_MESSAGES = ('database is locked', 'database table is locked')
+
+
+class ClientTransport:
+    """
+    Выполняет запросы через тестовый клиент Django в текущем процессе (без сетевого сервера).
+
+    Атрибуты:
+        client (Client): Тестовый клиент с заголовками по умолчанию.
+    """
+
+    def __init__(self, headers):
+        self.client = Client(HTTP_HOST=get_host(), **{
+            'HTTP_' + name.upper().replace('-', '_'): value for name, value in headers.items()
+        })
+
+    def request(self, method, path, data):
+        """
+        Выполняет запрос и возвращает (статус, текст ошибки или None).
+        Исключения представления (например, OperationalError) пробрасываются.
+        """
+        if method == 'POST':
+            response = self.client.post(path, data or {})
+        else:
+            response = self.client.get(path, data or {})
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        return response.status_code, None
+
+    def close(self):
+        connections.close_all()
+
+
+class HttpTransport:
+    """
+    Выполняет запросы к запущенному серверу по HTTP (urllib, cookies сохраняются между запросами).
+
+    Для POST-запросов к представлениям Django нужен CSRF-токен: перед первым таким запросом
+    загружается страница csrf_path, которая устанавливает cookie csrftoken.
+
+    Атрибуты:
+        base_url (str): Адрес сервера, например http://127.0.0.1:8000.
+        headers (dict): Заголовки, добавляемые к каждому запросу.
+        csrf_path (str): Страница с формой, устанавливающая cookie csrftoken.
+    """
+
+    def __init__(self, base_url, headers, csrf_path=None, timeout=60):
+        self.base_url = base_url.rstrip('/')
+        self.headers = dict(headers)
+        self.csrf_path = csrf_path
+        self.timeout = timeout
+        self.cookies = CookieJar()
+        self.opener = build_opener(HTTPCookieProcessor(self.cookies))
+
+    def get_csrf_token(self):
+        """
+        Возвращает CSRF-токен из cookie, при необходимости загрузив страницу csrf_path.
+        """
+        for _ in range(2):
+            for cookie in self.cookies:
+                if cookie.name == 'csrftoken':
+                    return cookie.value
+            if not self.csrf_path:
+                return None
+            self.opener.open(Request(self.base_url + self.csrf_path, headers=self.headers), timeout=self.timeout).read()
+        return None
+
+    def request(self, method, path, data):
+        """
+        Выполняет запрос и возвращает (статус, текст ошибки или None).
+        Для ответов 5xx с сообщением о блокировке SQLite (при DEBUG) возвращается ошибка блокировки.
+        """
+        headers = dict(self.headers)
+        url = self.base_url + path
+        body = None
+        if method == 'POST':
+            body = urlencode(data or {}, doseq=True).encode()
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+            token = self.get_csrf_token()
+            if token:
+                headers['X-CSRFToken'] = token
+        elif data:
+            url += '?' + urlencode(data, doseq=True)
+        try:
+            with self.opener.open(Request(url, data=body, headers=headers, method=method), timeout=self.timeout) as response:
+                response.read()
+                return response.status, None
+        except HTTPError as error:
+            content = error.read()
+            if error.code >= 500 and is_lock_error(content.decode(errors='replace')):
+                return error.code, LOCK_MESSAGES[0]
+            return error.code, None
+
+    def close(self):
+        pass
+
+
+def is_lock_error(text):
+    """
+    Проверяет, содержит ли текст сообщение SQLite о блокировке базы или таблицы.
+    """
+    return any(message in text for message in LOCK_MESSAGES)
+
+
+def classify_error(status, message):
+    """
+    Возвращает вид ошибки запроса или None, если запрос выполнен успешно (статус ниже 400).
+    Ошибки блокировки SQLite возвращаются как 'sqlite_locked'.
+    """
+    if message and is_lock_error(message):
+        return 'sqlite_locked'
+    if message:
+        return message
+    if status is None or status >= 400:
+        return f'HTTP {status}'
+    return None
+
+
+def run_worker(worker_id, target, plan, count, duration, seed, headers, csrf_path=None):
+    """
+    Выполняет запросы одного виртуального пользователя (поток или процесс пула).
+
+    Каждый запрос выбирается случайно: сначала вид запроса с учетом весов плана, затем
+    конкретный запрос из заранее подготовленного набора этого вида. Выполняется count запросов
+    или запросы в течение duration секунд (что наступит раньше; None - без ограничения).
+
+    Аргументы:
+        worker_id (int): Номер пользователя (для зерна генератора).
+        target (str): 'client' - тестовый клиент Django, иначе адрес сервера (http://...).
+        plan (list): Словари {'name', 'weight', 'requests': [(method, path, data), ...]}.
+        count (int): Количество запросов или None.
+        duration (float): Продолжительность в секундах или None.
+        seed (int): Зерно генератора случайных чисел.
+        headers (dict): Заголовки запросов (например, Authorization).
+        csrf_path (str): Страница, устанавливающая CSRF-cookie (только для HTTP).
+
+    Возвращает:
+        list: Кортежи (вид запроса, статус, длительность в секундах, вид ошибки или None).
+    """
+    rng = random.Random(seed * 1000 + worker_id)
+    if target == 'client':
+        transport = ClientTransport(headers)
+    else:
+        transport = HttpTransport(target, headers, csrf_path)
+    weights = [endpoint['weight'] for endpoint in plan]
+    deadline = time.perf_counter() + duration if duration else None
+    results = []
+    try:
+        while (count is None or len(results) < count) and (deadline is None or time.perf_counter() < deadline):
+            endpoint = rng.choices(plan, weights)[0]
+            method, path, data = rng.choice(endpoint['requests'])
+            started = time.perf_counter()
+            try:
+                status, message = transport.request(method, path, data)
+            except (URLError, OSError) as error:
+                status, message = None, f'{type(error).__name__}: {error}'
+            except Exception as error:
+                status, message = None, str(error) if is_lock_error(str(error)) else type(error).__name__
+            results.append((endpoint['name'], status, time.perf_counter() - started, classify_error(status, message)))
+    finally:
+        transport.close()
+    return results
+
+
+def summarize_results(results, elapsed):
+    """
+    Сводит результаты запросов по видам и в целом.
+
+    Аргументы:
+        results (list): Кортежи из run_worker.
+        elapsed (float): Общее время нагрузки в секундах.
+
+    Возвращает:
+        dict: {вид запроса или 'total': {'requests', 'throughput', 'error_rate', 'errors', сводка задержек}}.
+    """
+    groups = {}
+    for name, status, duration, error in results:
+        groups.setdefault(name, []).append((duration, error))
+    groups['total'] = [(duration, error) for name, status, duration, error in results]
+
+    summary = {}
+    for name, items in groups.items():
+        errors = {}
+        for duration, error in items:
+            if error:
+                errors[error] = errors.get(error, 0) + 1
+        summary[name] = {
+            'requests': len(items),
+            'throughput': round(len(items) / elapsed, 2) if elapsed else 0,
+            'error_rate': round(sum(errors.values()) / len(items), 4) if items else 0,
+            'errors': errors,
+            **summarize_durations([duration for duration, error in items]),
+        }
+    return summary
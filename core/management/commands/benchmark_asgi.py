@@ -0,0 +1,198 @@
+# core/management/commands/benchmark_asgi.py
+
+import asyncio
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from asgiref.sync import async_to_sync
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from core.benchmark import get_host, percentile
+
+# Асинхронные представления чтения, которые нагружаются по умолчанию
+DEFAULT_URLS = (
+    '/agents/',
+    '/employees/',
+    '/pickup-points/',
+    '/accounting-periods/',
+    '/documents/schedules/',
+)
+
+
+class Command(BaseCommand):
+    """
+    Команда для сравнения пропускной способности синхронного (WSGI) и асинхронного (ASGI) обслуживания
+    запросов на чтение при большом количестве одновременных медленных клиентов.
+
+    Запросы выполняются в процессе, без сетевого сервера: WSGI-приложение вызывается из пула
+    из --threads рабочих потоков (как у синхронного сервера), ASGI-приложение - в одном цикле событий.
+    Медленный клиент моделируется задержкой --client-delay при получении тела запроса и при отправке
+    ответа: в WSGI рабочий поток все это время занят, в ASGI ожидание не блокирует цикл событий.
+    Одновременно выполняется не более --concurrency запросов; задержка ответа считается от момента
+    отправки запроса клиентом и включает ожидание свободного рабочего потока.
+
+    Пример:
+        python manage.py benchmark_asgi --requests 1000 --concurrency 200 --threads 8 --client-delay 100
+    """
+    help = 'Сравнивает пропускную способность WSGI и ASGI для представлений чтения'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', action='append', dest='urls',
+                            help='Адрес для нагрузки (можно указать несколько раз), по умолчанию - списки справочников и графиков')
+        parser.add_argument('--requests', type=int, default=200, help='Общее количество запросов в каждом режиме')
+        parser.add_argument('--concurrency', type=int, default=50, help='Количество одновременных клиентов')
+        parser.add_argument('--threads', type=int, default=8, help='Количество рабочих потоков WSGI')
+        parser.add_argument('--client-delay', type=float, default=50,
+                            help='Задержка медленного клиента при приеме запроса и при отправке ответа, мс')
+        parser.add_argument('--mode', choices=('both', 'wsgi', 'asgi'), default='both', help='Режимы для замера')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['concurrency'] < 1 or options['threads'] < 1:
+            raise CommandError('Количество запросов, клиентов и потоков должно быть положительным')
+        urls = [urlsplit(url) for url in options['urls'] or DEFAULT_URLS]
+        targets = [urls[i % len(urls)] for i in range(options['requests'])]
+        delay = options['client_delay'] / 1000
+        host = get_host()
+
+        results = []
+        if options['mode'] in ('both', 'wsgi'):
+            results.append((f"WSGI ({options['threads']} потоков)",
+                            self.run_wsgi(targets, options['concurrency'], options['threads'], delay, host)))
+        if options['mode'] in ('both', 'asgi'):
+            results.append(('ASGI', async_to_sync(self.run_asgi)(targets, options['concurrency'], delay, host)))
+
+        self.stdout.write(
+            f"{'Режим':20} {'Запросов':>8} {'Ошибок':>7} {'Время, с':>9} {'Запр/с':>9} "
+            f"{'p50, мс':>9} {'p95, мс':>9}"
+        )
+        for title, (elapsed, latencies, statuses) in results:
+            latencies = sorted(latencies)
+            errors = sum(1 for status in statuses if status is None or status >= 400)
+            self.stdout.write(
+                f"{title:20} {len(statuses):8} {errors:7} {elapsed:9.2f} {len(statuses) / elapsed:9.1f} "
+                f"{percentile(latencies, 0.5) * 1000:9.1f} {percentile(latencies, 0.95) * 1000:9.1f}"
+            )
+
+    def run_wsgi(self, targets, concurrency, threads, delay, host):
+        """
+        Выполняет запросы через WSGI-приложение из пула рабочих потоков.
+
+        Возвращает:
+            tuple: (общее время в секундах, задержки запросов в секундах, статусы ответов).
+        """
+        application = WSGIHandler()
+        slots = threading.BoundedSemaphore(concurrency)
+        latencies, statuses = [], []
+        lock = threading.Lock()
+
+        def serve(target, sent_at):
+            status = None
+            try:
+                environ = {
+                    'REQUEST_METHOD': 'GET',
+                    'SCRIPT_NAME': '',
+                    'PATH_INFO': target.path,
+                    'QUERY_STRING': target.query,
+                    'SERVER_NAME': host,
+                    'SERVER_PORT': '80',
+                    'SERVER_PROTOCOL': 'HTTP/1.1',
+                    'HTTP_HOST': host,
+                    'REMOTE_ADDR': '127.0.0.1',
+                    'wsgi.version': (1, 0),
+                    'wsgi.url_scheme': 'http',
+                    'wsgi.input': io.BytesIO(),
+                    'wsgi.errors': io.StringIO(),
+                    'wsgi.multithread': True,
+                    'wsgi.multiprocess': False,
+                    'wsgi.run_once': False,
+                }
+
+                def start_response(status_line, headers, exc_info=None):
+                    nonlocal status
+                    status = int(status_line.split()[0])
+
+                time.sleep(delay)  # клиент медленно передает запрос
+                response = application(environ, start_response)
+                try:
+                    for _ in response:
+                        pass
+                    time.sleep(delay)  # клиент медленно принимает ответ
+                finally:
+                    response.close()
+            finally:
+                with lock:
+                    latencies.append(time.perf_counter() - sent_at)
+                    statuses.append(status)
+                slots.release()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            for target in targets:
+                slots.acquire()
+                pool.submit(serve, target, time.perf_counter())
+        return time.perf_counter() - started, latencies, statuses
+
+    async def run_asgi(self, targets, concurrency, delay, host):
+        """
+        Выполняет запросы через ASGI-приложение в одном цикле событий.
+
+        Возвращает:
+            tuple: (общее время в секундах, задержки запросов в секундах, статусы ответов).
+        """
+        application = ASGIHandler()
+        slots = asyncio.Semaphore(concurrency)
+        latencies, statuses = [], []
+
+        async def serve(target, sent_at):
+            status = None
+            finished = asyncio.Event()
+            request_sent = False
+
+            async def receive():
+                nonlocal request_sent
+                if not request_sent:
+                    request_sent = True
+                    await asyncio.sleep(delay)  # клиент медленно передает запрос
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                await finished.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                nonlocal status
+                if message['type'] == 'http.response.start':
+                    status = message['status']
+                elif message['type'] == 'http.response.body' and not message.get('more_body', False):
+                    await asyncio.sleep(delay)  # клиент медленно принимает ответ
+
+            scope = {
+                'type': 'http',
+                'asgi': {'version': '3.0'},
+                'http_version': '1.1',
+                'method': 'GET',
+                'scheme': 'http',
+                'path': target.path,
+                'raw_path': target.path.encode(),
+                'query_string': target.query.encode(),
+                'root_path': '',
+                'headers': [(b'host', host.encode())],
+                'client': ('127.0.0.1', 0),
+                'server': (host, 80),
+            }
+            try:
+                await application(scope, receive, send)
+            finally:
+                finished.set()
+                latencies.append(time.perf_counter() - sent_at)
+                statuses.append(status)
+                slots.release()
+
+        started = time.perf_counter()
+        tasks = []
+        for target in targets:
+            await slots.acquire()
+            tasks.append(asyncio.create_task(serve(target, time.perf_counter())))
+        await asyncio.gather(*tasks)
+        return time.perf_counter() - started, latencies, statuses
@@ -0,0 +1,97 @@
+# core/management/commands/run_jobs.py
+
+import os
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connections
+from core.jobs import claim_next_job, requeue_stale_jobs, run_job, send_heartbeat
+
+
+class Command(BaseCommand):
+    """
+    Команда-обработчик фоновой очереди заданий (core.jobs): выбирает задания из таблицы
+    BackgroundJob и выполняет их в пуле из --workers потоков или процессов.
+
+    Очередь хранится в основной базе данных и не требует Redis или других внешних сервисов.
+    Одновременно можно запускать несколько обработчиков: задание захватывается условным UPDATE
+    и выполняется одним из них. Каждые JOB_HEARTBEAT_INTERVAL секунд обработчик отмечает
+    выполняемые задания (send_heartbeat), а при запуске возвращает в очередь задания без отметки
+    дольше JOB_STALE_TIMEOUT секунд, прерванные остановкой обработчика (см. requeue_stale_jobs). В режиме процессов задачи с большим объемом вычислений
+    не мешают друг другу (GIL), в режиме потоков задания стартуют быстрее.
+
+    Пример:
+        python manage.py run_jobs --workers 4 --mode process
+        python manage.py run_jobs --once  # выполнить задания из очереди и завершиться
+    """
+    help = 'Выполняет задания фоновой очереди (отчеты, выгрузки, массовые операции)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Количество одновременно выполняемых заданий')
+        parser.add_argument('--mode', choices=('thread', 'process'), default='thread',
+                            help='Задания выполняются в потоках или процессах')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Пауза между проверками пустой очереди, с')
+        parser.add_argument('--once', action='store_true', help='Завершиться, когда очередь опустеет')
+        parser.add_argument('--max-jobs', type=int, help='Завершиться после выполнения указанного количества заданий')
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1:
+            raise CommandError('Количество обработчиков должно быть положительным')
+        worker = f'{socket.gethostname()}:{os.getpid()}'
+        requeued, failed = requeue_stale_jobs()
+        if requeued or failed:
+            self.stdout.write(f'Прерванные задания: возвращено в очередь {requeued}, завершено с ошибкой {failed}')
+
+        if options['mode'] == 'process':
+            # Соединения с базой не должны наследоваться дочерними процессами
+            connections.close_all()
+            pool = ProcessPoolExecutor(max_workers=options['workers'], initializer=django.setup)
+            # Процессы создаются при первой отправке задачи: запускаем их сейчас, до открытия нового соединения
+            pool.submit(int).result()
+        else:
+            pool = ThreadPoolExecutor(max_workers=options['workers'])
+        self.stdout.write(f"Обработчик {worker}: {options['workers']} ({options['mode']})")
+
+        running, claimed = {}, 0
+        heartbeat_at = time.monotonic()
+        with pool:
+            try:
+                while True:
+                    while len(running) < options['workers'] and (
+                        options['max_jobs'] is None or claimed < options['max_jobs']
+                    ):
+                        job = claim_next_job(worker)
+                        if job is None:
+                            break
+                        claimed += 1
+                        running[pool.submit(run_job, job.pk)] = job
+                        self.stdout.write(f'Запущено задание {job}')
+                    if not running:
+                        if options['once'] or (options['max_jobs'] is not None and claimed >= options['max_jobs']):
+                            break
+                        time.sleep(options['poll_interval'])
+                        continue
+                    if time.monotonic() - heartbeat_at >= settings.JOB_HEARTBEAT_INTERVAL:
+                        self.send_heartbeat(worker, running.values())
+                        heartbeat_at = time.monotonic()
+                    done, _ = wait(running, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                    for future in done:
+                        job = running.pop(future)
+                        self.stdout.write(f'Задание {job.kind} #{job.pk}: {future.result()}')
+            except KeyboardInterrupt:
+                self.stdout.write('Остановка: ожидание выполняемых заданий')
+        connections.close_all()
+
+    def send_heartbeat(self, worker, jobs):
+        """
+        Отмечает выполняемые задания. Ошибка записи (например, база занята длинной транзакцией задачи)
+        не прерывает обработчик: отметка повторится через JOB_HEARTBEAT_INTERVAL секунд.
+        """
+        try:
+            send_heartbeat(worker, [job.pk for job in jobs])
+        except DatabaseError as error:
+            self.stderr.write(f'Не удалось отметить выполняемые задания: {error}')
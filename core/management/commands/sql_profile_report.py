@@ -0,0 +1,76 @@
+# core/management/commands/sql_profile_report.py
+
+import json
+from collections import defaultdict
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.benchmark import percentile
+
+
+class Command(BaseCommand):
+    """
+    Команда для построения сводки по SQL-запросам в разрезе представлений.
+
+    Читает журнал sql_requests.log (и его ротированные копии), который пишет
+    core.middleware.SQLProfilingMiddleware, и выводит по каждому представлению
+    количество запросов, среднее и максимальное количество SQL-запросов, среднее
+    и 95-й перцентиль времени работы с базой и количество дублирующихся запросов.
+
+    Пример:
+        python manage.py sql_profile_report --view documents.views --limit 20
+    """
+    help = 'Сводка профилирования SQL-запросов по представлениям'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', help='Путь к журналу запросов (по умолчанию SQL_PROFILING_LOG_DIR/sql_requests.log)')
+        parser.add_argument('--view', help='Префикс пути представления, например reports.views')
+        parser.add_argument('--limit', type=int, default=30, help='Количество выводимых представлений')
+
+    def get_log_files(self, log_path):
+        """
+        Возвращает журнал и его ротированные копии (log.1, log.2, ...), начиная с самых старых.
+        """
+        rotated = sorted(
+            log_path.parent.glob(log_path.name + '.*'),
+            key=lambda path: int(path.suffix[1:]) if path.suffix[1:].isdigit() else 0,
+            reverse=True,
+        )
+        return rotated + ([log_path] if log_path.exists() else [])
+
+    def handle(self, *args, **options):
+        log_path = Path(options['log'] or Path(settings.SQL_PROFILING_LOG_DIR) / 'sql_requests.log')
+        log_files = self.get_log_files(log_path)
+        if not log_files:
+            raise CommandError(f'Журнал {log_path} не найден. Включите профилирование: SQL_PROFILING=1')
+
+        stats = defaultdict(lambda: {'query_counts': [], 'db_times': [], 'duplicates': 0})
+        for log_file in log_files:
+            with open(log_file, encoding='utf-8') as lines:
+                for line in lines:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    view = entry.get('view') or entry.get('path')
+                    if options['view'] and not view.startswith(options['view']):
+                        continue
+                    key = (view, entry.get('url_name') or '', entry.get('method'))
+                    stats[key]['query_counts'].append(entry['query_count'])
+                    stats[key]['db_times'].append(entry['db_time_ms'])
+                    stats[key]['duplicates'] += entry['duplicate_count']
+
+        rows = sorted(stats.items(), key=lambda item: sum(item[1]['db_times']), reverse=True)
+        self.stdout.write(
+            f"{'Представление':60} {'Метод':6} {'Запросов':>8} {'SQL ср.':>8} {'SQL макс.':>9} "
+            f"{'БД ср., мс':>11} {'БД p95, мс':>11} {'Дубли':>7}"
+        )
+        for (view, url_name, method), data in rows[:options['limit']]:
+            requests = len(data['query_counts'])
+            db_times = sorted(data['db_times'])
+            name = f'{view} ({url_name})' if url_name else view
+            self.stdout.write(
+                f"{name[:60]:60} {method:6} {requests:8} {sum(data['query_counts']) / requests:8.1f} "
+                f"{max(data['query_counts']):9} {sum(db_times) / requests:11.2f} "
+                f"{percentile(db_times, 0.95):11.2f} {data['duplicates']:7}"
+            )
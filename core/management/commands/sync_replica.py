@@ -0,0 +1,59 @@
+# core/management/commands/sync_replica.py
+
+import sqlite3
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from core.routers import get_replica_alias
+
+
+class Command(BaseCommand):
+    """
+    Команда для обновления реплики SQLite копией основной базы.
+
+    SQLite не умеет репликацию, поэтому локальная реплика - отдельный файл, который
+    обновляется онлайн-копированием (sqlite3 backup API) без остановки записи в основную базу.
+    Между обновлениями реплика отстает от основной базы; запросы, которые что-то записали,
+    читают основную базу до своего завершения (см. core.routers.PrimaryReplicaRouter).
+
+    Пример:
+        DATABASE_REPLICA_PATH=replica.sqlite3 python manage.py sync_replica --interval 5
+    """
+    help = 'Копирует основную базу SQLite в файл реплики'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', help='Путь к файлу реплики (по умолчанию NAME псевдонима реплики)')
+        parser.add_argument('--interval', type=float, default=0,
+                            help='Повторять копирование каждые N секунд (по умолчанию - один раз)')
+
+    def get_target(self, options):
+        """
+        Возвращает путь к файлу реплики.
+        """
+        if options['target']:
+            return str(options['target'])
+        replica = get_replica_alias()
+        if replica is None:
+            raise CommandError('Реплика не настроена: задайте DATABASE_REPLICA_PATH или --target')
+        return str(connections[replica].settings_dict['NAME'])
+
+    def handle(self, *args, **options):
+        source = connections[DEFAULT_DB_ALIAS]
+        if source.vendor != 'sqlite':
+            raise CommandError('Команда поддерживает только SQLite; для других СУБД используйте их репликацию')
+        target_path = self.get_target(options)
+        if target_path == str(source.settings_dict['NAME']):
+            raise CommandError('Файл реплики совпадает с основной базой')
+
+        while True:
+            started = time.perf_counter()
+            source.ensure_connection()
+            target = sqlite3.connect(target_path)
+            try:
+                source.connection.backup(target, pages=1024, sleep=0.05)
+            finally:
+                target.close()
+            self.stdout.write(f'Реплика {target_path} обновлена за {time.perf_counter() - started:.2f} с')
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,209 @@
+# core/middleware.py
+
+import json
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack, nullcontext
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from .routers import get_replica_alias, read_from_replica
+
+requests_logger = logging.getLogger('core.sql_profiling.requests')
+slow_queries_logger = logging.getLogger('core.sql_profiling.slow')
+
+
+class QueryRecorder:
+    """
+    Обертка выполнения SQL (connection.execute_wrapper), запоминающая запросы и время их выполнения.
+
+    Атрибуты:
+        queries (list): Кортежи (alias, sql, params, many, duration) выполненных запросов.
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((self.alias, sql, params, many, time.perf_counter() - start))
+
+
+def explain_query(alias, sql, params):
+    """
+    Возвращает план выполнения запроса (EXPLAIN QUERY PLAN для SQLite, EXPLAIN для остальных СУБД).
+
+    Аргументы:
+        alias (str): Псевдоним базы данных.
+        sql (str): Текст запроса.
+        params (tuple): Параметры запроса.
+
+    Возвращает:
+        list: Строки плана или None, если запрос не является выборкой или план получить не удалось.
+    """
+    if not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+        return None
+    connection = connections[alias]
+    prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            return [' '.join(str(value) for value in row) for row in cursor.fetchall()]
+    except Exception as error:
+        return [f'EXPLAIN не выполнен: {error}']
+
+
+class SQLProfilingMiddleware:
+    """
+    Middleware профилирования SQL-запросов (включается настройкой SQL_PROFILING).
+
+    Для каждого запроса пишет в журнал core.sql_profiling.requests JSON-строку с количеством
+    SQL-запросов, суммарным временем работы с базой, количеством дублирующихся запросов
+    и самыми медленными запросами. Запросы дольше SQL_PROFILING_SLOW_MS миллисекунд пишутся
+    в журнал core.sql_profiling.slow вместе с планом выполнения. Сводку по представлениям
+    строит команда sql_profile_report.
+
+    Учитываются запросы, выполненные во время работы представления; запросы, которые
+    выполняются при потоковой отдаче ответа (StreamingHttpResponse), не учитываются.
+    Поддерживает синхронные и асинхронные представления: асинхронные не переводятся в поток,
+    запросы их ORM (sync_to_async) записываются так же, а журнал и EXPLAIN выполняются в потоке базы данных.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SQL_PROFILING', False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, 'SQL_PROFILING_SLOW_MS', 100)
+        self.top_count = getattr(settings, 'SQL_PROFILING_TOP_QUERIES', 5)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorders = self.get_recorders()
+        with self.record(recorders):
+            response = self.get_response(request)
+        self.log(request, response, recorders)
+        return response
+
+    async def __acall__(self, request):
+        # Соединения, которыми пользуется ORM асинхронного представления, принадлежат потоку базы
+        # данных (sync_to_async), поэтому обертки записи подключаются в этом потоке
+        recorders = await sync_to_async(self.get_recorders)()
+        stack = await sync_to_async(self.record)(recorders)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        await sync_to_async(self.log)(request, response, recorders)
+        return response
+
+    def get_recorders(self):
+        """
+        Возвращает обертки записи запросов для всех баз данных.
+        """
+        return [QueryRecorder(connection.alias) for connection in connections.all()]
+
+    def record(self, recorders):
+        """
+        Возвращает контекст, в котором запросы к базам записываются обертками recorders.
+        """
+        stack = ExitStack()
+        for recorder in recorders:
+            stack.enter_context(connections[recorder.alias].execute_wrapper(recorder))
+        return stack
+
+    def log(self, request, response, recorders):
+        """
+        Пишет сводку по запросу и медленные запросы.
+        """
+        queries = [query for recorder in recorders for query in recorder.queries]
+        self.log_request(request, response, queries)
+        self.log_slow_queries(request, queries)
+
+    def log_request(self, request, response, queries):
+        """
+        Пишет сводку по SQL-запросам одного HTTP-запроса.
+        """
+        match = request.resolver_match
+        duplicates = Counter((alias, sql, repr(params)) for alias, sql, params, many, duration in queries)
+        slowest = sorted(queries, key=lambda query: query[4], reverse=True)[:self.top_count]
+        requests_logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'view': match._func_path if match else None,
+            'url_name': match.view_name if match else None,
+            'status': response.status_code,
+            'query_count': len(queries),
+            'db_time_ms': round(sum(query[4] for query in queries) * 1000, 3),
+            'duplicate_count': sum(count - 1 for count in duplicates.values()),
+            'slowest': [
+                {'alias': alias, 'sql': sql, 'time_ms': round(duration * 1000, 3)}
+                for alias, sql, params, many, duration in slowest
+            ],
+        }, ensure_ascii=False))
+
+    def log_slow_queries(self, request, queries):
+        """
+        Пишет медленные запросы вместе с планом выполнения.
+        """
+        for alias, sql, params, many, duration in queries:
+            if duration * 1000 < self.slow_ms:
+                continue
+            plan = None if many else explain_query(alias, sql, params)
+            slow_queries_logger.warning(json.dumps({
+                'path': request.path,
+                'alias': alias,
+                'time_ms': round(duration * 1000, 3),
+                'sql': sql,
+                'params': repr(params),
+                'plan': plan,
+            }, ensure_ascii=False))
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Middleware маршрутизации чтения на реплику (core.routers.PrimaryReplicaRouter).
+
+    Запросы GET, HEAD и OPTIONS выполняются внутри read_from_replica: их чтение идет на реплику,
+    пока запрос ничего не записал. Остальные методы целиком работают с основной базой, чтобы
+    проверки перед записью (например, пересечения смен) не читали отстающую реплику.
+    Поддерживает синхронные и асинхронные представления без переключения потоков.
+    Если реплика не настроена (DATABASE_REPLICA_ALIAS), middleware отключается.
+    """
+    sync_capable = True
+    async_capable = True
+
+    READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        if get_replica_alias() is None:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def get_context(self, request):
+        """
+        Возвращает контекст маршрутизации чтения для запроса.
+        """
+        return read_from_replica() if request.method in self.READ_METHODS else nullcontext()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with self.get_context(request):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with self.get_context(request):
+            return await self.get_response(request)
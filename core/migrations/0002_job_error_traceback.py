@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-18 20:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='backgroundjob',
+            name='error_traceback',
+            field=models.TextField(blank=True),
+        ),
+    ]
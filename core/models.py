@@ -1,5 +1,60 @@
 # core/models.py
 from django.db import models
+from django.utils import timezone
+from .cache import bump_version
+from .signals import reference_books_bulk_updated
+
+# Наибольший ID (целое со знаком в 64 битах): большие значения не помещаются в поле базы
+MAX_ID = 2 ** 63 - 1
+
+
+class ReferenceBookQuerySet(models.QuerySet):
+    """
+    Набор элементов справочника.
+
+    Массовые операции, минующие сигналы save/delete (update, bulk_create, bulk_update),
+    увеличивают версию кэша справочника (см. core.cache) и отправляют сигнал
+    reference_books_bulk_updated с ID измененных элементов. ID для update выбираются
+    до изменения и только при наличии подписчиков сигнала. update и bulk_update
+    обновляют updated_at, как save (auto_now), если поле не задано явно.
+    """
+
+    def update(self, **kwargs):
+        kwargs.setdefault('updated_at', timezone.now())
+        pks = None
+        if reference_books_bulk_updated.has_listeners(self.model):
+            pks = list(self.values_list('pk', flat=True))
+        rows = super().update(**kwargs)
+        bump_version(self.model)
+        if pks:
+            reference_books_bulk_updated.send(sender=self.model, pks=pks)
+        return rows
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        bump_version(self.model)
+        self.send_bulk_updated(objs)
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        if 'updated_at' not in fields:
+            now = timezone.now()
+            for obj in objs:
+                obj.updated_at = now
+            fields = [*fields, 'updated_at']
+        rows = super().bulk_update(objs, fields, *args, **kwargs)
+        bump_version(self.model)
+        self.send_bulk_updated(objs)
+        return rows
+
+    def send_bulk_updated(self, objs):
+        """
+        Отправляет сигнал reference_books_bulk_updated для сохраненных объектов (с заполненным pk).
+        """
+        pks = [obj.pk for obj in objs if obj.pk is not None]
+        if pks:
+            reference_books_bulk_updated.send(sender=self.model, pks=pks)
+
 
 class ReferenceBook(models.Model):
     """
@@ -17,8 +72,12 @@ class ReferenceBook(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ReferenceBookQuerySet.as_manager()
+
     class Meta:
         abstract = True  # Это абстрактный класс, он не создаёт таблицу в базе данных
+        # max(updated_at) - часть валидатора ETag списков API (reference_books.conditional)
+        indexes = [models.Index(fields=['updated_at'], name='%(class)s_updated_idx')]
 
     def __str__(self):
         return self.name
@@ -51,3 +110,86 @@ class Document(models.Model):
 
     def __str__(self):
         return f"Document #{self.id} - {self.status}"
+
+
+def job_result_path(job, filename):
+    """
+    Возвращает путь файла результата задания в хранилище: jobs/<ID задания>/<имя файла>.
+    """
+    return f'jobs/{job.pk}/{filename}'
+
+
+class BackgroundJob(models.Model):
+    """
+    Задание фоновой очереди (см. core.jobs): отчеты, выгрузки и массовые операции,
+    которые выполняются командой run_jobs вне запроса.
+
+    Атрибуты:
+        kind (CharField): Имя зарегистрированной задачи (core.jobs.register_job).
+        params (JSONField): Именованные аргументы задачи.
+        status (CharField): Состояние задания.
+        progress (PositiveSmallIntegerField): Выполнено, в процентах.
+        message (CharField): Текущий этап выполнения.
+        result (JSONField): Результат задачи (необязательный).
+        result_file (FileField): Файл результата, например выгрузка (необязательный).
+        error (TextField): Описание ошибки для заданий с ошибкой.
+        error_traceback (TextField): Трассировка непредвиденной ошибки (только для администраторов, не выводится в API).
+        attempts (PositiveSmallIntegerField): Количество запусков задания.
+        worker (CharField): Обработчик, выполняющий задание.
+        created_by (ForeignKey): Пользователь, поставивший задание в очередь.
+        created_at (DateTimeField): Дата и время постановки в очередь.
+        started_at (DateTimeField): Дата и время начала выполнения.
+        heartbeat_at (DateTimeField): Последняя отметка выполнения (начало или обновление прогресса).
+        finished_at (DateTimeField): Дата и время завершения.
+    """
+    STATUS_CHOICES = [
+        ('queued', 'В очереди'),
+        ('running', 'Выполняется'),
+        ('succeeded', 'Выполнено'),
+        ('failed', 'Ошибка'),
+    ]
+
+    kind = models.CharField(max_length=100)
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    progress = models.PositiveSmallIntegerField(default=0)
+    message = models.CharField(max_length=255, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    result_file = models.FileField(upload_to=job_result_path, blank=True)
+    error = models.TextField(blank=True)
+    error_traceback = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    worker = models.CharField(max_length=100, blank=True)
+    created_by = models.ForeignKey('auth.User', on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Выбор следующего задания из очереди и поиск зависших заданий
+            models.Index(fields=['status', 'id'], name='backgroundjob_status_idx'),
+            models.Index(fields=['created_by', 'id'], name='backgroundjob_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+    def set_progress(self, progress, message=''):
+        """
+        Сохраняет прогресс выполнения и отметку выполнения одним UPDATE.
+
+        Изменение в транзакции задачи станет видно только после ее завершения, поэтому
+        прогресс следует обновлять вне длинных транзакций.
+
+        Аргументы:
+            progress (int): Выполнено, в процентах (0-100).
+            message (str): Текущий этап выполнения.
+        """
+        self.progress = max(0, min(100, int(progress)))
+        self.message = message[:255]
+        self.heartbeat_at = timezone.now()
+        type(self).objects.filter(pk=self.pk).update(
+            progress=self.progress, message=self.message, heartbeat_at=self.heartbeat_at
+        )
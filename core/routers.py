@@ -0,0 +1,95 @@
+# core/routers.py
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Режим чтения текущего запроса: None - вне запроса (читается основная база),
+# 'replica' - чтение разрешено с реплики, 'primary' - чтение закреплено за основной базой
+_read_mode = ContextVar('read_mode', default=None)
+
+
+def get_replica_alias():
+    """
+    Возвращает псевдоним реплики (настройка DATABASE_REPLICA_ALIAS) или None, если реплика не настроена.
+    """
+    alias = getattr(settings, 'DATABASE_REPLICA_ALIAS', None)
+    return alias if alias and alias in settings.DATABASES else None
+
+
+@contextmanager
+def read_from_replica():
+    """
+    Контекстный менеджер: чтение внутри блока направляется на реплику (до первой записи).
+    Используется middleware ReplicaRoutingMiddleware для запросов на чтение; пригоден
+    и для команд и фоновых задач, которым допустимо отставание реплики.
+    """
+    token = _read_mode.set('replica')
+    try:
+        yield
+    finally:
+        _read_mode.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """
+    Контекстный менеджер: чтение внутри блока выполняется из основной базы.
+    """
+    token = _read_mode.set('primary')
+    try:
+        yield
+    finally:
+        _read_mode.reset(token)
+
+
+def pin_to_primary():
+    """
+    Закрепляет чтение за основной базой до конца текущего блока read_from_replica (read-your-writes).
+    """
+    if _read_mode.get() == 'replica':
+        _read_mode.set('primary')
+
+
+class PrimaryReplicaRouter:
+    """
+    Маршрутизатор баз данных: запись - в основную базу (default), чтение - на реплику.
+
+    Чтение идет на реплику только внутри read_from_replica (запросы GET, HEAD и OPTIONS, см.
+    ReplicaRoutingMiddleware) и только если реплика настроена (DATABASE_REPLICA_ALIAS).
+    После первой записи в рамках запроса чтение закрепляется за основной базой до его конца,
+    чтобы запрос видел собственные изменения, не дожидаясь обновления реплики. В открытой
+    транзакции основной базы чтение также выполняется из нее. Вне запросов (команды, сигналы
+    вне запроса) все читается из основной базы.
+
+    Реплика - копия основной базы, поэтому связи между объектами разрешены, а миграции
+    применяются только к основной базе.
+    """
+
+    def in_transaction(self):
+        """
+        Проверяет, открыт ли в основной базе блок atomic.
+
+        Используется in_atomic_block, а не get_autocommit(): get_autocommit() открывает соединение,
+        что запрещено в асинхронном контексте, где маршрутизатор тоже вызывается (acreate, aget).
+        """
+        return connections[DEFAULT_DB_ALIAS].in_atomic_block
+
+    def db_for_read(self, model, **hints):
+        replica = get_replica_alias()
+        if replica is None or _read_mode.get() != 'replica':
+            return DEFAULT_DB_ALIAS
+        if self.in_transaction():
+            return DEFAULT_DB_ALIAS
+        return replica
+
+    def db_for_write(self, model, **hints):
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != get_replica_alias()
@@ -0,0 +1,34 @@
+# core/serializers.py
+
+from django.urls import reverse
+from rest_framework import serializers
+from .models import BackgroundJob
+
+
+class BackgroundJobSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор для модели BackgroundJob (задание фоновой очереди).
+
+    При создании задаются только kind и params, остальные поля доступны для чтения.
+
+    Атрибуты:
+        download_url (SerializerMethodField): Адрес загрузки файла результата (None, если файла нет).
+    """
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = BackgroundJob
+        fields = (
+            'id', 'kind', 'params', 'status', 'progress', 'message', 'result', 'error', 'attempts',
+            'created_at', 'started_at', 'finished_at', 'download_url',
+        )
+        read_only_fields = (
+            'status', 'progress', 'message', 'result', 'error', 'attempts', 'created_at', 'started_at', 'finished_at',
+        )
+
+    def get_download_url(self, job):
+        if not job.result_file:
+            return None
+        url = reverse('core_api:job-download', args=[job.pk])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
@@ -0,0 +1,31 @@
+# core/signals.py
+
+from django.apps import apps
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import Signal
+from .cache import bump_version
+
+# Сигнал о массовом изменении элементов справочника (update, bulk_create, bulk_update), минующем save/delete.
+# Аргументы: sender - модель справочника, pks - список ID измененных элементов.
+reference_books_bulk_updated = Signal()
+
+
+def bump_reference_book_version(sender, **kwargs):
+    """
+    Увеличивает версию кэша справочника после сохранения или удаления его элемента.
+    """
+    bump_version(sender)
+
+
+def connect_reference_book_signals():
+    """
+    Подключает обработчик к каждой модели-справочнику отдельно.
+
+    Обработчик без sender считался бы подписчиком post_delete всех моделей и отключил бы
+    быстрое удаление (одним DELETE без предварительной выборки) для всего проекта.
+    """
+    from .models import ReferenceBook  # core.models импортирует этот модуль
+    for model in apps.get_models():
+        if issubclass(model, ReferenceBook):
+            post_save.connect(bump_reference_book_version, sender=model, dispatch_uid=f'refbook_save_{model._meta.label}')
+            post_delete.connect(bump_reference_book_version, sender=model, dispatch_uid=f'refbook_delete_{model._meta.label}')
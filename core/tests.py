@@ -1,3 +1,388 @@
-from django.test import TestCase
+# core/tests.py
 
-# Create your tests here.
+import json
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+from django.conf import settings
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from reference_books.models import Agent, PickupPoint, Employee
+from .jobs import JOBS, JobError, claim_next_job, enqueue, requeue_stale_jobs, run_job, send_heartbeat
+from .middleware import ReplicaRoutingMiddleware
+from .models import BackgroundJob
+from .routers import read_from_replica
+
+# Middleware профилирования ровно один раз, даже если оно уже включено (SQL_PROFILING=1)
+PROFILING_MIDDLEWARE = ['core.middleware.SQLProfilingMiddleware'] + [
+    middleware for middleware in settings.MIDDLEWARE if middleware != 'core.middleware.SQLProfilingMiddleware'
+]
+
+
+@override_settings(SQL_PROFILING=True, SQL_PROFILING_SLOW_MS=0, MIDDLEWARE=PROFILING_MIDDLEWARE)
+class SQLProfilingMiddlewareTest(TestCase):
+    """
+    Тесты для middleware профилирования SQL-запросов.
+    """
+
+    def setUp(self):
+        """
+        Устанавливает начальные данные для тестов.
+        Создает агента, пункт выдачи и сотрудника.
+        """
+        agent = Agent.objects.create(name="Test Agent", email="agent@example.com", phone_number="1234567890")
+        pickup_point = PickupPoint.objects.create(name="Pickup Point 1", address="123 Test St", agent=agent)
+        self.employee = Employee.objects.create(
+            first_name="John", last_name="Doe", email="john.doe@example.com",
+            date_of_hire=date(2024, 1, 1), position="Operator", agent=agent, default_pickup_point=pickup_point
+        )
+
+    @contextmanager
+    def capture_profiling_logs(self):
+        """
+        Перехватывает оба журнала профилирования (сводки и медленные запросы), чтобы записи
+        проверялись тестом и не выводились в консоль, в том числе при настроенном LOGGING.
+
+        Возвращает:
+            tuple: Контексты assertLogs журналов сводок и медленных запросов.
+        """
+        with self.assertLogs('core.sql_profiling.requests', level='INFO') as requests_logs, \
+                self.assertLogs('core.sql_profiling.slow', level='WARNING') as slow_logs:
+            yield requests_logs, slow_logs
+
+    def test_request_summary_and_slow_queries(self):
+        """
+        Проверяет сводку по запросу и запись медленных запросов с планом выполнения.
+        """
+        with self.capture_profiling_logs() as (requests_logs, slow_logs):
+            self.client.get(reverse('reference_books_web:employee_detail', args=[self.employee.pk]))
+
+        summaries = [json.loads(record.getMessage()) for record in requests_logs.records]
+        self.assertEqual(len(summaries), 1)
+        summary = summaries[0]
+        self.assertEqual(summary['view'], 'reference_books.views.employee_detail')
+        self.assertEqual(summary['url_name'], 'reference_books_web:employee_detail')
+        self.assertEqual(summary['query_count'], 1)
+        self.assertEqual(summary['duplicate_count'], 0)
+        self.assertEqual(len(summary['slowest']), 1)
+
+        slow = [json.loads(record.getMessage()) for record in slow_logs.records]
+        self.assertEqual(len(slow), 1)
+        self.assertTrue(slow[0]['plan'])
+
+    async def test_async_view_is_profiled(self):
+        """
+        Проверяет, что запросы асинхронного представления записываются при работе через ASGI.
+        """
+        with self.capture_profiling_logs() as (requests_logs, slow_logs):
+            response = await self.async_client.get(reverse('reference_books_web:employees_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(requests_logs.records), 1)
+        summary = json.loads(requests_logs.records[0].getMessage())
+        self.assertEqual(summary['view'], 'reference_books.views.employees_list')
+        self.assertEqual(summary['query_count'], 1)
+        self.assertEqual(json.loads(slow_logs.records[0].getMessage())['path'], summary['path'])
+
+    @override_settings(SQL_PROFILING=False)
+    def test_disabled(self):
+        """
+        Проверяет, что при выключенной настройке middleware не пишет журнал.
+        """
+        with self.assertNoLogs('core.sql_profiling.requests', level='INFO'), \
+                self.assertNoLogs('core.sql_profiling.slow', level='INFO'):
+            self.client.get(reverse('reference_books_web:employee_detail', args=[self.employee.pk]))
+
+
+class SQLProfileReportCommandTest(TestCase):
+    """
+    Тесты для команды sql_profile_report.
+    """
+
+    def test_report_groups_by_view(self):
+        """
+        Проверяет сводку по представлениям, включая ротированные копии журнала.
+        """
+        with tempfile.TemporaryDirectory() as log_dir:
+            log_path = Path(log_dir) / 'sql_requests.log'
+
+            def entry(view, query_count, db_time_ms, duplicate_count=0):
+                return json.dumps({
+                    'method': 'GET', 'path': '/', 'view': view, 'url_name': None, 'status': 200,
+                    'query_count': query_count, 'db_time_ms': db_time_ms,
+                    'duplicate_count': duplicate_count, 'slowest': [],
+                }) + '\n'
+
+            Path(str(log_path) + '.1').write_text(entry('reports.views.generate_work_schedule_report', 3, 40.0))
+            log_path.write_text(
+                entry('reports.views.generate_work_schedule_report', 5, 60.0, 2)
+                + entry('documents.views.create_work_shift', 2, 1.0)
+            )
+            out = StringIO()
+            call_command('sql_profile_report', log=str(log_path), view='reports.views', stdout=out)
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn('reports.views.generate_work_schedule_report', lines[1])
+        self.assertEqual(lines[1].split()[-6:], ['2', '4.0', '5', '50.00', '60.00', '2'])
+
+
+class BenchmarkAsgiCommandTest(TestCase):
+    """
+    Тесты для команды benchmark_asgi.
+    """
+
+    def test_benchmark_reports_both_modes(self):
+        """
+        Проверяет, что команда выполняет запросы в режимах WSGI и ASGI без ошибок.
+        """
+        out = StringIO()
+        call_command(
+            'benchmark_asgi', requests=6, concurrency=3, threads=2, client_delay=1,
+            urls=['/agents/', '/pickup-points/'], stdout=out
+        )
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 3)
+        for line, mode in zip(lines[1:], ('WSGI', 'ASGI')):
+            self.assertTrue(line.startswith(mode))
+            self.assertEqual(line.split()[-6:-4], ['6', '0'])
+
+
+@override_settings(DATABASE_REPLICA_ALIAS='replica')
+class ReplicaRoutingTest(TransactionTestCase):
+    """
+    Тесты для маршрутизации чтения на реплику и закрепления чтения за основной базой после записи.
+    Проверяется выбор базы (QuerySet.db) без выполнения запросов к реплике.
+    TransactionTestCase: в транзакции TestCase маршрутизатор направляет все чтение в основную базу.
+    """
+
+    def test_router_pins_reads_after_write(self):
+        """
+        Проверяет, что чтение идет на реплику до первой записи, а после нее и в транзакции - в основную базу.
+        """
+        self.assertEqual(Agent.objects.all().db, 'default')
+        with read_from_replica():
+            self.assertEqual(Agent.objects.all().db, 'replica')
+            with transaction.atomic():
+                self.assertEqual(Agent.objects.all().db, 'default')
+            self.assertEqual(Agent.objects.all().db, 'replica')
+            Agent.objects.create(name="Test Agent", email="agent@example.com", phone_number="1234567890")
+            self.assertEqual(Agent.objects.all().db, 'default')
+        with read_from_replica():
+            self.assertEqual(Agent.objects.all().db, 'replica')
+
+    def test_middleware_routes_by_method(self):
+        """
+        Проверяет, что middleware направляет на реплику только запросы на чтение (в том числе асинхронные).
+        """
+        def view(request):
+            return HttpResponse(Agent.objects.all().db)
+
+        async def async_view(request):
+            before = Agent.objects.all().db
+            await Agent.objects.acreate(name="Test Agent", email="agent@example.com", phone_number="1234567890")
+            return HttpResponse(f'{before},{Agent.objects.all().db}')
+
+        factory = RequestFactory()
+        middleware = ReplicaRoutingMiddleware(view)
+        self.assertEqual(middleware(factory.get('/')).content, b'replica')
+        self.assertEqual(middleware(factory.post('/')).content, b'default')
+        self.assertEqual(Agent.objects.all().db, 'default')
+        response = async_to_sync(ReplicaRoutingMiddleware(async_view))(factory.get('/'))
+        self.assertEqual(response.content, b'replica,default')
+
+
+class SyncReplicaCommandTest(TransactionTestCase):
+    """
+    Тесты для команды sync_replica.
+    TransactionTestCase: копирование ждет завершения открытой транзакции записи, а TestCase держит ее до конца теста.
+    """
+
+    def test_sync_replica_copies_database(self):
+        """
+        Проверяет, что команда sync_replica копирует схему основной базы в файл реплики.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            target = Path(directory) / 'replica.sqlite3'
+            call_command('sync_replica', target=str(target), stdout=StringIO())
+            replica = sqlite3.connect(target)
+            try:
+                tables = {row[0] for row in replica.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            finally:
+                replica.close()
+        self.assertIn('reference_books_agent', tables)
+
+
+class BackgroundJobTest(TestCase):
+    """
+    Тесты для фоновой очереди заданий и ее API.
+    """
+
+    def setUp(self):
+        """
+        Устанавливает начальные данные для тестов: пользователя, клиента API и каталог файлов результатов.
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        media = override_settings(MEDIA_ROOT=directory.name)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.user = User.objects.create_user(username='dispatcher', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.agent = Agent.objects.create(name="Test Agent", email="agent@example.com", phone_number="1234567890")
+        PickupPoint.objects.create(name="Pickup Point 1", address="123 Test St", agent=self.agent)
+
+    def test_queue_claim_and_requeue(self):
+        """
+        Проверяет постановку в очередь, захват задания одним обработчиком и возврат прерванного задания.
+        """
+        with self.assertRaises(JobError):
+            enqueue('unknown.job')
+        job = enqueue('reports.export', {'export': 'shifts'})
+        claimed = claim_next_job('worker-1')
+        self.assertEqual((claimed.pk, claimed.status, claimed.attempts), (job.pk, 'running', 1))
+        self.assertIsNone(claim_next_job('worker-2'))
+
+        BackgroundJob.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(requeue_stale_jobs(timeout=60), (1, 0))
+        self.assertEqual(claim_next_job('worker-2').worker, 'worker-2')
+
+    def test_api_submit_status_and_download(self):
+        """
+        Проверяет постановку задания через API, его выполнение, состояние и загрузку результата.
+        """
+        url = reverse('core_api:job-list')
+        response = self.client.post(url, {'kind': 'reports.export', 'params': {'export': 'schedules'}}, format='json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], 'queued')
+        job_url = reverse('core_api:job-detail', args=[response.data['id']])
+
+        run_job(claim_next_job('test').pk)
+        response = self.client.get(job_url)
+        self.assertEqual((response.data['status'], response.data['progress']), ('succeeded', 100))
+        self.assertEqual(response.data['result'], {'rows': 0})
+        download = self.client.get(response.data['download_url'])
+        self.assertEqual(download.status_code, 200)
+        self.assertTrue(b''.join(download.streaming_content).decode('utf-8-sig').startswith('ID,'))
+
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user(username='other', password='password'))
+        self.assertEqual(other.get(job_url).status_code, 404)
+        self.assertEqual(self.client.post(url, {'kind': 'unknown'}, format='json').status_code, 400)
+
+    def test_failed_job_keeps_error(self):
+        """
+        Проверяет, что ошибка задачи сохраняется в задании, а трассировка непредвиденной ошибки
+        не выводится в API.
+        """
+        job = enqueue('reports.work_schedule_reports', {'agent_id': self.agent.pk + 100})
+        self.assertEqual(run_job(claim_next_job('test').pk), 'failed')
+        job.refresh_from_db()
+        self.assertIn('не найден', job.error)
+
+        employee = Employee.objects.create(
+            first_name="John", last_name="Doe", email="john.doe@example.com",
+            date_of_hire=date(2024, 1, 1), position="Operator", agent=self.agent
+        )
+        job = enqueue('reports.work_schedule_report', {'employee_id': employee.pk}, self.user)
+        with patch('reports.jobs.build_work_schedule_report', side_effect=RuntimeError('report failed')), \
+                self.assertLogs('core.jobs', level='ERROR'):
+            self.assertEqual(run_job(claim_next_job('test').pk), 'failed')
+        response = self.client.get(reverse('core_api:job-detail', args=[job.pk]))
+        self.assertEqual(response.data['error'], 'report failed')
+        self.assertNotIn('error_traceback', response.data)
+        job.refresh_from_db()
+        self.assertIn('Traceback', job.error_traceback)
+
+    def test_superseded_run_keeps_other_result(self):
+        """
+        Проверяет, что отметка выполнения касается только заданий обработчика, а обработчик,
+        задание которого тем временем было возвращено в очередь и захвачено другим обработчиком,
+        не перезаписывает его состояние.
+        """
+        def requeued_job(job):
+            BackgroundJob.objects.filter(pk=job.pk).update(worker='worker-2')
+            return {'run': 1}
+
+        with patch.dict(JOBS, {'test.requeued': requeued_job}):
+            job = enqueue('test.requeued')
+            claim_next_job('worker-1')
+            self.assertEqual(send_heartbeat('worker-2', [job.pk]), 0)
+            self.assertEqual(send_heartbeat('worker-1', [job.pk]), 1)
+            with self.assertLogs('core.jobs', level='WARNING') as logs:
+                self.assertEqual(run_job(job.pk), 'superseded')
+        self.assertIn('не сохранен', logs.output[0])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker, job.result), ('running', 'worker-2', None))
+
+    def test_invalid_params_are_rejected(self):
+        """
+        Проверяет, что неверные параметры отклоняются при постановке в очередь (400), а не в обработчике.
+        """
+        url = reverse('core_api:job-list')
+        for kind, params in (
+            ('reports.export', {'export': 'shifts', 'bogus': 1}),
+            ('reports.export', {'export': 'unknown'}),
+            ('reports.export', {'export': 'shifts', 'filters': {'date_from': '2024-13-01'}}),
+            ('reports.work_schedule_report', {'employee_id': 'abc'}),
+            ('reports.work_schedule_report', {'employee_id': 2 ** 64}),
+            ('reports.work_schedule_report', {}),
+            ('reports.work_schedule_reports', {}),
+            ('documents.batch_update_schedules', {'schedule_ids': ['x'], 'action': 'approve'}),
+            ('documents.batch_update_schedules', {'schedule_ids': [1], 'action': 'delete'}),
+        ):
+            response = self.client.post(url, {'kind': kind, 'params': params}, format='json')
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn('params', response.data)
+        self.assertFalse(BackgroundJob.objects.exists())
+        self.assertEqual(enqueue('reports.work_schedule_report', {'employee_id': '5'}).params, {'employee_id': 5})
+
+
+class RunJobsCommandTest(TransactionTestCase):
+    """
+    Тесты для команды run_jobs.
+    TransactionTestCase: задания выполняются в потоках пула со своими соединениями.
+    """
+
+    def test_run_jobs_once(self):
+        """
+        Проверяет, что обработчик выполняет все задания очереди и завершается с --once.
+        """
+        agent = Agent.objects.create(name="Test Agent", email="agent@example.com", phone_number="1234567890")
+        jobs = [
+            enqueue('reports.work_schedule_reports', {'agent_id': agent.pk}),
+            enqueue('documents.batch_update_schedules', {'schedule_ids': [1], 'action': 'approve'}),
+        ]
+        with tempfile.TemporaryDirectory() as directory, override_settings(MEDIA_ROOT=directory):
+            call_command('run_jobs', workers=2, once=True, poll_interval=0.1, stdout=StringIO())
+        statuses = dict(BackgroundJob.objects.values_list('id', 'status'))
+        self.assertEqual([statuses[job.pk] for job in jobs], ['succeeded', 'succeeded'])
+        self.assertEqual(BackgroundJob.objects.get(pk=jobs[1].pk).result['not_found'], [1])
+
+    @override_settings(JOB_HEARTBEAT_INTERVAL=0)
+    def test_heartbeat_while_job_runs(self):
+        """
+        Проверяет, что обработчик отмечает задание, которое выполняется без обновлений прогресса,
+        поэтому оно не считается прерванным.
+        """
+        def slow_job(job):
+            time.sleep(0.3)
+
+        with patch.dict(JOBS, {'test.slow': slow_job}):
+            job = enqueue('test.slow')
+            call_command('run_jobs', workers=1, once=True, poll_interval=0.05, stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'succeeded')
+        self.assertGreater(job.heartbeat_at, job.started_at)
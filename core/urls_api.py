@@ -0,0 +1,15 @@
+# core/urls_api.py
+
+from django.urls import path, include
+from rest_framework.routers import SimpleRouter
+from . import views
+
+app_name = 'core_api'
+
+# Фоновая очередь заданий: /api/jobs/, /api/jobs/<id>/, /api/jobs/<id>/download/
+router = SimpleRouter()  # корневой маршрут API объявлен в reference_books.urls_api
+router.register(r'jobs', views.BackgroundJobViewSet, basename='job')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
@@ -1,3 +1,57 @@
-from django.shortcuts import render
+# core/views.py
 
-# Create your views here.
+import os
+from django.http import FileResponse, Http404
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from .jobs import JOBS, JobError, enqueue
+from .models import BackgroundJob
+from .serializers import BackgroundJobSerializer
+
+
+class BackgroundJobViewSet(mixins.CreateModelMixin, mixins.ListModelMixin, mixins.RetrieveModelMixin,
+                           viewsets.GenericViewSet):
+    """
+    API ViewSet фоновой очереди заданий (см. core.jobs).
+
+    POST ставит задание в очередь ({"kind": ..., "params": {...}}) и возвращает 202 с состоянием задания
+    (400, если задача неизвестна или параметры не прошли проверку core.jobs.validate_params);
+    GET по заданию возвращает состояние и прогресс, download - файл результата.
+    Пользователь видит свои задания, сотрудники с is_staff - все.
+
+    Атрибуты:
+        serializer_class (Serializer): Класс сериализатора задания.
+        permission_classes (list): Список классов разрешений.
+    """
+    serializer_class = BackgroundJobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        jobs = BackgroundJob.objects.all()
+        if not self.request.user.is_staff:
+            jobs = jobs.filter(created_by=self.request.user)
+        return jobs
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            job = enqueue(serializer.validated_data['kind'], serializer.validated_data.get('params'), request.user)
+        except JobError as error:
+            field = 'params' if serializer.validated_data['kind'] in JOBS else 'kind'
+            raise ValidationError({field: str(error)})
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True)
+    def download(self, request, pk=None):
+        """
+        Возвращает файл результата задания.
+        """
+        job = self.get_object()
+        if not job.result_file:
+            raise Http404('У задания нет файла результата')
+        return FileResponse(job.result_file.open('rb'), as_attachment=True,
+                            filename=os.path.basename(job.result_file.name))
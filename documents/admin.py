@@ -1,7 +1,74 @@
 # documents/admin.py
 
 from django.contrib import admin
+from core.admin import LimitedCountPaginator
+from reference_books.admin import SearchIndexAdminMixin
+from reference_books.models import Employee
 from .models import WorkSchedule, WorkShift
 
-admin.site.register(WorkSchedule)
-admin.site.register(WorkShift)
\ No newline at end of file
+
+@admin.register(WorkSchedule)
+class WorkScheduleAdmin(SearchIndexAdminMixin, admin.ModelAdmin):
+    """
+    Админ-класс для модели WorkSchedule, рассчитанный на большое количество графиков.
+
+    Связанные объекты загружаются тем же запросом, связи в форме выбираются автодополнением,
+    фильтры не загружают справочники и используют индексы, точный подсчет всех записей отключен.
+    Поиск выполняется по сотруднику через поисковый индекс (см. SearchIndexAdminMixin).
+
+    Атрибуты:
+        list_display (tuple): Поля для отображения в списке графиков.
+        list_select_related (tuple): Связи, загружаемые вместе со списком.
+        list_filter (tuple): Поля для фильтрации графиков.
+        date_hierarchy (str): Поле для навигации по датам.
+        search_fields (tuple): Поля для поиска графиков.
+        autocomplete_fields (tuple): Связи, выбираемые автодополнением.
+        ordering (tuple): Поля для сортировки графиков.
+        show_full_result_count (bool): Выполнять ли подсчет всех записей при фильтрации.
+        paginator (Paginator): Пагинатор с ограниченным подсчетом записей.
+    """
+    list_display = ('id', 'employee', 'pickup_point', 'start_date', 'end_date', 'status', 'updated_at')
+    list_select_related = ('employee', 'pickup_point')
+    list_filter = ('status', 'start_date')
+    date_hierarchy = 'start_date'
+    search_fields = ('employee__last_name',)
+    search_index_model = Employee
+    search_index_field = 'employee'
+    autocomplete_fields = ('employee', 'pickup_point')
+    ordering = ('-start_date', '-id')
+    show_full_result_count = False
+    paginator = LimitedCountPaginator
+
+    def get_queryset(self, request):
+        # __str__ графика обращается к сотруднику (автодополнение графика в форме смены). Список изменения
+        # не применяет list_select_related к набору, в котором уже есть select_related, поэтому связи те же
+        return super().get_queryset(request).select_related(*self.list_select_related)
+
+
+@admin.register(WorkShift)
+class WorkShiftAdmin(SearchIndexAdminMixin, admin.ModelAdmin):
+    """
+    Админ-класс для модели WorkShift, рассчитанный на миллионы смен.
+
+    Атрибуты:
+        list_display (tuple): Поля для отображения в списке смен.
+        list_select_related (tuple): Связи, загружаемые вместе со списком.
+        list_filter (tuple): Поля для фильтрации смен.
+        date_hierarchy (str): Поле для навигации по датам.
+        search_fields (tuple): Поля для поиска смен.
+        autocomplete_fields (tuple): Связи, выбираемые автодополнением.
+        ordering (tuple): Поля для сортировки смен.
+        show_full_result_count (bool): Выполнять ли подсчет всех записей при фильтрации.
+        paginator (Paginator): Пагинатор с ограниченным подсчетом записей.
+    """
+    list_display = ('id', 'employee', 'date', 'start_time', 'end_time', 'schedule', 'is_approved')
+    list_select_related = ('employee', 'schedule__employee')
+    list_filter = ('is_approved', 'date')
+    date_hierarchy = 'date'
+    search_fields = ('employee__last_name',)
+    search_index_model = Employee
+    search_index_field = 'employee'
+    autocomplete_fields = ('schedule', 'employee')
+    ordering = ('-date', '-id')
+    show_full_result_count = False
+    paginator = LimitedCountPaginator
@@ -0,0 +1,132 @@
+# documents/conflicts.py
+
+from collections import defaultdict
+from operator import attrgetter
+
+
+def _sweep(day_shifts, new_ids=None):
+    """
+    Однократный проход по сменам одной группы, отсортированным по времени начала.
+
+    Аргументы:
+        day_shifts (iterable): Смены одной группы (например, одной даты), отсортированные по start_time.
+        new_ids (set): Необязательный набор id() новых смен; если задан, возвращаются только пары с их участием.
+
+    Возвращает:
+        generator: Пары (shift_a, shift_b) пересекающихся смен.
+    """
+    active = []
+    for shift in day_shifts:
+        # Смены, закончившиеся до начала текущей, больше ни с чем не пересекутся
+        active = [other for other in active if other.end_time > shift.start_time]
+        for other in active:
+            if new_ids is None or id(other) in new_ids or id(shift) in new_ids:
+                yield other, shift
+        active.append(shift)
+
+
+def find_overlapping_shifts(shifts, new_shifts=None, key=attrgetter('date')):
+    """
+    Находит пересекающиеся смены методом сортировки и однократного прохода (sort-and-sweep).
+
+    Смены группируются по ключу (по умолчанию - по дате), внутри каждой группы сортируются
+    по времени начала и просматриваются один раз с поддержкой списка "активных" смен.
+    Сложность O(n log n + k), где k - количество найденных конфликтов.
+
+    Аргументы:
+        shifts (iterable): Смены (экземпляры WorkShift или объекты с полями date, start_time, end_time).
+        new_shifts (iterable): Необязательный набор добавляемых смен. Если передан, они проверяются
+            вместе с shifts, а в результат попадают только пары, в которых участвует хотя бы одна новая смена.
+        key (callable): Функция группировки смен; пересечения ищутся только внутри одной группы.
+
+    Возвращает:
+        list: Список пар (shift_a, shift_b) пересекающихся смен, где shift_a начинается не позже shift_b.
+    """
+    new_ids = None
+    all_shifts = list(shifts)
+    if new_shifts is not None:
+        new_shifts = list(new_shifts)
+        new_ids = {id(shift) for shift in new_shifts}
+        all_shifts.extend(new_shifts)
+
+    groups = defaultdict(list)
+    for shift in all_shifts:
+        groups[key(shift)].append(shift)
+
+    conflicts = []
+    for group_key in sorted(groups):
+        day_shifts = sorted(groups[group_key], key=attrgetter('start_time', 'end_time'))
+        conflicts.extend(_sweep(day_shifts, new_ids))
+    return conflicts
+
+
+def find_employee_double_bookings(new_shifts):
+    """
+    Проверяет пакет смен на двойное бронирование сотрудников по всем графикам.
+
+    Для всего пакета выполняется один запрос по индексу (employee, date, start_time, end_time):
+    загружаются смены тех же сотрудников на те же даты из любых графиков (и любых пунктов выдачи),
+    после чего пересечения ищутся проходом sort-and-sweep в разрезе (сотрудник, дата).
+
+    Аргументы:
+        new_shifts (iterable): Добавляемые или изменяемые смены.
+
+    Возвращает:
+        list: Список пар (shift_a, shift_b) пересекающихся смен одного сотрудника,
+            в каждой из которых участвует хотя бы одна смена из new_shifts.
+    """
+    from .models import WorkShift
+
+    new_shifts = list(new_shifts)
+    if not new_shifts:
+        return []
+    existing = WorkShift.objects.filter(
+        employee_id__in={shift.employee_id for shift in new_shifts},
+        date__in={shift.date for shift in new_shifts},
+    ).exclude(
+        pk__in=[shift.pk for shift in new_shifts if shift.pk is not None]
+    )
+    return find_overlapping_shifts(existing, new_shifts, key=attrgetter('employee_id', 'date'))
+
+
+def scan_double_bookings(agent=None, start_date=None, end_date=None, chunk_size=2000):
+    """
+    Сканирует смены (всего агента или всей базы) на двойное бронирование сотрудников.
+
+    Смены читаются одним запросом, упорядоченным по (employee, date, start_time) - этот порядок
+    обслуживается индексом, - в виде легких кортежей без создания экземпляров моделей,
+    и просматриваются потоком за один проход. Память пропорциональна числу смен одного
+    сотрудника за один день, а не размеру выборки.
+
+    Аргументы:
+        agent (Agent): Необязательный агент, смены сотрудников которого проверяются.
+        start_date (date): Необязательная дата начала проверяемого периода.
+        end_date (date): Необязательная дата окончания проверяемого периода.
+        chunk_size (int): Размер порции при чтении из базы.
+
+    Возвращает:
+        generator: Пары именованных кортежей (id, employee_id, schedule_id, date, start_time, end_time)
+            пересекающихся смен.
+    """
+    from .models import WorkShift
+
+    shifts = WorkShift.objects.all()
+    if agent is not None:
+        shifts = shifts.filter(employee__agent=agent)
+    if start_date is not None:
+        shifts = shifts.filter(date__gte=start_date)
+    if end_date is not None:
+        shifts = shifts.filter(date__lte=end_date)
+    rows = shifts.order_by('employee_id', 'date', 'start_time', 'end_time').values_list(
+        'id', 'employee_id', 'schedule_id', 'date', 'start_time', 'end_time', named=True
+    ).iterator(chunk_size=chunk_size)
+
+    group_key = None
+    group = []
+    for row in rows:
+        row_key = (row.employee_id, row.date)
+        if row_key != group_key:
+            yield from _sweep(group)
+            group_key, group = row_key, []
+        group.append(row)
+    yield from _sweep(group)
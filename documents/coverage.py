@@ -0,0 +1,402 @@
+# documents/coverage.py
+
+import heapq
+import time
+from collections import Counter, defaultdict
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Q
+from reference_books.cache import get_active_employees
+from reference_books.models import EmployeeAbsence, PickupPoint
+from .models import WorkSchedule, WorkShift
+from .signals import shifts_bulk_updated
+
+MAX_DAYS_PER_WEEK = 5  # не более рабочих дней в календарной неделе
+MAX_CONSECUTIVE_DAYS = 5  # не более рабочих дней подряд
+DEFAULT_TIME_BUDGET = 2.0  # секунд на планирование (жадное заполнение и локальный поиск)
+MAX_TIME_BUDGET = 10.0  # предел бюджета времени для планирования из HTTP-запроса
+COVERAGE_BATCH_SIZE = 1000  # строк на один INSERT при bulk_create
+
+
+class CoverageSlot:
+    """
+    Потребность в одном сотруднике в пункте выдачи на одну дату (смена на все часы работы пункта).
+
+    Атрибуты:
+        pickup_point_id (int): ID пункта выдачи.
+        date (date): Дата смены.
+        start_time (time): Время начала смены (открытие пункта выдачи).
+        end_time (time): Время окончания смены (закрытие пункта выдачи).
+        employee_id (int): ID назначенного сотрудника или None, если потребность не закрыта.
+    """
+    __slots__ = ('pickup_point_id', 'date', 'start_time', 'end_time', 'employee_id')
+
+    def __init__(self, pickup_point_id, date, start_time, end_time):
+        self.pickup_point_id = pickup_point_id
+        self.date = date
+        self.start_time = start_time
+        self.end_time = end_time
+        self.employee_id = None
+
+
+class CoveragePlanner:
+    """
+    Эвристическое распределение сотрудников по потребностям пунктов выдачи.
+
+    Ограничения: одна смена в день, не в дни недоступности и не раньше даты найма,
+    не более max_days_per_week дней в календарной неделе и не более max_consecutive_days
+    дней подряд (с учетом уже существующих смен). Предпочтение отдается сотрудникам,
+    для которых пункт выдачи является пунктом по умолчанию, и менее загруженным сотрудникам.
+
+    Свободные сотрудники каждой даты потребностей хранятся в куче по загрузке (pools), поэтому
+    поиск сотрудника не перебирает всех сотрудников агента. В куче даты не более одной записи
+    сотрудника; записи обновляются лениво: запись с устаревшей загрузкой при извлечении заменяется
+    актуальной, а сотрудник, которому нельзя назначить смену на дату, удаляется из кучи даты
+    до снятия какой-либо его смены (unassign).
+
+    Атрибуты:
+        slots (list): Потребности (CoverageSlot).
+        employees (dict): Словарь {employee_id: (default_pickup_point_id, date_of_hire)}.
+        unavailable (dict): Словарь {employee_id: set(дат недоступности)}.
+        work_days (dict): Словарь {employee_id: set(рабочих дат)} - существующие и назначенные смены.
+        pools (dict): Словарь {дата: куча [(загрузка, employee_id)]} сотрудников, которым можно назначить смену.
+        pooled (dict): Словарь {дата: set(employee_id)} сотрудников, запись которых есть в куче даты.
+    """
+
+    def __init__(self, slots, employees, unavailable, work_days,
+                 max_days_per_week=MAX_DAYS_PER_WEEK, max_consecutive_days=MAX_CONSECUTIVE_DAYS):
+        self.slots = slots
+        self.employees = employees
+        self.unavailable = unavailable
+        self.work_days = defaultdict(set, {employee_id: set(days) for employee_id, days in work_days.items()})
+        self.max_days_per_week = max_days_per_week
+        self.max_consecutive_days = max_consecutive_days
+        self.week_counts = Counter(
+            (employee_id, day.isocalendar()[:2]) for employee_id, days in self.work_days.items() for day in days
+        )
+        self.home_employees = defaultdict(list)
+        for employee_id, (pickup_point_id, date_of_hire) in sorted(employees.items()):
+            self.home_employees[pickup_point_id].append(employee_id)
+        self.employee_ids = sorted(employees)
+        self.assignments = {}  # (employee_id, date) -> назначенная потребность
+        self.deadline = None
+        self.pools = {}
+        self.pooled = {}
+        for day in {slot.date for slot in slots}:
+            pool = [
+                (len(self.work_days[employee_id]), employee_id)
+                for employee_id in self.employee_ids if self.can_assign(employee_id, day)
+            ]
+            heapq.heapify(pool)
+            self.pools[day] = pool
+            self.pooled[day] = {employee_id for load, employee_id in pool}
+
+    def out_of_time(self):
+        """
+        Проверяет, исчерпан ли бюджет времени.
+        """
+        return self.deadline is not None and time.perf_counter() > self.deadline
+
+    def can_assign(self, employee_id, day):
+        """
+        Проверяет, может ли сотрудник получить смену в указанный день.
+        """
+        work_days = self.work_days[employee_id]
+        if day in work_days or day < self.employees[employee_id][1]:
+            return False
+        if day in self.unavailable.get(employee_id, ()):
+            return False
+        if self.week_counts[(employee_id, day.isocalendar()[:2])] >= self.max_days_per_week:
+            return False
+        run = 1
+        for step in (-1, 1):
+            other = day + timedelta(days=step)
+            while other in work_days:
+                run += 1
+                other += timedelta(days=step)
+        return run <= self.max_consecutive_days
+
+    def assign(self, slot, employee_id):
+        """
+        Назначает сотрудника на потребность.
+        """
+        slot.employee_id = employee_id
+        self.work_days[employee_id].add(slot.date)
+        self.week_counts[(employee_id, slot.date.isocalendar()[:2])] += 1
+        self.assignments[(employee_id, slot.date)] = slot
+
+    def unassign(self, slot):
+        """
+        Снимает сотрудника с потребности и возвращает его в кучи дат: снятие смены уменьшает
+        загрузку и может снова разрешить смены в соседние дни.
+        """
+        employee_id = slot.employee_id
+        slot.employee_id = None
+        self.work_days[employee_id].discard(slot.date)
+        self.week_counts[(employee_id, slot.date.isocalendar()[:2])] -= 1
+        del self.assignments[(employee_id, slot.date)]
+        entry = (len(self.work_days[employee_id]), employee_id)
+        for day, pool in self.pools.items():
+            if employee_id not in self.pooled[day]:
+                heapq.heappush(pool, entry)
+                self.pooled[day].add(employee_id)
+
+    def pop_available(self, day):
+        """
+        Возвращает наименее загруженного сотрудника, которому можно назначить смену на дату, или None.
+        Сотрудник остается в куче даты.
+        """
+        pool = self.pools.get(day, [])
+        while pool:
+            load, employee_id = pool[0]
+            if load != len(self.work_days[employee_id]):
+                heapq.heapreplace(pool, (len(self.work_days[employee_id]), employee_id))
+            elif self.can_assign(employee_id, day):
+                return employee_id
+            else:
+                heapq.heappop(pool)
+                self.pooled[day].discard(employee_id)
+        return None
+
+    def find_employee(self, slot, home_only=False):
+        """
+        Возвращает наименее загруженного подходящего сотрудника для потребности или None.
+        Сначала рассматриваются сотрудники пункта выдачи по умолчанию, затем остальные.
+        """
+        feasible = [
+            employee_id for employee_id in self.home_employees.get(slot.pickup_point_id, [])
+            if self.can_assign(employee_id, slot.date)
+        ]
+        if feasible:
+            return min(feasible, key=lambda employee_id: len(self.work_days[employee_id]))
+        return None if home_only else self.pop_available(slot.date)
+
+    def greedy(self):
+        """
+        Жадное заполнение: по дням в хронологическом порядке, внутри дня - сначала пункты
+        выдачи с наименьшим числом "своих" сотрудников. По исчерпании бюджета времени
+        оставшиеся потребности остаются незакрытыми.
+        """
+        by_date = defaultdict(list)
+        for slot in self.slots:
+            by_date[slot.date].append(slot)
+        for day in sorted(by_date):
+            for slot in sorted(by_date[day], key=lambda slot: len(self.home_employees.get(slot.pickup_point_id, []))):
+                if self.out_of_time():
+                    return
+                employee_id = self.find_employee(slot)
+                if employee_id is not None:
+                    self.assign(slot, employee_id)
+
+    def fill_by_ejection(self, slot):
+        """
+        Пытается закрыть потребность, освободив сотрудника: его смена в пределах недели
+        передается другому сотруднику, а сам он занимает потребность.
+        """
+        window = max(7, self.max_consecutive_days)
+        candidates = dict.fromkeys(self.home_employees.get(slot.pickup_point_id, []) + self.employee_ids)
+        for employee_id in candidates:
+            if self.out_of_time():
+                return False
+            if slot.date in self.unavailable.get(employee_id, ()) or slot.date < self.employees[employee_id][1]:
+                continue
+            for offset in range(-window, window + 1):
+                other = self.assignments.get((employee_id, slot.date + timedelta(days=offset)))
+                if other is None:
+                    continue
+                self.unassign(other)
+                if self.can_assign(employee_id, slot.date):
+                    self.assign(slot, employee_id)
+                    replacement = self.find_employee(other)
+                    if replacement is not None:
+                        self.assign(other, replacement)
+                        return True
+                    self.unassign(slot)
+                self.assign(other, employee_id)
+        return False
+
+    def rehome(self, slot):
+        """
+        Передает потребность сотруднику пункта выдачи по умолчанию, если он свободен.
+        """
+        employee_id = self.find_employee(slot, home_only=True)
+        if employee_id is None:
+            return False
+        self.unassign(slot)
+        self.assign(slot, employee_id)
+        return True
+
+    def improve(self):
+        """
+        Локальный поиск до исчерпания улучшений или времени: закрытие незаполненных потребностей
+        перестановками и перевод смен на сотрудников пункта выдачи по умолчанию.
+        """
+        improved = True
+        while improved and not self.out_of_time():
+            improved = False
+            for slot in self.slots:
+                if self.out_of_time():
+                    break
+                if slot.employee_id is None:
+                    improved = self.fill_by_ejection(slot) or improved
+                elif self.employees[slot.employee_id][0] != slot.pickup_point_id:
+                    improved = self.rehome(slot) or improved
+
+    def plan(self, time_budget=DEFAULT_TIME_BUDGET):
+        """
+        Выполняет жадное заполнение и локальный поиск в пределах time_budget секунд.
+        """
+        self.deadline = time.perf_counter() + time_budget
+        self.greedy()
+        self.improve()
+        return self.slots
+
+
+class CoveragePlan:
+    """
+    Результат автоматического планирования смен агента за период.
+
+    Атрибуты:
+        agent (Agent): Агент.
+        start_date (date): Дата начала периода.
+        end_date (date): Дата окончания периода.
+        slots (list): Потребности (CoverageSlot) с назначенными сотрудниками.
+        elapsed (float): Время планирования в секундах.
+        created_shifts (int): Количество созданных смен (0 в режиме предпросмотра).
+        created_schedules (int): Количество созданных графиков (0 в режиме предпросмотра).
+    """
+
+    def __init__(self, agent, start_date, end_date, slots, elapsed):
+        self.agent = agent
+        self.start_date = start_date
+        self.end_date = end_date
+        self.slots = slots
+        self.elapsed = elapsed
+        self.created_shifts = 0
+        self.created_schedules = 0
+
+    @property
+    def assigned(self):
+        """
+        Потребности, на которые назначены сотрудники.
+        """
+        return [slot for slot in self.slots if slot.employee_id is not None]
+
+    @property
+    def unfilled(self):
+        """
+        Незакрытые потребности.
+        """
+        return [slot for slot in self.slots if slot.employee_id is None]
+
+
+def plan_coverage(agent, start_date, end_date, time_budget=DEFAULT_TIME_BUDGET,
+                  max_days_per_week=MAX_DAYS_PER_WEEK, max_consecutive_days=MAX_CONSECUTIVE_DAYS):
+    """
+    Планирует смены сотрудников агента так, чтобы закрыть потребности пунктов выдачи.
+
+    Потребность пункта выдачи на день - required_staff смен с opening_time до closing_time
+    за вычетом уже существующих смен в этом пункте на эту дату. Активные сотрудники агента
+    берутся из кэша справочников (get_active_employees), остальные данные загружаются тремя
+    запросами, планирование выполняется в памяти (см. CoveragePlanner).
+
+    Аргументы:
+        agent (Agent): Агент.
+        start_date (date): Дата начала периода.
+        end_date (date): Дата окончания периода.
+        time_budget (float): Ограничение времени планирования в секундах.
+        max_days_per_week (int): Максимум рабочих дней в календарной неделе.
+        max_consecutive_days (int): Максимум рабочих дней подряд.
+
+    Возвращает:
+        CoveragePlan: План (в базу ничего не записывается, см. save_coverage_plan).
+    """
+    started = time.perf_counter()
+    employees = {
+        employee.id: (employee.default_pickup_point_id, employee.date_of_hire)
+        for employee in get_active_employees(agent.id)
+    }
+
+    unavailable = defaultdict(set)
+    for employee_id, absence_start, absence_end in EmployeeAbsence.objects.filter(
+        employee__agent=agent, start_date__lte=end_date, end_date__gte=start_date
+    ).values_list('employee_id', 'start_date', 'end_date'):
+        day = max(absence_start, start_date)
+        while day <= min(absence_end, end_date):
+            unavailable[employee_id].add(day)
+            day += timedelta(days=1)
+
+    # Смены за неделю до и после периода нужны для ограничений по неделе и дням подряд
+    work_days = defaultdict(set)
+    covered = Counter()
+    for employee_id, pickup_point_id, day in WorkShift.objects.filter(
+        Q(employee__agent=agent) | Q(schedule__pickup_point__agent=agent),
+        date__range=(start_date - timedelta(days=7), end_date + timedelta(days=7)),
+    ).values_list('employee_id', 'schedule__pickup_point_id', 'date'):
+        if employee_id in employees:
+            work_days[employee_id].add(day)
+        if start_date <= day <= end_date:
+            covered[(pickup_point_id, day)] += 1
+
+    slots = []
+    for pickup_point_id, opening_time, closing_time, required_staff in PickupPoint.objects.filter(
+        agent=agent, required_staff__gt=0
+    ).order_by('id').values_list('id', 'opening_time', 'closing_time', 'required_staff'):
+        day = start_date
+        while day <= end_date:
+            for _ in range(required_staff - covered[(pickup_point_id, day)]):
+                slots.append(CoverageSlot(pickup_point_id, day, opening_time, closing_time))
+            day += timedelta(days=1)
+
+    planner = CoveragePlanner(slots, employees, unavailable, work_days, max_days_per_week, max_consecutive_days)
+    planner.plan(max(0, time_budget - (time.perf_counter() - started)))
+    return CoveragePlan(agent, start_date, end_date, slots, time.perf_counter() - started)
+
+
+def save_coverage_plan(plan):
+    """
+    Записывает план: черновые графики (по одному на сотрудника и пункт выдачи за период)
+    и смены создаются через bulk_create в одной транзакции. Существующие черновые
+    графики с тем же сотрудником, пунктом выдачи и периодом используются повторно.
+
+    Аргументы:
+        plan (CoveragePlan): План, полученный из plan_coverage.
+
+    Возвращает:
+        CoveragePlan: Тот же план с заполненными created_shifts и created_schedules.
+    """
+    assigned = plan.assigned
+    if not assigned:
+        return plan
+    pairs = {(slot.employee_id, slot.pickup_point_id) for slot in assigned}
+    with transaction.atomic():
+        schedules = {
+            (schedule.employee_id, schedule.pickup_point_id): schedule
+            for schedule in WorkSchedule.objects.filter(
+                employee_id__in={employee_id for employee_id, pickup_point_id in pairs},
+                pickup_point__agent=plan.agent,
+                start_date=plan.start_date, end_date=plan.end_date, status='draft',
+            )
+        }
+        new_schedules = [
+            WorkSchedule(employee_id=employee_id, pickup_point_id=pickup_point_id,
+                         start_date=plan.start_date, end_date=plan.end_date, status='draft')
+            for employee_id, pickup_point_id in sorted(pairs) if (employee_id, pickup_point_id) not in schedules
+        ]
+        WorkSchedule.objects.bulk_create(new_schedules, batch_size=COVERAGE_BATCH_SIZE)
+        schedules.update({(schedule.employee_id, schedule.pickup_point_id): schedule for schedule in new_schedules})
+
+        WorkShift.objects.bulk_create([
+            WorkShift(
+                schedule=schedules[(slot.employee_id, slot.pickup_point_id)], employee_id=slot.employee_id,
+                date=slot.date, start_time=slot.start_time, end_time=slot.end_time,
+            )
+            for slot in assigned
+        ], batch_size=COVERAGE_BATCH_SIZE)
+        shifts_bulk_updated.send(
+            sender=WorkShift,
+            shifts=WorkShift.objects.filter(schedule_id__in=[schedule.id for schedule in schedules.values()]),
+        )
+    plan.created_shifts = len(assigned)
+    plan.created_schedules = len(new_schedules)
+    return plan
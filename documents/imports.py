@@ -0,0 +1,189 @@
+# documents/imports.py
+
+import csv
+import io
+import json
+from datetime import date, time
+from django.db import transaction
+from core.models import MAX_ID
+from reference_books.models import Employee
+from .conflicts import find_employee_double_bookings
+from .models import WorkShift
+from .signals import shifts_bulk_updated
+
+MAX_IMPORT_ROWS = 10000  # ограничение размера одного импорта
+IMPORT_BATCH_SIZE = 1000  # строк на один INSERT при bulk_create
+
+
+class ShiftImportError(ValueError):
+    """
+    Ошибка формата файла импорта (файл не удалось разобрать целиком).
+    """
+
+
+def parse_shift_rows(content, content_type):
+    """
+    Разбирает содержимое файла импорта смен.
+
+    CSV должен содержать строку заголовков со столбцами date, start_time, end_time
+    и необязательным employee_id. JSON - список объектов с теми же ключами
+    или объект с ключом "shifts", содержащим такой список.
+
+    Аргументы:
+        content (str): Содержимое файла.
+        content_type (str): 'csv' или 'json'.
+
+    Возвращает:
+        list: Словари значений строк (значения - строки или значения JSON).
+
+    Исключения:
+        ShiftImportError: Если файл не удалось разобрать или он превышает MAX_IMPORT_ROWS строк.
+    """
+    if content_type == 'json':
+        try:
+            data = json.loads(content)
+        except ValueError as error:
+            raise ShiftImportError(f'Некорректный JSON: {error}')
+        if isinstance(data, dict):
+            data = data.get('shifts')
+        if not isinstance(data, list) or not all(isinstance(item, dict) for item in data):
+            raise ShiftImportError('JSON должен быть списком объектов смен или объектом с ключом "shifts"')
+        rows = data
+    elif content_type == 'csv':
+        reader = csv.DictReader(io.StringIO(content.lstrip('\ufeff')))
+        missing = {'date', 'start_time', 'end_time'}.difference(reader.fieldnames or [])
+        if missing:
+            raise ShiftImportError(f'В CSV отсутствуют столбцы: {", ".join(sorted(missing))}')
+        rows = list(reader)
+    else:
+        raise ShiftImportError(f'Неподдерживаемый формат: {content_type}')
+    if len(rows) > MAX_IMPORT_ROWS:
+        raise ShiftImportError(f'Слишком много строк: {len(rows)} (не более {MAX_IMPORT_ROWS})')
+    return rows
+
+
+def _parse_value(value, parser, name, errors):
+    """
+    Разбирает значение поля строки, добавляя сообщение в errors при ошибке.
+    """
+    if value is None or value == '':
+        errors.append(f'{name}: обязательное поле')
+        return None
+    try:
+        return parser(str(value).strip())
+    except ValueError:
+        errors.append(f'{name}: некорректное значение "{value}"')
+        return None
+
+
+def _parse_id(value):
+    """
+    Разбирает ID объекта: положительное целое число в пределах MAX_ID (64-битного поля ID).
+    """
+    value = int(value)
+    if not 0 < value <= MAX_ID:
+        raise ValueError(value)
+    return value
+
+
+def validate_shift_rows(schedule, rows):
+    """
+    Проверяет строки импорта за один проход и строит несохраненные смены.
+
+    Проверки:
+        - формат полей, start_time < end_time, дата в пределах периода графика;
+        - сотрудник существует и относится к агенту пункта выдачи графика
+          (все сотрудники загружаются одним запросом);
+        - пересечения смен внутри файла и с существующими сменами графика;
+        - двойное бронирование сотрудника в других графиках.
+    Пересечения проверяются для всего пакета двумя запросами, независимо от числа строк.
+
+    Аргументы:
+        schedule (WorkSchedule): График, в который импортируются смены.
+        rows (list): Строки, полученные из parse_shift_rows.
+
+    Возвращает:
+        tuple: (shifts, errors), где shifts - список несохраненных WorkShift, errors - список
+            словарей {'row': номер строки (с 1), 'errors': [сообщения]}, упорядоченный по номеру строки.
+    """
+    errors = {}
+    parsed = []
+    for number, row in enumerate(rows, start=1):
+        row_errors = []
+        shift_date = _parse_value(row.get('date'), date.fromisoformat, 'date', row_errors)
+        start_time = _parse_value(row.get('start_time'), time.fromisoformat, 'start_time', row_errors)
+        end_time = _parse_value(row.get('end_time'), time.fromisoformat, 'end_time', row_errors)
+        employee_id = schedule.employee_id
+        if row.get('employee_id') not in (None, ''):
+            employee_id = _parse_value(row['employee_id'], _parse_id, 'employee_id', row_errors)
+        if start_time and end_time and start_time >= end_time:
+            row_errors.append('start_time должно быть раньше end_time')
+        if shift_date and not schedule.start_date <= shift_date <= schedule.end_date:
+            row_errors.append(f'Дата {shift_date} вне периода графика {schedule.start_date} - {schedule.end_date}')
+        if row_errors:
+            errors[number] = row_errors
+        parsed.append((number, shift_date, start_time, end_time, employee_id))
+
+    employee_ids = {item[4] for item in parsed if item[4] is not None}
+    valid_employee_ids = set(Employee.objects.filter(
+        id__in=employee_ids, agent_id=schedule.pickup_point.agent_id
+    ).values_list('id', flat=True))
+
+    shifts = []
+    row_numbers = {}
+    for number, shift_date, start_time, end_time, employee_id in parsed:
+        if employee_id is not None and employee_id not in valid_employee_ids:
+            errors.setdefault(number, []).append(f'Сотрудник {employee_id} не найден у агента пункта выдачи')
+        if number in errors:
+            continue
+        shift = WorkShift(
+            schedule=schedule, employee_id=employee_id, date=shift_date, start_time=start_time, end_time=end_time
+        )
+        shifts.append(shift)
+        row_numbers[id(shift)] = number
+
+    conflicts = schedule.find_conflicts(new_shifts=shifts) + find_employee_double_bookings(shifts)
+    reported = set()
+    for shift_a, shift_b in conflicts:
+        for shift, other in ((shift_a, shift_b), (shift_b, shift_a)):
+            number = row_numbers.get(id(shift))
+            # Существующая смена может быть найдена обеими проверками в виде разных экземпляров
+            other_key = other.pk if other.pk is not None else id(other)
+            if number is None or (number, other_key) in reported:
+                continue
+            reported.add((number, other_key))
+            other_number = row_numbers.get(id(other))
+            if other_number is not None:
+                message = f'Пересечение со строкой {other_number}'
+            else:
+                message = f'Пересечение с существующей сменой #{other.pk}: {other.date} {other.start_time}-{other.end_time}'
+            errors.setdefault(number, []).append(message)
+
+    shifts = [shift for shift in shifts if row_numbers[id(shift)] not in errors]
+    return shifts, [{'row': number, 'errors': errors[number]} for number in sorted(errors)]
+
+
+def import_shifts(schedule, rows):
+    """
+    Импортирует смены в график по принципу "все или ничего".
+
+    Если хотя бы одна строка содержит ошибку, ничего не сохраняется. Иначе смены
+    вставляются через bulk_create в одной транзакции, после чего отправляется сигнал
+    shifts_bulk_updated, чтобы обновить регистр DailyWorkHours и сбросить отчеты.
+
+    Аргументы:
+        schedule (WorkSchedule): График, в который импортируются смены.
+        rows (list): Строки, полученные из parse_shift_rows.
+
+    Возвращает:
+        tuple: (created, errors) - количество созданных смен и ошибки строк (см. validate_shift_rows).
+    """
+    with transaction.atomic():
+        shifts, errors = validate_shift_rows(schedule, rows)
+        if errors or not shifts:
+            return 0, errors
+        WorkShift.objects.bulk_create(shifts, batch_size=IMPORT_BATCH_SIZE)
+        shifts_bulk_updated.send(
+            sender=WorkShift, shifts=schedule.shifts.filter(date__in={shift.date for shift in shifts})
+        )
+    return len(shifts), []
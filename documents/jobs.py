@@ -0,0 +1,30 @@
+# documents/jobs.py
+
+from core.jobs import JobError, parse_id, register_job
+from .views import apply_schedule_action
+
+
+def validate_batch_params(params):
+    """
+    Проверяет параметры задачи documents.batch_update_schedules.
+    """
+    if params['action'] not in ('approve', 'reject'):
+        raise JobError("Параметр action должен быть 'approve' или 'reject'")
+    if not isinstance(params['schedule_ids'], list):
+        raise JobError('Параметр schedule_ids должен быть списком')
+    schedule_ids = sorted({
+        parse_id({'schedule_ids': schedule_id}, 'schedule_ids') for schedule_id in params['schedule_ids']
+    })
+    return {**params, 'schedule_ids': schedule_ids}
+
+
+@register_job('documents.batch_update_schedules', validate=validate_batch_params)
+def batch_update_schedules_job(job, schedule_ids, action, comment=None):
+    """
+    Задача: утверждает или отклоняет графики работы пакетом (см. apply_schedule_action).
+    Параметры проверяются при постановке в очередь (validate_batch_params).
+
+    Возвращает:
+        dict: Действие, ID обработанных графиков и ID не найденных графиков.
+    """
+    return apply_schedule_action(set(schedule_ids), action, comment or None)
@@ -0,0 +1,200 @@
+# documents/management/commands/benchmark_hot_paths.py
+
+import json
+import platform
+import sqlite3
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.benchmark import get_host, summarize_durations
+from documents.models import WorkSchedule
+from documents.seeding import SeedError, seed_data
+from reference_books.models import Employee
+
+API_LISTS = ('agent', 'pickuppoint', 'employee', 'accountingperiod')
+ADMIN_CHANGELISTS = (
+    'reference_books_employee',
+    'documents_workschedule',
+    'documents_workshift',
+    'reports_workschedulereport',
+)
+
+
+class Command(BaseCommand):
+    """
+    Команда для замера времени горячих путей на синтетических данных нескольких объемов.
+
+    Для каждого масштаба из --scales данные создаются функцией documents.seeding.seed_data
+    (два месяца графиков, заканчивая текущим, чтобы отчеты за последние 30 дней были непустыми),
+    замеряются горячие пути, после чего транзакция откатывается и база не изменяется.
+    Кэш справочников внутри транзакции с изменениями не используется, поэтому замеры
+    соответствуют холодному кэшу. Данные, уже находящиеся в базе, участвуют в замерах, поэтому
+    сравнимые результаты получаются на одной и той же (например, пустой) базе.
+
+    Замеряются: WorkSchedule.check_conflicts, WorkSchedule.approve_schedule, generate_work_schedule_report
+    (с пересчетом и с готовым отчетом), первые страницы списков API справочников и списки
+    изменения в админке. Для каждого пути сохраняются min/mean/p50/p95/p99/max в миллисекундах
+    и наибольшее количество SQL-запросов. Результаты пишутся в JSON (--output);
+    с --compare выводится отношение медиан к результатам предыдущего запуска.
+
+    Пример:
+        python manage.py benchmark_hot_paths --scales 0.2,1,5 --repeat 10 --compare benchmarks/baseline.json
+    """
+    help = 'Замеряет горячие пути на синтетических данных нескольких объемов и сохраняет результаты в JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', default='0.2,1', help='Масштабы данных через запятую (см. seed_data)')
+        parser.add_argument('--repeat', type=int, default=5, help='Количество повторов каждого замера')
+        parser.add_argument('--seed', type=int, default=1000, help='Зерно синтетических данных')
+        parser.add_argument('--output', help='Файл результатов (по умолчанию benchmarks/hot_paths-<время>.json)')
+        parser.add_argument('--compare', help='Файл результатов предыдущего запуска для сравнения')
+
+    def handle(self, *args, **options):
+        try:
+            scales = [float(scale) for scale in options['scales'].split(',') if scale.strip()]
+        except ValueError:
+            raise CommandError('--scales: ожидаются числа через запятую, например 0.2,1')
+        if not scales or options['repeat'] < 1:
+            raise CommandError('Укажите хотя бы один масштаб и положительное количество повторов')
+        baseline = self.load_baseline(options['compare']) if options['compare'] else {}
+
+        runs = []
+        for scale in scales:
+            with transaction.atomic():
+                started = time.perf_counter()
+                try:
+                    counts = seed_data(scale, options['seed'], *self.get_seed_period())
+                except SeedError as error:
+                    raise CommandError(f'{error}. Укажите другое зерно (--seed)')
+                seed_seconds = round(time.perf_counter() - started, 3)
+                results = self.run_benchmarks(options['seed'], options['repeat'])
+                transaction.set_rollback(True)
+            runs.append({'scale': scale, 'counts': counts, 'seed_seconds': seed_seconds, 'results': results})
+            self.print_run(runs[-1], baseline)
+
+        output = Path(options['output'] or Path(settings.BASE_DIR) / 'benchmarks'
+                      / f'hot_paths-{datetime.now():%Y%m%d-%H%M%S}.json')
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps({
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'environment': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'sqlite': sqlite3.sqlite_version,
+            },
+            'seed': options['seed'],
+            'repeat': options['repeat'],
+            'runs': runs,
+        }, ensure_ascii=False, indent=2), encoding='utf-8')
+        self.stdout.write(f'Результаты сохранены в {output}')
+
+    def get_seed_period(self):
+        """
+        Возвращает дату начала и количество месяцев данных: предыдущий и текущий месяцы.
+        """
+        previous_month = date.today().replace(day=1) - timedelta(days=1)
+        return previous_month.replace(day=1), 2
+
+    def load_baseline(self, path):
+        """
+        Загружает медианы предыдущего запуска.
+
+        Возвращает:
+            dict: {(масштаб, имя замера): p50_ms}.
+        """
+        try:
+            data = json.loads(Path(path).read_text(encoding='utf-8'))
+        except (OSError, ValueError) as error:
+            raise CommandError(f'Не удалось прочитать {path}: {error}')
+        return {
+            (run['scale'], name): result['p50_ms']
+            for run in data.get('runs', []) for name, result in run['results'].items()
+        }
+
+    def measure(self, repeat, func):
+        """
+        Выполняет func(i) repeat раз и возвращает сводку по времени и количеству SQL-запросов.
+        """
+        durations, queries = [], 0
+        for i in range(repeat):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                func(i)
+                durations.append(time.perf_counter() - started)
+            queries = max(queries, len(captured))
+        return {**summarize_durations(durations), 'queries': queries}
+
+    def get(self, client, url):
+        """
+        Выполняет GET-запрос и проверяет, что ответ успешный.
+        """
+        response = client.get(url)
+        if response.status_code != 200:
+            raise CommandError(f'{url}: ответ {response.status_code}')
+        return response
+
+    def run_benchmarks(self, seed, repeat):
+        """
+        Замеряет горячие пути на созданных данных.
+
+        Возвращает:
+            dict: Сводки замеров по именам.
+        """
+        seeded = {'employee__email__endswith': f'.s{seed}@seed.example.com'}
+        schedules = list(WorkSchedule.objects.filter(**seeded).order_by('id')[:repeat])
+        drafts = list(WorkSchedule.objects.filter(status='draft', **seeded).order_by('id')[:repeat])
+        employee_ids = list(Employee.objects.filter(email__endswith=seeded['employee__email__endswith'])
+                            .order_by('id').values_list('id', flat=True)[:repeat])
+
+        user = User.objects.create_superuser(f'benchmark-{seed}', f'benchmark-{seed}@example.com', None)
+        client = Client(HTTP_HOST=get_host())
+        client.force_login(user)
+        api_client = APIClient(HTTP_HOST=get_host())
+        api_client.force_authenticate(user)
+
+        results = {
+            'check_conflicts': self.measure(repeat, lambda i: schedules[i % len(schedules)].check_conflicts()),
+            # Утверждаются разные черновики; если их меньше repeat, повторно утверждаются уже утвержденные
+            'approve_schedule': self.measure(repeat, lambda i: drafts[i % len(drafts)].approve_schedule()),
+            'generate_work_schedule_report': self.measure(repeat, lambda i: self.get(
+                client, reverse('generate_report', args=[employee_ids[i % len(employee_ids)]])
+            )),
+            'generate_work_schedule_report (готовый отчет)': self.measure(repeat, lambda i: self.get(
+                client, reverse('generate_report', args=[employee_ids[0]])
+            )),
+        }
+        for basename in API_LISTS:
+            url = reverse(f'reference_books_api:{basename}-list')
+            results[f'api {url}'] = self.measure(repeat, lambda i: self.get(api_client, url))
+        for changelist in ADMIN_CHANGELISTS:
+            url = reverse(f'admin:{changelist}_changelist')
+            results[f'admin {url}'] = self.measure(repeat, lambda i: self.get(client, url))
+        return results
+
+    def print_run(self, run, baseline):
+        """
+        Выводит результаты замеров одного масштаба (и отношение медиан к предыдущему запуску).
+        """
+        counts = ', '.join(f'{model}: {count}' for model, count in run['counts'].items())
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Масштаб {run['scale']} ({counts})"))
+        self.stdout.write(
+            f"  {'Замер':55} {'p50, мс':>9} {'p95, мс':>9} {'ср., мс':>9} {'SQL':>5}"
+            + (f" {'к базовому':>10}" if baseline else '')
+        )
+        for name, result in run['results'].items():
+            line = (f"  {name:55} {result['p50_ms']:9.2f} {result['p95_ms']:9.2f} "
+                    f"{result['mean_ms']:9.2f} {result['queries']:5}")
+            previous = baseline.get((run['scale'], name))
+            if previous:
+                line += f" {result['p50_ms'] / previous:9.2f}x"
+            self.stdout.write(line)
@@ -0,0 +1,58 @@
+# documents/management/commands/check_double_bookings.py
+
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from reference_books.models import Agent
+from documents.conflicts import scan_double_bookings
+
+
+class Command(BaseCommand):
+    """
+    Команда для поиска двойных бронирований сотрудников по всем графикам работы.
+
+    Пример:
+        python manage.py check_double_bookings --agent 1 --start-date 2024-08-01 --end-date 2024-08-31
+    """
+    help = 'Ищет пересекающиеся смены одного сотрудника во всех графиках работы'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--agent', type=int, help='ID агента, смены сотрудников которого проверяются')
+        parser.add_argument('--start-date', help='Дата начала периода (YYYY-MM-DD)')
+        parser.add_argument('--end-date', help='Дата окончания периода (YYYY-MM-DD)')
+
+    def parse_date(self, value, name):
+        """
+        Разбирает дату параметра (YYYY-MM-DD); при вызове через call_command дата может быть передана объектом date.
+
+        Исключения:
+            CommandError: Если дата задана в неверном формате.
+        """
+        if value is None or isinstance(value, date):
+            return value
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise CommandError(f'Неверная дата {name} "{value}", ожидается YYYY-MM-DD')
+
+    def handle(self, *args, **options):
+        agent = None
+        if options['agent'] is not None:
+            try:
+                agent = Agent.objects.get(pk=options['agent'])
+            except Agent.DoesNotExist:
+                raise CommandError(f"Агент с id={options['agent']} не найден")
+
+        start_date = self.parse_date(options['start_date'], '--start-date')
+        end_date = self.parse_date(options['end_date'], '--end-date')
+        if start_date and end_date and start_date > end_date:
+            raise CommandError('Дата начала периода позже даты окончания')
+
+        count = 0
+        for shift_a, shift_b in scan_double_bookings(agent, start_date, end_date):
+            count += 1
+            self.stdout.write(
+                f"Сотрудник {shift_a.employee_id}, {shift_a.date}: "
+                f"смена #{shift_a.id} ({shift_a.start_time}-{shift_a.end_time}, график #{shift_a.schedule_id}) "
+                f"пересекается со сменой #{shift_b.id} ({shift_b.start_time}-{shift_b.end_time}, график #{shift_b.schedule_id})"
+            )
+        self.stdout.write(self.style.SUCCESS(f'Найдено пересечений: {count}'))
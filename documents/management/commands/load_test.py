@@ -0,0 +1,214 @@
+# documents/management/commands/load_test.py
+
+import json
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, time as day_time, timedelta
+from pathlib import Path
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from core.loadgen import run_worker, summarize_results
+from documents.models import WorkSchedule
+from reference_books.models import Employee
+
+DEFAULT_MIX = 'api=50,create_shift=15,approve=10,report=25'
+API_LISTS = ('agent', 'employee', 'pickuppoint')
+# Количество объектов, из которых составляются запросы каждого вида
+POOL_SIZE = 200
+
+
+class Command(BaseCommand):
+    """
+    Команда нагрузочного тестирования: воспроизводит смесь запросов из пула потоков или процессов
+    и выводит пропускную способность, задержки p50/p95/p99 и долю ошибок по видам запросов.
+
+    Виды запросов (--mix задает их веса):
+        api - первые страницы списков API справочников (агенты, сотрудники, пункты выдачи);
+        create_shift - создание смены в черновике графика (POST формы, со случайными датой и временем,
+            часть запросов отклоняется из-за конфликтов смен - это не ошибка);
+        approve - утверждение графика;
+        report - формирование отчета по графику сотрудника.
+
+    Запросы выполняются тестовым клиентом Django в процессе (--target client) или по HTTP
+    к запущенному серверу (--target http://127.0.0.1:8000). Каждый из --workers пользователей
+    выполняет запросы последовательно, без пауз. Ошибки блокировки SQLite ("database is locked")
+    учитываются отдельно. Команда изменяет данные (создает смены и утверждает графики),
+    поэтому запускайте ее на копии базы, например после seed_data.
+
+    Пример:
+        python manage.py load_test --workers 8 --mode process --duration 30 --mix api=70,create_shift=30
+    """
+    help = 'Нагружает приложение смесью запросов и выводит задержки и ошибки по видам запросов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', default='client',
+                            help='client - тестовый клиент Django, иначе адрес сервера (http://host:port)')
+        parser.add_argument('--workers', type=int, default=4, help='Количество одновременных пользователей')
+        parser.add_argument('--mode', choices=('thread', 'process'), default='thread',
+                            help='Пользователи - потоки или процессы')
+        parser.add_argument('--requests', type=int, default=500, help='Общее количество запросов')
+        parser.add_argument('--duration', type=float,
+                            help='Продолжительность нагрузки в секундах (ограничивает --requests)')
+        parser.add_argument('--mix', default=DEFAULT_MIX, help='Веса видов запросов, например api=50,report=50')
+        parser.add_argument('--seed', type=int, default=0, help='Зерно генератора случайных чисел')
+        parser.add_argument('--output', help='Файл для сохранения результатов в JSON')
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1 or options['requests'] < 1:
+            raise CommandError('Количество пользователей и запросов должно быть положительным')
+        if options['target'] != 'client' and not options['target'].startswith(('http://', 'https://')):
+            raise CommandError('--target: укажите client или адрес сервера http://host:port')
+        mix = self.parse_mix(options['mix'])
+        plan = self.build_plan(mix, random.Random(options['seed']))
+        headers = {'Authorization': f'Token {self.get_token()}'}
+
+        workers = options['workers']
+        counts = [options['requests'] // workers + (i < options['requests'] % workers) for i in range(workers)]
+        # Соединения не должны наследоваться дочерними процессами
+        connections.close_all()
+        executor = ProcessPoolExecutor if options['mode'] == 'process' else ThreadPoolExecutor
+        started = time.perf_counter()
+        with executor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(run_worker, i, options['target'], plan, counts[i], options['duration'],
+                            options['seed'], headers, reverse('create_schedule'))
+                for i in range(workers)
+            ]
+            results = [result for future in futures for result in future.result()]
+        elapsed = time.perf_counter() - started
+
+        summary = summarize_results(results, elapsed)
+        self.print_summary(summary, elapsed)
+        if options['output']:
+            output = Path(options['output'])
+            output.parent.mkdir(parents=True, exist_ok=True)
+            output.write_text(json.dumps({
+                'created_at': datetime.now().isoformat(timespec='seconds'),
+                'target': options['target'],
+                'mode': options['mode'],
+                'workers': workers,
+                'mix': mix,
+                'database': str(settings.DATABASES['default']['NAME']),
+                'elapsed_seconds': round(elapsed, 3),
+                'endpoints': summary,
+            }, ensure_ascii=False, indent=2), encoding='utf-8')
+            self.stdout.write(f'Результаты сохранены в {output}')
+
+    def parse_mix(self, value):
+        """
+        Разбирает веса видов запросов из строки вида 'api=50,report=25'.
+
+        Возвращает:
+            dict: {вид запроса: вес}.
+        """
+        mix = {}
+        for item in value.split(','):
+            name, _, weight = item.partition('=')
+            name = name.strip()
+            if name not in ('api', 'create_shift', 'approve', 'report'):
+                raise CommandError(f'--mix: неизвестный вид запроса {name!r}')
+            try:
+                mix[name] = float(weight)
+            except ValueError:
+                raise CommandError(f'--mix: неверный вес {weight!r} для {name}')
+        mix = {name: weight for name, weight in mix.items() if weight > 0}
+        if not mix:
+            raise CommandError('--mix: укажите хотя бы один вид запроса с положительным весом')
+        return mix
+
+    def get_token(self):
+        """
+        Возвращает токен API пользователя нагрузочного теста (создает пользователя при необходимости).
+        """
+        user, created = User.objects.get_or_create(username='loadtest', defaults={'email': 'loadtest@example.com'})
+        if created:
+            user.set_unusable_password()
+            user.save(update_fields=['password'])
+        token, _ = Token.objects.get_or_create(user=user)
+        return token.key
+
+    def build_plan(self, mix, rng):
+        """
+        Заранее составляет запросы каждого вида по данным базы, чтобы во время нагрузки
+        не выполнялись лишние запросы к базе.
+
+        Возвращает:
+            list: Словари {'name', 'weight', 'requests': [(метод, путь, данные), ...]}.
+
+        Исключения:
+            CommandError: Если для вида запросов в базе нет данных.
+        """
+        plan = []
+        for name, weight in mix.items():
+            requests = getattr(self, f'build_{name}_requests')(rng)
+            if not requests:
+                raise CommandError(f'Нет данных для запросов {name}: заполните базу командой seed_data')
+            plan.append({'name': name, 'weight': weight, 'requests': requests})
+        return plan
+
+    def build_api_requests(self, rng):
+        """
+        Возвращает запросы первых страниц списков API справочников.
+        """
+        return [('GET', reverse(f'reference_books_api:{basename}-list'), None) for basename in API_LISTS]
+
+    def build_create_shift_requests(self, rng):
+        """
+        Возвращает запросы создания смен в последних черновиках графиков.
+        """
+        requests = []
+        schedules = WorkSchedule.objects.filter(status='draft').order_by('-id')[:POOL_SIZE]
+        for schedule in schedules.only('id', 'employee_id', 'start_date', 'end_date'):
+            day = schedule.start_date + timedelta(days=rng.randint(0, (schedule.end_date - schedule.start_date).days))
+            start = rng.randint(8, 14)
+            requests.append(('POST', reverse('create_shift', args=[schedule.id]), {
+                'schedule': schedule.id,
+                'employee': schedule.employee_id,
+                'date': day.isoformat(),
+                'start_time': day_time(start).strftime('%H:%M'),
+                'end_time': day_time(start + rng.randint(4, 9)).strftime('%H:%M'),
+            }))
+        return requests
+
+    def build_approve_requests(self, rng):
+        """
+        Возвращает запросы утверждения черновиков графиков (повторное утверждение допустимо).
+        """
+        schedule_ids = WorkSchedule.objects.filter(status='draft').order_by('id').values_list('id', flat=True)
+        return [('GET', reverse('approve_schedule', args=[pk]), None) for pk in schedule_ids[:POOL_SIZE]]
+
+    def build_report_requests(self, rng):
+        """
+        Возвращает запросы отчетов по сотрудникам, у которых есть графики.
+        """
+        employee_ids = Employee.objects.filter(workschedule__isnull=False).distinct().order_by('-id')
+        return [
+            ('GET', reverse('generate_report', args=[pk]), None)
+            for pk in employee_ids.values_list('id', flat=True)[:POOL_SIZE]
+        ]
+
+    def print_summary(self, summary, elapsed):
+        """
+        Выводит таблицу результатов по видам запросов и итоговую строку.
+        """
+        self.stdout.write(
+            f"{'Запросы':14} {'Кол-во':>7} {'Запр/с':>8} {'p50, мс':>9} {'p95, мс':>9} {'p99, мс':>9} "
+            f"{'Ошибок, %':>10} {'Блокировок':>10}"
+        )
+        for name, result in summary.items():
+            line = (
+                f"{name:14} {result['requests']:7} {result['throughput']:8.1f} {result['p50_ms']:9.1f} "
+                f"{result['p95_ms']:9.1f} {result['p99_ms']:9.1f} {result['error_rate'] * 100:10.1f} "
+                f"{result['errors'].get('sqlite_locked', 0):10}"
+            )
+            self.stdout.write(self.style.MIGRATE_HEADING(line) if name == 'total' else line)
+        for name, result in summary.items():
+            if name != 'total' and result['errors']:
+                errors = ', '.join(f'{error}: {count}' for error, count in result['errors'].items())
+                self.stdout.write(f'  {name}: {errors}')
+        self.stdout.write(f'Общее время: {elapsed:.2f} с')
@@ -0,0 +1,50 @@
+# Generated by Django 5.1 on 2026-10-18 19:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('reference_books', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkSchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('status', models.CharField(choices=[('draft', 'Черновик'), ('on_approval', 'На утверждении'), ('approved', 'Утверждено'), ('rejected', 'Отклонено')], default='draft', max_length=20)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='reference_books.employee')),
+                ('pickup_point', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='reference_books.pickuppoint')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='WorkShift',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('status', models.CharField(choices=[('draft', 'Черновик'), ('in_review', 'На согласовании'), ('approved', 'Утвержден'), ('rejected', 'Отклонен')], default='draft', max_length=50)),
+                ('date', models.DateField()),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('is_approved', models.BooleanField(default=False)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='reference_books.employee')),
+                ('schedule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shifts', to='documents.workschedule')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['employee', 'date', 'start_time', 'end_time'], name='workshift_employee_time_idx')],
+            },
+        ),
+    ]
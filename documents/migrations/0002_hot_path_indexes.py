@@ -0,0 +1,30 @@
+# Generated by Django 5.1 on 2026-10-18 19:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0001_initial'),
+        ('reference_books', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='workschedule',
+            index=models.Index(fields=['pickup_point', 'start_date', 'end_date'], name='workschedule_point_period_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workschedule',
+            index=models.Index(fields=['employee', 'start_date'], name='workschedule_employee_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workshift',
+            index=models.Index(fields=['schedule', 'date', 'start_time'], name='workshift_schedule_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workshift',
+            index=models.Index(condition=models.Q(('is_approved', True)), fields=['employee', 'date'], name='workshift_approved_idx'),
+        ),
+    ]
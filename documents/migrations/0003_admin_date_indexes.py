@@ -0,0 +1,22 @@
+# Generated by Django 5.1 on 2026-10-18 20:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0002_hot_path_indexes'),
+        ('reference_books', '0004_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='workschedule',
+            index=models.Index(fields=['start_date'], name='workschedule_start_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workshift',
+            index=models.Index(fields=['date'], name='workshift_date_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1 on 2026-10-18 20:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0003_admin_date_indexes'),
+        ('reference_books', '0005_updated_at_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='workshift',
+            name='workshift_approved_idx',
+        ),
+        migrations.AlterField(
+            model_name='workschedule',
+            name='employee',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='reference_books.employee'),
+        ),
+        migrations.AlterField(
+            model_name='workschedule',
+            name='pickup_point',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='reference_books.pickuppoint'),
+        ),
+        migrations.AlterField(
+            model_name='workshift',
+            name='employee',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='reference_books.employee'),
+        ),
+        migrations.AlterField(
+            model_name='workshift',
+            name='schedule',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='shifts', to='documents.workschedule'),
+        ),
+    ]
@@ -1,8 +1,41 @@
 # documents/models.py
 
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 from core.models import Document
 from reference_books.models import Employee, PickupPoint
+from .conflicts import find_overlapping_shifts
+from .signals import shifts_bulk_updated
+
+class WorkScheduleQuerySet(models.QuerySet):
+    """
+    Набор графиков работы с массовыми операциями над статусом.
+    """
+
+    def approve(self):
+        """
+        Утверждает все графики набора и все их смены двумя UPDATE-запросами в одной транзакции.
+
+        Возвращает:
+            int: Количество утвержденных графиков.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            schedule_ids = list(self.values_list('id', flat=True))
+            shifts = WorkShift.objects.filter(schedule_id__in=schedule_ids)
+            shifts.update(is_approved=True, updated_at=now)
+            shifts_bulk_updated.send(sender=WorkShift, shifts=shifts)
+            return WorkSchedule.objects.filter(id__in=schedule_ids).update(status='approved', updated_at=now)
+
+    def reject(self):
+        """
+        Отклоняет все графики набора одним UPDATE-запросом.
+
+        Возвращает:
+            int: Количество отклоненных графиков.
+        """
+        return self.update(status='rejected', updated_at=timezone.now())
+
 
 class WorkSchedule(Document):
     """
@@ -22,24 +55,38 @@ class WorkSchedule(Document):
         ('rejected', 'Отклонено'),
     ]
 
-    employee = models.ForeignKey(Employee, on_delete=models.CASCADE)
-    pickup_point = models.ForeignKey(PickupPoint, on_delete=models.CASCADE)
+    # Индексы внешних ключей заменяют составные индексы Meta.indexes с теми же первыми столбцами
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, db_index=False)
+    pickup_point = models.ForeignKey(PickupPoint, on_delete=models.CASCADE, db_index=False)
     start_date = models.DateField()
     end_date = models.DateField()
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
 
+    objects = WorkScheduleQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Графики пункта выдачи, пересекающиеся с периодом
+            models.Index(fields=['pickup_point', 'start_date', 'end_date'], name='workschedule_point_period_idx'),
+            # Графики сотрудника за период
+            models.Index(fields=['employee', 'start_date'], name='workschedule_employee_idx'),
+            # Сортировка и навигация по датам в админке
+            models.Index(fields=['start_date'], name='workschedule_start_date_idx'),
+        ]
+
     def __str__(self):
         return f"{self.employee} - {self.start_date} to {self.end_date} ({self.status})"
     
     def approve_schedule(self):
         """
         Утверждает все смены в графике. Изменяет статус графика на 'approved'.
+        Смены утверждаются одним UPDATE-запросом в той же транзакции, что и сохранение графика.
         """
-        for shift in self.shifts.all():
-            shift.is_approved = True
-            shift.save()
-        self.status = 'approved'
-        self.save()
+        with transaction.atomic():
+            self.shifts.update(is_approved=True, updated_at=timezone.now())
+            shifts_bulk_updated.send(sender=WorkShift, shifts=self.shifts.all())
+            self.status = 'approved'
+            self.save()
 
     def reject_schedule(self):
         """
@@ -48,18 +95,36 @@ class WorkSchedule(Document):
         self.status = 'rejected'
         self.save()
 
-    def check_conflicts(self):
+    def check_conflicts(self, new_shifts=None):
         """
         Проверяет пересечения смен в графике.
         Возвращает True, если конфликтов нет.
+
+        Аргументы:
+            new_shifts (iterable): Необязательный набор добавляемых смен, которые проверяются вместе с графиком.
+        """
+        return not self.find_conflicts(new_shifts)
+
+    def find_conflicts(self, new_shifts=None):
         """
-        shifts = list(self.shifts.all())
-        for i in range(len(shifts)):
-            for j in range(i + 1, len(shifts)):
-                if (shifts[i].date == shifts[j].date and
-                    not (shifts[i].end_time <= shifts[j].start_time or shifts[j].end_time <= shifts[i].start_time)):
-                    return False
-        return True
+        Находит пересекающиеся смены в графике.
+
+        Если переданы new_shifts, из базы загружаются только смены графика на те же даты,
+        а в результат попадают только конфликты с участием новых смен.
+
+        Аргументы:
+            new_shifts (iterable): Необязательный набор добавляемых (или изменяемых) смен.
+
+        Возвращает:
+            list: Список пар (shift_a, shift_b) пересекающихся смен.
+        """
+        shifts = self.shifts.all()
+        if new_shifts is not None:
+            new_shifts = list(new_shifts)
+            shifts = shifts.filter(date__in={shift.date for shift in new_shifts}).exclude(
+                pk__in=[shift.pk for shift in new_shifts if shift.pk is not None]
+            )
+        return find_overlapping_shifts(shifts, new_shifts)
 
 
 class WorkShift(Document):
@@ -74,13 +139,25 @@ class WorkShift(Document):
         end_time (TimeField): Время окончания смены.
         is_approved (BooleanField): Статус утверждения смены.
     """
-    schedule = models.ForeignKey(WorkSchedule, related_name='shifts', on_delete=models.CASCADE)
-    employee = models.ForeignKey(Employee, on_delete=models.CASCADE)
+    # Отдельные индексы внешних ключей не создаются: их заменяют составные индексы Meta.indexes
+    # с теми же первыми столбцами, а каждый лишний индекс замедляет добавление и утверждение смен
+    schedule = models.ForeignKey(WorkSchedule, related_name='shifts', on_delete=models.CASCADE, db_index=False)
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, db_index=False)
     date = models.DateField()
     start_time = models.TimeField()
     end_time = models.TimeField()
     is_approved = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # Поиск пересечений смен сотрудника по всем графикам и утвержденные смены сотрудника за период (отчеты)
+            models.Index(fields=['employee', 'date', 'start_time', 'end_time'], name='workshift_employee_time_idx'),
+            # Проверка пересечений внутри графика и выборка смен графика за период
+            models.Index(fields=['schedule', 'date', 'start_time'], name='workshift_schedule_date_idx'),
+            # Сортировка и навигация по датам в админке
+            models.Index(fields=['date'], name='workshift_date_idx'),
+        ]
+
     def __str__(self):
         return f"{self.employee} - {self.date} {self.start_time} to {self.end_time}"
     
@@ -0,0 +1,152 @@
+# documents/recurrence.py
+
+from collections import defaultdict
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Q
+from reference_books.models import ShiftTemplate
+from .conflicts import find_employee_double_bookings
+from .models import WorkShift
+from .signals import shifts_bulk_updated
+
+GENERATION_BATCH_SIZE = 1000  # строк на один INSERT при bulk_create
+
+
+class ShiftGeneration:
+    """
+    Результат заполнения графиков сменами по шаблонам.
+
+    Атрибуты:
+        shifts (list): Смены без конфликтов (при записи - созданные).
+        skipped (list): Смены, пропущенные из-за пересечения с уже существующими сменами сотрудника
+            или с более ранней сгенерированной сменой того же сотрудника.
+        schedules_without_template (list): ID графиков, для которых не найден шаблон.
+        preview (bool): True, если результат вычислен без записи в базу.
+    """
+
+    def __init__(self, shifts, skipped, schedules_without_template, preview):
+        self.shifts = shifts
+        self.skipped = skipped
+        self.schedules_without_template = schedules_without_template
+        self.preview = preview
+
+
+def select_templates(schedules):
+    """
+    Подбирает шаблон для каждого графика одним запросом.
+
+    Приоритет: шаблон сотрудника и пункта выдачи графика, затем шаблон только сотрудника,
+    затем шаблон только пункта выдачи. При нескольких шаблонах одного уровня
+    используется последний созданный.
+
+    Аргументы:
+        schedules (list): Графики работы.
+
+    Возвращает:
+        dict: Словарь {schedule.id: ShiftTemplate}.
+    """
+    employee_ids = {schedule.employee_id for schedule in schedules}
+    pickup_point_ids = {schedule.pickup_point_id for schedule in schedules}
+    templates = {}
+    for template in ShiftTemplate.objects.filter(is_active=True).filter(
+        Q(employee_id__in=employee_ids, pickup_point_id__in=pickup_point_ids)
+        | Q(employee_id__in=employee_ids, pickup_point__isnull=True)
+        | Q(employee__isnull=True, pickup_point_id__in=pickup_point_ids)
+    ).order_by('id'):
+        templates[(template.employee_id, template.pickup_point_id)] = template
+
+    selected = {}
+    for schedule in schedules:
+        for key in ((schedule.employee_id, schedule.pickup_point_id),
+                    (schedule.employee_id, None),
+                    (None, schedule.pickup_point_id)):
+            if key in templates:
+                selected[schedule.id] = templates[key]
+                break
+    return selected
+
+
+def expand_template(template, schedule, cycle=None):
+    """
+    Разворачивает шаблон в несохраненные смены графика за период start_date - end_date.
+
+    Аргументы:
+        template (ShiftTemplate): Шаблон смен.
+        schedule (WorkSchedule): График работы.
+        cycle (list): Необязательный заранее разобранный цикл шаблона (см. ShiftTemplate.get_cycle).
+
+    Возвращает:
+        list: Несохраненные экземпляры WorkShift.
+    """
+    cycle = cycle if cycle is not None else template.get_cycle()
+    shifts = []
+    day = schedule.start_date
+    while day <= schedule.end_date:
+        for start_time, end_time in cycle[(day - template.anchor_date).days % len(cycle)]:
+            shifts.append(WorkShift(
+                schedule=schedule, employee_id=schedule.employee_id,
+                date=day, start_time=start_time, end_time=end_time,
+            ))
+        day += timedelta(days=1)
+    return shifts
+
+
+def generate_shifts(schedules, preview=False):
+    """
+    Заполняет графики сменами по шаблонам одной массовой операцией.
+
+    Шаблоны подбираются одним запросом, смены строятся в памяти, пересечения
+    с уже существующими сменами сотрудников и между новыми сменами проверяются одним запросом
+    (find_employee_double_bookings). Смены, пересекающиеся с существующими, пропускаются;
+    из пересекающихся новых смен сохраняется первая (в порядке графиков), остальные пропускаются.
+    Без preview смены создаются через bulk_create в одной транзакции, после чего
+    отправляется сигнал shifts_bulk_updated для обновления регистра и отчетов.
+
+    Аргументы:
+        schedules (iterable): Графики работы.
+        preview (bool): Если True, смены только вычисляются, в базу ничего не записывается.
+
+    Возвращает:
+        ShiftGeneration: Результат заполнения.
+    """
+    schedules = list(schedules)
+    templates = select_templates(schedules)
+    cycles = {}
+    shifts = []
+    for schedule in schedules:
+        template = templates.get(schedule.id)
+        if template is not None:
+            if template.id not in cycles:
+                cycles[template.id] = template.get_cycle()
+            shifts.extend(expand_template(template, schedule, cycles[template.id]))
+
+    # Смена пропускается, если пересекается с существующей сменой сотрудника или с уже принятой
+    # сгенерированной (например, графики сотрудника в двух пунктах): из двух новых смен остается первая
+    blocked = set()
+    new_partners = defaultdict(list)
+    for shift_a, shift_b in find_employee_double_bookings(shifts):
+        if shift_a.pk is not None:
+            blocked.add(id(shift_b))
+        elif shift_b.pk is not None:
+            blocked.add(id(shift_a))
+        else:
+            new_partners[id(shift_a)].append(shift_b)
+            new_partners[id(shift_b)].append(shift_a)
+    accepted = set()
+    kept, skipped = [], []
+    for shift in shifts:
+        if id(shift) in blocked or any(id(other) in accepted for other in new_partners[id(shift)]):
+            skipped.append(shift)
+        else:
+            accepted.add(id(shift))
+            kept.append(shift)
+    shifts = kept
+    without_template = [schedule.id for schedule in schedules if schedule.id not in templates]
+
+    if not preview and shifts:
+        with transaction.atomic():
+            WorkShift.objects.bulk_create(shifts, batch_size=GENERATION_BATCH_SIZE)
+            shifts_bulk_updated.send(
+                sender=WorkShift, shifts=WorkShift.objects.filter(schedule_id__in=list(templates))
+            )
+    return ShiftGeneration(shifts, skipped, without_template, preview)
@@ -0,0 +1,161 @@
+# documents/seeding.py
+
+import random
+from calendar import monthrange
+from datetime import date, time, timedelta
+from django.db import transaction
+from reference_books.models import Agent, PickupPoint, Employee, AccountingPeriod
+from .models import WorkSchedule, WorkShift
+from .signals import shifts_bulk_updated
+
+# Объемы при масштабе 1: 5 агентов, 100 пунктов выдачи, 800 сотрудников, ~14 тыс. смен в месяц
+AGENTS_PER_SCALE = 5
+POINTS_PER_AGENT = 20
+EMPLOYEES_PER_POINT = 8
+SEED_BATCH_SIZE = 2000
+
+FIRST_NAMES = ('Иван', 'Петр', 'Алексей', 'Мария', 'Анна', 'Ольга', 'Дмитрий', 'Елена', 'Сергей', 'Наталья')
+MIDDLE_NAMES = ('Иванович', 'Петрович', 'Сергеевна', 'Алексеевна', 'Дмитриевич', 'Андреевна', None)
+LAST_NAMES = ('Иванов', 'Петров', 'Смирнов', 'Кузнецов', 'Попов', 'Васильев', 'Соколов', 'Михайлов',
+              'Новиков', 'Федоров', 'Морозов', 'Волков', 'Алексеев', 'Лебедев', 'Семенов', 'Егоров')
+STREETS = ('Ленина', 'Мира', 'Садовая', 'Советская', 'Гагарина', 'Лесная', 'Школьная', 'Молодежная')
+POSITIONS = ('Оператор', 'Старший оператор', 'Кладовщик', 'Администратор')
+SHIFT_TIMES = ((time(9), time(18)), (time(9), time(21)), (time(12), time(21)), (time(10), time(19)))
+# Циклы смен: 1 - рабочий день, 0 - выходной
+SHIFT_CYCLES = ((1, 1, 0, 0), (1, 1, 1, 1, 1, 0, 0), (1, 1, 1, 0, 0, 0))
+
+
+class SeedError(ValueError):
+    """
+    Ошибка заполнения базы: данные с тем же зерном уже созданы или параметры неверны.
+    """
+
+
+def get_volumes(scale):
+    """
+    Возвращает количество агентов, пунктов выдачи на агента и сотрудников на пункт для масштаба.
+
+    Масштабируется количество агентов (не меньше одного), структура агента не меняется;
+    при масштабе меньше 1/AGENTS_PER_SCALE уменьшается количество пунктов выдачи у агента.
+    """
+    if scale <= 0:
+        raise SeedError('Масштаб должен быть положительным')
+    agents = max(1, round(AGENTS_PER_SCALE * scale))
+    points = max(1, min(POINTS_PER_AGENT, round(POINTS_PER_AGENT * AGENTS_PER_SCALE * scale)))
+    return agents, points, EMPLOYEES_PER_POINT
+
+
+def month_starts(start, months):
+    """
+    Возвращает первые дни months месяцев, начиная с месяца даты start.
+    """
+    year, month = start.year, start.month
+    for _ in range(months):
+        yield date(year, month, 1)
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def seed_data(scale=1, seed=0, start=date(2024, 8, 1), months=1):
+    """
+    Заполняет базу синтетическими данными: Agent -> PickupPoint -> Employee -> WorkSchedule -> WorkShift.
+
+    Данные детерминированы зерном seed: при одинаковых параметрах создаются одинаковые записи.
+    Адреса email и телефоны содержат зерно, поэтому наборы с разными зернами не пересекаются.
+    Сотрудник получает по графику в месяц в своем пункте выдачи, смены строятся по одному
+    из циклов SHIFT_CYCLES (не больше одной смены в день, без пересечений). Графики всех месяцев,
+    кроме последнего, утверждены вместе со сменами; графики последнего месяца - черновики.
+    Записи создаются через bulk_create в одной транзакции, регистр DailyWorkHours обновляется
+    сигналом shifts_bulk_updated.
+
+    Аргументы:
+        scale (float): Масштаб объемов (см. get_volumes).
+        seed (int): Зерно генератора случайных чисел.
+        start (date): Дата в первом месяце графиков.
+        months (int): Количество месяцев графиков.
+
+    Возвращает:
+        dict: Количество созданных записей по моделям.
+
+    Исключения:
+        SeedError: Если данные с этим зерном уже есть или параметры неверны.
+    """
+    if months < 1:
+        raise SeedError('Количество месяцев должно быть положительным')
+    agent_count, point_count, employee_count = get_volumes(scale)
+    rng = random.Random(seed)
+    tag = f's{seed}'
+    if Agent.objects.filter(email__endswith=f'.{tag}@seed.example.com').exists():
+        raise SeedError(f'Данные с зерном {seed} уже созданы')
+    periods = [
+        (first, first.replace(day=monthrange(first.year, first.month)[1]))
+        for first in month_starts(start, months)
+    ]
+
+    with transaction.atomic():
+        agents = Agent.objects.bulk_create([
+            Agent(
+                name=f'Агент {i + 1} ({tag})', email=f'agent{i}.{tag}@seed.example.com',
+                phone_number=f'9{seed % 10 ** 7:07d}{i:07d}'
+            )
+            for i in range(agent_count)
+        ])
+        points = PickupPoint.objects.bulk_create([
+            PickupPoint(
+                name=f'ПВЗ {i + 1}-{j + 1} ({tag})', agent=agent,
+                address=f'ул. {rng.choice(STREETS)}, д. {rng.randint(1, 150)}',
+                opening_time=time(rng.choice((8, 9, 10))), closing_time=time(rng.choice((20, 21, 22))),
+                required_staff=rng.choice((1, 1, 2)),
+            )
+            for i, agent in enumerate(agents) for j in range(point_count)
+        ], batch_size=SEED_BATCH_SIZE)
+        employees = Employee.objects.bulk_create([
+            Employee(
+                name=f'Сотрудник {i + 1}-{k + 1} ({tag})',
+                first_name=rng.choice(FIRST_NAMES), middle_name=rng.choice(MIDDLE_NAMES),
+                last_name=rng.choice(LAST_NAMES), email=f'employee{i}-{k}.{tag}@seed.example.com',
+                phone_number=f'9{rng.randint(0, 999999999):09d}',
+                date_of_birth=date(rng.randint(1970, 2004), rng.randint(1, 12), rng.randint(1, 28)),
+                date_of_hire=start - timedelta(days=rng.randint(30, 2000)),
+                position=rng.choice(POSITIONS), agent_id=point.agent_id, default_pickup_point=point,
+            )
+            for i, point in enumerate(points) for k in range(employee_count)
+        ], batch_size=SEED_BATCH_SIZE)
+        AccountingPeriod.objects.bulk_create([
+            AccountingPeriod(name=f'{first:%m.%Y}', agent=agent, start_date=first, end_date=last)
+            for agent in agents for first, last in periods
+        ])
+
+        schedules = WorkSchedule.objects.bulk_create([
+            WorkSchedule(
+                employee=employee, pickup_point_id=employee.default_pickup_point_id,
+                start_date=first, end_date=last, status='draft' if first == periods[-1][0] else 'approved',
+            )
+            for first, last in periods for employee in employees
+        ], batch_size=SEED_BATCH_SIZE)
+
+        shifts = []
+        for schedule in schedules:
+            cycle = rng.choice(SHIFT_CYCLES)
+            offset = rng.randrange(len(cycle))
+            start_time, end_time = rng.choice(SHIFT_TIMES)
+            day = schedule.start_date
+            while day <= schedule.end_date:
+                if cycle[(day.toordinal() + offset) % len(cycle)]:
+                    shifts.append(WorkShift(
+                        schedule=schedule, employee_id=schedule.employee_id, date=day,
+                        start_time=start_time, end_time=end_time, is_approved=schedule.status == 'approved',
+                    ))
+                day += timedelta(days=1)
+        WorkShift.objects.bulk_create(shifts, batch_size=SEED_BATCH_SIZE)
+        # Регистр обновляется по агентам, чтобы списки сотрудников в запросах оставались короткими
+        for agent in agents:
+            shifts_bulk_updated.send(sender=WorkShift, shifts=WorkShift.objects.filter(employee__agent=agent))
+
+    return {
+        'agents': len(agents),
+        'pickup_points': len(points),
+        'employees': len(employees),
+        'accounting_periods': len(agents) * len(periods),
+        'work_schedules': len(schedules),
+        'work_shifts': len(shifts),
+    }
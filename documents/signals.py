@@ -0,0 +1,8 @@
+# documents/signals.py
+
+from django.dispatch import Signal
+
+# Отправляется после массового изменения смен запросом UPDATE или создания через bulk_create,
+# минуя save() и сигналы post_save.
+# Аргументы: shifts (QuerySet) - набор затронутых смен.
+shifts_bulk_updated = Signal()
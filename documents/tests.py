@@ -1,3 +1,984 @@
-from django.test import TestCase
+# documents/tests.py
 
-# Create your tests here.
+import json
+import tempfile
+from datetime import date, time, timedelta
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from core.admin import LimitedCountPaginator
+from core.loadgen import classify_error
+from registers.models import DailyWorkHours, WorkScheduleRegister
+from registers.rollup import verify_daily_hours
+from django.core.exceptions import ValidationError
+from reference_books.models import Agent, PickupPoint, Employee, ShiftTemplate
+from .models import WorkSchedule, WorkShift
+from .conflicts import find_overlapping_shifts, find_employee_double_bookings, scan_double_bookings
+from .coverage import CoveragePlanner, CoverageSlot, plan_coverage
+from .seeding import SeedError, seed_data
+
+
+class WorkScheduleConflictsTest(TestCase):
+    """
+    Тесты для поиска пересечений смен в графике работы.
+    Проверяет корректность работы методов check_conflicts и find_conflicts модели WorkSchedule.
+    """
+
+    def setUp(self):
+        """
+        Устанавливает начальные данные для тестов.
+        Создает агента, пункт выдачи, сотрудника и пустой график работы.
+        """
+        self.agent = Agent.objects.create(
+            name="Test Agent",
+            email="agent@example.com",
+            phone_number="1234567890"
+        )
+        self.pickup_point = PickupPoint.objects.create(
+            name="Pickup Point 1",
+            address="123 Test St",
+            agent=self.agent
+        )
+        self.employee = Employee.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            date_of_hire=date(2024, 1, 1),
+            position="Operator",
+            agent=self.agent,
+            default_pickup_point=self.pickup_point
+        )
+        self.schedule = WorkSchedule.objects.create(
+            employee=self.employee,
+            pickup_point=self.pickup_point,
+            start_date=date(2024, 8, 1),
+            end_date=date(2024, 8, 31)
+        )
+
+    def create_shift(self, day, start_hour, end_hour, **kwargs):
+        """
+        Создает смену в тестовом графике.
+        """
+        return WorkShift.objects.create(
+            schedule=self.schedule,
+            employee=self.employee,
+            date=date(2024, 8, day),
+            start_time=time(start_hour),
+            end_time=time(end_hour),
+            **kwargs
+        )
+
+    def test_no_conflicts(self):
+        """
+        Проверяет, что смены, идущие встык и в разные дни, не считаются конфликтующими.
+        """
+        self.create_shift(1, 9, 13)
+        self.create_shift(1, 13, 18)
+        self.create_shift(2, 9, 18)
+        self.assertTrue(self.schedule.check_conflicts())
+        self.assertEqual(self.schedule.find_conflicts(), [])
+
+    def test_find_conflicts_reports_colliding_shifts(self):
+        """
+        Проверяет, что find_conflicts возвращает именно пересекающиеся пары смен.
+        """
+        morning = self.create_shift(1, 9, 14)
+        day = self.create_shift(1, 12, 18)
+        late = self.create_shift(1, 13, 20)
+        self.create_shift(2, 12, 18)
+
+        conflicts = {(a.pk, b.pk) for a, b in self.schedule.find_conflicts()}
+        self.assertEqual(conflicts, {(morning.pk, day.pk), (morning.pk, late.pk), (day.pk, late.pk)})
+        self.assertFalse(self.schedule.check_conflicts())
+
+    def test_new_shift_is_checked(self):
+        """
+        Проверяет, что добавляемая смена проверяется на пересечение с существующими.
+        """
+        existing = self.create_shift(1, 9, 13)
+        new_shift = WorkShift(
+            schedule=self.schedule,
+            employee=self.employee,
+            date=date(2024, 8, 1),
+            start_time=time(12),
+            end_time=time(16)
+        )
+        self.assertEqual(self.schedule.find_conflicts(new_shifts=[new_shift]), [(existing, new_shift)])
+        self.assertFalse(self.schedule.check_conflicts(new_shifts=[new_shift]))
+
+    def test_edited_shift_is_not_compared_with_itself(self):
+        """
+        Проверяет, что при изменении сохраненной смены она не сравнивается со своей старой версией.
+        """
+        shift = self.create_shift(1, 9, 13)
+        shift.end_time = time(14)
+        self.assertTrue(self.schedule.check_conflicts(new_shifts=[shift]))
+
+    def test_sweep_matches_pairwise_primitive(self):
+        """
+        Проверяет, что результат sort-and-sweep совпадает с попарной проверкой WorkShift.is_conflicting.
+        """
+        bounds = [(8, 12), (9, 10), (10, 11), (11, 15), (12, 12), (12, 13), (14, 18), (17, 20), (20, 22)]
+        shifts = [
+            WorkShift(date=date(2024, 8, 1 + i % 2), start_time=time(start), end_time=time(end))
+            for i, (start, end) in enumerate(bounds)
+        ]
+        expected = {
+            frozenset((id(a), id(b)))
+            for i, a in enumerate(shifts) for b in shifts[i + 1:]
+            if a.is_conflicting(b)
+        }
+        found = {frozenset((id(a), id(b))) for a, b in find_overlapping_shifts(shifts)}
+        self.assertEqual(found, expected)
+
+
+class EmployeeDoubleBookingTest(TestCase):
+    """
+    Тесты для поиска двойных бронирований сотрудника в разных графиках работы.
+    """
+
+    def setUp(self):
+        """
+        Устанавливает начальные данные для тестов.
+        Создает агента, два пункта выдачи, двух сотрудников и по графику на каждый пункт выдачи.
+        """
+        self.agent = Agent.objects.create(name="Test Agent", email="agent@example.com", phone_number="1234567890")
+        self.point_1 = PickupPoint.objects.create(name="Pickup Point 1", address="123 Test St", agent=self.agent)
+        self.point_2 = PickupPoint.objects.create(name="Pickup Point 2", address="456 Test Ave", agent=self.agent)
+        self.employee = Employee.objects.create(
+            first_name="John", last_name="Doe", email="john.doe@example.com",
+            date_of_hire=date(2024, 1, 1), position="Operator", agent=self.agent
+        )
+        self.other_employee = Employee.objects.create(
+            first_name="Jane", last_name="Roe", email="jane.roe@example.com",
+            date_of_hire=date(2024, 1, 1), position="Operator", agent=self.agent
+        )
+        self.schedule_1 = WorkSchedule.objects.create(
+            employee=self.employee, pickup_point=self.point_1,
+            start_date=date(2024, 8, 1), end_date=date(2024, 8, 31)
+        )
+        self.schedule_2 = WorkSchedule.objects.create(
+            employee=self.employee, pickup_point=self.point_2,
+            start_date=date(2024, 8, 1), end_date=date(2024, 8, 31)
+        )
+
+    def make_shift(self, schedule, employee, day, start_hour, end_hour):
+        """
+        Возвращает несохраненную смену.
+        """
+        return WorkShift(
+            schedule=schedule, employee=employee, date=date(2024, 8, day),
+            start_time=time(start_hour), end_time=time(end_hour)
+        )
+
+    def test_cross_schedule_overlap_is_found(self):
+        """
+        Проверяет, что пересечение со сменой сотрудника в другом графике обнаруживается.
+        """
+        existing = self.make_shift(self.schedule_1, self.employee, 1, 9, 15)
+        existing.save()
+        new_shift = self.make_shift(self.schedule_2, self.employee, 1, 14, 20)
+        self.assertEqual(find_employee_double_bookings([new_shift]), [(existing, new_shift)])
+
+    def test_other_employee_is_not_a_conflict(self):
+        """
+        Проверяет, что смены разных сотрудников в одно время не считаются двойным бронированием.
+        """
+        self.make_shift(self.schedule_1, self.other_employee, 1, 9, 15).save()
+        new_shift = self.make_shift(self.schedule_2, self.employee, 1, 9, 15)
+        self.assertEqual(find_employee_double_bookings([new_shift]), [])
+
+    def test_batch_runs_single_query(self):
+        """
+        Проверяет, что пакет смен проверяется одним запросом, включая пересечения внутри пакета.
+        """
+        self.make_shift(self.schedule_1, self.employee, 1, 9, 12).save()
+        batch = [
+            self.make_shift(self.schedule_2, self.employee, day, 10, 18)
+            for day in range(1, 11)
+        ] + [self.make_shift(self.schedule_2, self.employee, 5, 17, 20)]
+        with self.assertNumQueries(1):
+            conflicts = find_employee_double_bookings(batch)
+        self.assertEqual(len(conflicts), 2)
+
+    def test_scan_double_bookings(self):
+        """
+        Проверяет потоковое сканирование смен агента на двойные бронирования.
+        """
+        first = self.make_shift(self.schedule_1, self.employee, 1, 9, 15)
+        second = self.make_shift(self.schedule_2, self.employee, 1, 14, 20)
+        for shift in (first, second,
+                      self.make_shift(self.schedule_2, self.employee, 2, 9, 15),
+                      self.make_shift(self.schedule_1, self.other_employee, 1, 9, 15)):
+            shift.save()
+        pairs = [(a.id, b.id) for a, b in scan_double_bookings(agent=self.agent)]
+        self.assertEqual(pairs, [(first.pk, second.pk)])
+        self.assertEqual(list(scan_double_bookings(agent=self.agent, start_date=date(2024, 8, 2))), [])
+
+    def test_check_double_bookings_command(self):
+        """
+        Проверяет вывод команды check_double_bookings.
+        """
+        self.make_shift(self.schedule_1, self.employee, 1, 9, 15).save()
+        self.make_shift(self.schedule_2, self.employee, 1, 14, 20).save()
+        out = StringIO()
+        call_command('check_double_bookings', agent=self.agent.pk, stdout=out)
+        self.assertIn('Найдено пересечений: 1', out.getvalue())
+
+    def test_check_double_bookings_command_rejects_invalid_dates(self):
+        """
+        Проверяет, что неверная дата или период команды check_double_bookings дают понятную ошибку CommandError.
+        """
+        with self.assertRaisesMessage(CommandError, '--start-date "2024-13-01"'):
+            call_command('check_double_bookings', '--start-date', '2024-13-01', stdout=StringIO())
+        with self.assertRaisesMessage(CommandError, '--end-date "31.08.2024"'):
+            call_command('check_double_bookings', end_date='31.08.2024', stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command('check_double_bookings', start_date='2024-09-01', end_date='2024-08-01', stdout=StringIO())
+        out = StringIO()
+        call_command('check_double_bookings', start_date='2024-08-01', end_date=date(2024, 8, 31), stdout=out)
+        self.assertIn('Найдено пересечений: 0', out.getvalue())
+
+    def test_explain_hot_paths_command(self):
+        """
+        Проверяет, что запросы горячих путей используют новые индексы, а после их удаления
+        в команде explain_hot_paths индексы восстанавливаются откатом транзакции.
+        """
+        self.make_shift(self.schedule_1, self.employee, 1, 9, 15).save()
+        out = StringIO()
+        call_command('explain_hot_paths', repeat=1, stdout=out)
+        with_indexes, without_indexes = out.getvalue().split('Без индексов горячих путей')
+        self.assertIn('workshift_employee_time_idx', with_indexes)
+        self.assertIn('workshift_schedule_date_idx', with_indexes)
+        self.assertIn('workschedule_point_period_idx', with_indexes)
+        self.assertNotIn('workshift_employee_time_idx', without_indexes)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE name = 'workshift_employee_time_idx'")
+            self.assertEqual(len(cursor.fetchall()), 1)
+
+
+class WorkScheduleApprovalTest(TestCase):
+    """
+    Тесты для утверждения и отклонения графиков работы.
+    """
+
+    def setUp(self):
+        """
+        Устанавливает начальные данные для тестов.
+        Создает агента, пункт выдачи, сотрудника и три графика по пять смен.
+        """
+        self.agent = Agent.objects.create(name="Test Agent", email="agent@example.com", phone_number="1234567890")
+        self.pickup_point = PickupPoint.objects.create(name="Pickup Point 1", address="123 Test St", agent=self.agent)
+        self.employee = Employee.objects.create(
+            first_name="John", last_name="Doe", email="john.doe@example.com",
+            date_of_hire=date(2024, 1, 1), position="Operator", agent=self.agent
+        )
+        self.schedules = []
+        for month in (6, 7, 8):
+            schedule = WorkSchedule.objects.create(
+                employee=self.employee, pickup_point=self.pickup_point,
+                start_date=date(2024, month, 1), end_date=date(2024, month, 28)
+            )
+            WorkShift.objects.bulk_create([
+                WorkShift(schedule=schedule, employee=self.employee, date=date(2024, month, day),
+                          start_time=time(9), end_time=time(18))
+                for day in range(1, 6)
+            ])
+            self.schedules.append(schedule)
+
+    def test_approve_schedule_is_set_based(self):
+        """
+        Проверяет, что approve_schedule утверждает все смены без посменных сохранений.
+        """
+        schedule, larger_schedule = self.schedules[0], self.schedules[1]
+        WorkShift.objects.bulk_create([
+            WorkShift(schedule=larger_schedule, employee=self.employee, date=date(2024, 7, day),
+                      start_time=time(9), end_time=time(18))
+            for day in range(6, 28)
+        ])
+        with CaptureQueriesContext(connection) as small:
+            schedule.approve_schedule()
+        with CaptureQueriesContext(connection) as large:
+            larger_schedule.approve_schedule()
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(schedule.status, 'approved')
+        self.assertFalse(schedule.shifts.filter(is_approved=False).exists())
+        self.assertFalse(WorkShift.objects.filter(schedule=self.schedules[2], is_approved=True).exists())
+
+    def test_batch_approve(self):
+        """
+        Проверяет пакетное утверждение графиков и запись регистра.
+        """
+        ids = [self.schedules[0].pk, self.schedules[1].pk]
+        response = self.client.post(reverse('batch_update_schedules'), {
+            'action': 'approve', 'schedule_ids': ids + [999999], 'comment': 'Пакетное утверждение'
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'action': 'approve', 'updated': ids, 'not_found': [999999]})
+        self.assertEqual(
+            set(WorkSchedule.objects.filter(status='approved').values_list('id', flat=True)), set(ids)
+        )
+        self.assertEqual(WorkShift.objects.filter(is_approved=True).count(), 10)
+        self.assertEqual(
+            set(WorkScheduleRegister.objects.values_list('work_schedule_id', 'status')),
+            {(ids[0], 'approved'), (ids[1], 'approved')}
+        )
+
+    def test_batch_reject(self):
+        """
+        Проверяет пакетное отклонение графиков: смены при этом не утверждаются.
+        """
+        schedule = self.schedules[2]
+        response = self.client.post(reverse('batch_update_schedules'), {
+            'action': 'reject', 'schedule_ids': [schedule.pk]
+        })
+        self.assertEqual(response.status_code, 200)
+        schedule.refresh_from_db()
+        self.assertEqual(schedule.status, 'rejected')
+        self.assertFalse(WorkShift.objects.filter(is_approved=True).exists())
+        self.assertEqual(WorkScheduleRegister.objects.get().status, 'rejected')
+
+    def test_batch_invalid_action(self):
+        """
+        Проверяет, что неизвестное действие отклоняется с кодом 400.
+        """
+        response = self.client.post(reverse('batch_update_schedules'), {
+            'action': 'delete', 'schedule_ids': [self.schedules[0].pk]
+        })
+        self.assertEqual(response.status_code, 400)
+
+
+class WorkScheduleReadViewsTest(TestCase):
+    """
+    Тесты для асинхронных представлений чтения графиков работы.
+    """
+
+    def setUp(self):
+        """
+        Устанавливает начальные данные для тестов.
+        Создает два пункта выдачи, сотрудника и по графику со сменами в каждом пункте.
+        """
+        agent = Agent.objects.create(name="Test Agent", email="agent@example.com", phone_number="1234567890")
+        self.point = PickupPoint.objects.create(name="Pickup Point 1", address="123 Test St", agent=agent)
+        other_point = PickupPoint.objects.create(name="Pickup Point 2", address="456 Test Ave", agent=agent)
+        self.employee = Employee.objects.create(
+            first_name="John", last_name="Doe", email="john.doe@example.com",
+            date_of_hire=date(2024, 1, 1), position="Operator", agent=agent
+        )
+        self.schedule = WorkSchedule.objects.create(
+            employee=self.employee, pickup_point=self.point, start_date=date(2024, 8, 1), end_date=date(2024, 8, 31)
+        )
+        self.other_schedule = WorkSchedule.objects.create(
+            employee=self.employee, pickup_point=other_point, start_date=date(2024, 9, 1), end_date=date(2024, 9, 30)
+        )
+        for day in (2, 1, 3):
+            WorkShift.objects.create(
+                schedule=self.schedule, employee=self.employee, date=date(2024, 8, day),
+                start_time=time(9), end_time=time(18)
+            )
+
+    def test_schedule_list_filters(self):
+        """
+        Проверяет список графиков и фильтр по пункту выдачи.
+        """
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('schedule_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['schedules'], [self.other_schedule, self.schedule])
+        response = self.client.get(reverse('schedule_list'), {'pickup_point_id': self.point.pk})
+        self.assertEqual(response.context['schedules'], [self.schedule])
+
+    def test_schedule_list_pages(self):
+        """
+        Проверяет постраничный вывод списка графиков по курсору: страницы не пересекаются
+        и на последней странице нет ссылки на следующую.
+        """
+        third = WorkSchedule.objects.create(
+            employee=self.employee, pickup_point=self.point, start_date=date(2024, 8, 1), end_date=date(2024, 8, 15)
+        )
+        with patch('documents.views.SCHEDULE_LIST_PAGE_SIZE', 2):
+            response = self.client.get(reverse('schedule_list'), {'pickup_point_id': ''})
+            self.assertEqual(response.context['schedules'], [self.other_schedule, self.schedule])
+            next_url = response.context['next_url']
+            self.assertIn(f'after=2024-08-01.{self.schedule.pk}', next_url)
+            with self.assertNumQueries(1):
+                response = self.client.get(next_url)
+            self.assertEqual(response.context['schedules'], [third])
+            self.assertIsNone(response.context['next_url'])
+
+    def test_schedule_detail_lists_shifts(self):
+        """
+        Проверяет, что график и его смены читаются двумя запросами в порядке дат.
+        """
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('schedule_detail', args=[self.schedule.pk]))
+        self.assertEqual([shift.date.day for shift in response.context['shifts']], [1, 2, 3])
+        self.assertEqual(self.client.get(reverse('schedule_detail', args=[999999])).status_code, 404)
+
+    async def test_schedule_detail_over_asgi(self):
+        """
+        Проверяет асинхронное представление через ASGI-обработчик (AsyncClient).
+        """
+        response = await self.async_client.get(reverse('schedule_detail', args=[self.schedule.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Pickup Point 1')
+
+
+class WorkShiftImportTest(TestCase):
+    """
+    Тесты для массового импорта смен в график.
+    """
+
+    def setUp(self):
+        """
+        Устанавливает начальные данные для тестов.
+        Создает агента, два пункта выдачи, сотрудника и по графику на каждый пункт выдачи.
+        """
+        self.agent = Agent.objects.create(name="Test Agent", email="agent@example.com", phone_number="1234567890")
+        self.point_1 = PickupPoint.objects.create(name="Pickup Point 1", address="123 Test St", agent=self.agent)
+        self.point_2 = PickupPoint.objects.create(name="Pickup Point 2", address="456 Test Ave", agent=self.agent)
+        self.employee = Employee.objects.create(
+            first_name="John", last_name="Doe", email="john.doe@example.com",
+            date_of_hire=date(2024, 1, 1), position="Operator", agent=self.agent
+        )
+        self.schedule = WorkSchedule.objects.create(
+            employee=self.employee, pickup_point=self.point_1,
+            start_date=date(2024, 8, 1), end_date=date(2024, 8, 31)
+        )
+        self.other_schedule = WorkSchedule.objects.create(
+            employee=self.employee, pickup_point=self.point_2,
+            start_date=date(2024, 8, 1), end_date=date(2024, 8, 31)
+        )
+        self.url = reverse('import_shifts', args=[self.schedule.id])
+
+    def test_import_csv(self):
+        """
+        Проверяет импорт CSV-файла: все смены создаются, регистр DailyWorkHours обновляется.
+        """
+        rows = ''.join(f'2024-08-{day:02d},09:00,17:00\n' for day in range(1, 31))
+        upload = SimpleUploadedFile('shifts.csv', ('date,start_time,end_time\n' + rows).encode('utf-8'))
+        response = self.client.post(self.url, {'file': upload})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {'created': 30})
+        self.assertEqual(self.schedule.shifts.count(), 30)
+        self.assertEqual(DailyWorkHours.objects.filter(employee=self.employee).count(), 30)
+
+    def test_import_rejects_invalid_utf8(self):
+        """
+        Проверяет, что содержимое не в UTF-8 отклоняется с кодом 400 и файлом, и телом запроса.
+        """
+        content = 'date,start_time,end_time,comment\n2024-08-01,09:00,17:00,Смена\n'.encode('cp1251')
+        upload = SimpleUploadedFile('shifts.csv', content)
+        for response in (
+            self.client.post(self.url, {'file': upload}),
+            self.client.post(self.url, content, content_type='text/csv'),
+        ):
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('UTF-8', response.json()['error'])
+        self.assertFalse(self.schedule.shifts.exists())
+
+    def test_import_json_query_count(self):
+        """
+        Проверяет, что количество запросов при импорте не зависит от количества смен.
+        """
+        def post(days, hour):
+            shifts = [
+                {'date': f'2024-08-{day:02d}', 'start_time': f'{hour:02d}:00', 'end_time': f'{hour + 1:02d}:00'}
+                for day in range(1, days + 1)
+            ]
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.post(self.url, json.dumps({'shifts': shifts}), content_type='application/json')
+            self.assertEqual(response.status_code, 201)
+            return len(context.captured_queries)
+
+        self.assertEqual(post(2, 8), post(31, 10))
+
+    def test_row_errors(self):
+        """
+        Проверяет построчные ошибки: формат, период графика, пересечения внутри файла,
+        с существующими сменами графика и со сменами сотрудника в другом графике. Ничего не сохраняется.
+        """
+        WorkShift.objects.create(
+            schedule=self.schedule, employee=self.employee, date=date(2024, 8, 5),
+            start_time=time(9, 0), end_time=time(12, 0)
+        )
+        WorkShift.objects.create(
+            schedule=self.other_schedule, employee=self.employee, date=date(2024, 8, 6),
+            start_time=time(9, 0), end_time=time(12, 0)
+        )
+        shifts = [
+            {'date': '2024-08-01', 'start_time': '09:00', 'end_time': '17:00'},
+            {'date': 'tomorrow', 'start_time': '09:00', 'end_time': '17:00'},
+            {'date': '2024-08-02', 'start_time': '17:00', 'end_time': '09:00'},
+            {'date': '2024-09-01', 'start_time': '09:00', 'end_time': '17:00'},
+            {'date': '2024-08-03', 'start_time': '09:00', 'end_time': '13:00'},
+            {'date': '2024-08-03', 'start_time': '12:00', 'end_time': '17:00'},
+            {'date': '2024-08-05', 'start_time': '11:00', 'end_time': '15:00'},
+            {'date': '2024-08-06', 'start_time': '11:00', 'end_time': '15:00'},
+            {'date': '2024-08-07', 'start_time': '09:00', 'end_time': '17:00', 'employee_id': 999},
+        ]
+        response = self.client.post(self.url, json.dumps(shifts), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        errors = {item['row']: item['errors'] for item in response.json()['errors']}
+        self.assertEqual(sorted(errors), [2, 3, 4, 5, 6, 7, 8, 9])
+        self.assertIn('date: некорректное значение', errors[2][0])
+        self.assertIn('Пересечение со строкой 6', errors[5])
+        self.assertIn('Пересечение со строкой 5', errors[6])
+        self.assertEqual(len(errors[7]), 1)
+        self.assertEqual(len(errors[8]), 1)
+        self.assertEqual(self.schedule.shifts.count(), 1)
+
+    def test_import_rejects_out_of_range_employee_id(self):
+        """
+        Проверяет, что employee_id за пределами 64-битного ID, нулевой или отрицательный
+        дает ошибку строки (ответ 400), а не ошибку сервера.
+        """
+        shifts = [
+            {'date': '2024-08-01', 'start_time': '09:00', 'end_time': '17:00', 'employee_id': 2 ** 63},
+            {'date': '2024-08-02', 'start_time': '09:00', 'end_time': '17:00', 'employee_id': '9' * 30},
+            {'date': '2024-08-03', 'start_time': '09:00', 'end_time': '17:00', 'employee_id': 0},
+            {'date': '2024-08-04', 'start_time': '09:00', 'end_time': '17:00', 'employee_id': -1},
+        ]
+        response = self.client.post(self.url, json.dumps(shifts), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        errors = {item['row']: item['errors'] for item in response.json()['errors']}
+        self.assertEqual(sorted(errors), [1, 2, 3, 4])
+        self.assertTrue(all('employee_id: некорректное значение' in row_errors[0] for row_errors in errors.values()))
+
+    def test_invalid_file(self):
+        """
+        Проверяет, что файл без обязательных столбцов отклоняется целиком.
+        """
+        response = self.client.post(self.url, 'date,start_time\n2024-08-01,09:00\n', content_type='text/csv')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('end_time', response.json()['error'])
+
+
+class ShiftTemplateGenerationTest(TestCase):
+    """
+    Тесты для заполнения графиков сменами по шаблонам.
+    """
+
+    def setUp(self):
+        """
+        Устанавливает начальные данные для тестов.
+        Создает агента, пункт выдачи, двух сотрудников и их графики на август.
+        """
+        self.agent = Agent.objects.create(name="Test Agent", email="agent@example.com", phone_number="1234567890")
+        self.pickup_point = PickupPoint.objects.create(name="Pickup Point 1", address="123 Test St", agent=self.agent)
+        self.employee = Employee.objects.create(
+            first_name="John", last_name="Doe", email="john.doe@example.com",
+            date_of_hire=date(2024, 1, 1), position="Operator", agent=self.agent
+        )
+        self.other_employee = Employee.objects.create(
+            first_name="Jane", last_name="Roe", email="jane.roe@example.com",
+            date_of_hire=date(2024, 1, 1), position="Operator", agent=self.agent
+        )
+        self.schedule = WorkSchedule.objects.create(
+            employee=self.employee, pickup_point=self.pickup_point,
+            start_date=date(2024, 8, 1), end_date=date(2024, 8, 31)
+        )
+        self.other_schedule = WorkSchedule.objects.create(
+            employee=self.other_employee, pickup_point=self.pickup_point,
+            start_date=date(2024, 8, 1), end_date=date(2024, 8, 31)
+        )
+        # 2/2 для пункта выдачи, цикл начинается 1 августа
+        self.create_template(
+            name="2/2", pickup_point=self.pickup_point, anchor_date=date(2024, 8, 1),
+            pattern="09:00-21:00,09:00-21:00,-,-"
+        )
+
+    def create_template(self, **fields):
+        """
+        Создает шаблон смен, предварительно проверив его (full_clean).
+        """
+        template = ShiftTemplate(**fields)
+        template.full_clean()
+        template.save()
+        return template
+
+    def test_pattern_validation(self):
+        """
+        Проверяет разбор и проверку цикла дней шаблона.
+        """
+        template = ShiftTemplate(name="Ночь", employee=self.employee, anchor_date=date(2024, 8, 1),
+                                 pattern="20:00-23:59,00:00-08:00;10:00-12:00,-")
+        self.assertEqual(template.get_cycle(), [
+            [(time(20), time(23, 59))], [(time(0), time(8)), (time(10), time(12))], []
+        ])
+        template.pattern = "21:00-09:00"
+        with self.assertRaises(ValidationError):
+            template.full_clean()
+        template.pattern, template.employee = "-", None
+        with self.assertRaises(ValidationError):
+            template.full_clean()
+
+    def test_overlapping_intervals_are_rejected(self):
+        """
+        Проверяет, что пересекающиеся интервалы одного дня цикла отклоняются при проверке шаблона,
+        а смежные интервалы допустимы.
+        """
+        template = ShiftTemplate(name="Сплит", employee=self.employee, anchor_date=date(2024, 8, 1),
+                                 pattern="09:00-13:00;12:00-18:00,-")
+        with self.assertRaises(ValidationError):
+            template.full_clean()
+        template.pattern = "13:00-18:00;09:00-13:00,-"
+        template.full_clean()
+        self.assertEqual(template.get_cycle()[0], [(time(9), time(13)), (time(13), time(18))])
+
+    def test_preview_does_not_write(self):
+        """
+        Проверяет, что предпросмотр вычисляет смены по циклу шаблона без записи в базу.
+        """
+        response = self.client.post(reverse('generate_shifts'), {
+            'schedule_ids': [self.schedule.id], 'preview': '1'
+        })
+        data = response.json()
+        self.assertEqual(data['generated'], 16)
+        self.assertEqual(data['created'], 0)
+        self.assertEqual([shift['date'] for shift in data['shifts'][:3]], ['2024-08-01', '2024-08-02', '2024-08-05'])
+        self.assertEqual(data['shifts'][0]['start_time'], '09:00')
+        self.assertFalse(WorkShift.objects.exists())
+
+    def test_generate_uses_most_specific_template_and_skips_conflicts(self):
+        """
+        Проверяет выбор шаблона сотрудника вместо шаблона пункта выдачи, пропуск смен,
+        пересекающихся с существующими, обновление регистра и повторный запуск без дублей.
+        """
+        self.create_template(
+            name="5/2", employee=self.employee, anchor_date=date(2024, 7, 29),
+            pattern="09:00-18:00,09:00-18:00,09:00-18:00,09:00-18:00,09:00-18:00,-,-"
+        )
+        WorkShift.objects.create(
+            schedule=self.schedule, employee=self.employee, date=date(2024, 8, 1),
+            start_time=time(8, 0), end_time=time(10, 0)
+        )
+        response = self.client.post(reverse('generate_shifts'), {
+            'schedule_ids': [self.schedule.id, self.other_schedule.id]
+        })
+        data = response.json()
+        self.assertEqual(data['skipped'], 1)
+        self.assertEqual(data['created'], 22 - 1 + 16)
+        self.assertEqual(self.schedule.shifts.filter(end_time=time(18)).count(), 21)
+        self.assertEqual(self.other_schedule.shifts.count(), 16)
+        self.assertEqual(DailyWorkHours.objects.filter(employee=self.other_employee).count(), 16)
+
+        response = self.client.post(reverse('generate_shifts'), {'schedule_ids': [self.other_schedule.id]})
+        self.assertEqual(response.json()['created'], 0)
+        self.assertEqual(self.other_schedule.shifts.count(), 16)
+
+
+    def test_generated_shifts_overlapping_each_other_keep_first(self):
+        """
+        Проверяет, что из пересекающихся новых смен (графики сотрудника в двух пунктах выдачи)
+        создается первая, а пропускается только более поздняя.
+        """
+        second_point = PickupPoint.objects.create(name="Pickup Point 2", address="456 Test Ave", agent=self.agent)
+        second_schedule = WorkSchedule.objects.create(
+            employee=self.employee, pickup_point=second_point,
+            start_date=date(2024, 8, 1), end_date=date(2024, 8, 31)
+        )
+        self.create_template(
+            name="Подработка", pickup_point=second_point, anchor_date=date(2024, 8, 1), pattern="10:00-12:00"
+        )
+        response = self.client.post(reverse('generate_shifts'), {
+            'schedule_ids': [self.schedule.id, second_schedule.id]
+        })
+        data = response.json()
+        self.assertEqual(data['skipped'], 16)
+        self.assertEqual(data['created'], 16 + 31 - 16)
+        self.assertEqual(self.schedule.shifts.count(), 16)
+        self.assertEqual(second_schedule.shifts.count(), 15)
+        self.assertEqual(list(scan_double_bookings()), [])
+
+class CoveragePlanningTest(TestCase):
+    """
+    Тесты для автоматического планирования смен по потребностям пунктов выдачи.
+    """
+
+    def setUp(self):
+        """
+        Устанавливает начальные данные для тестов.
+        Создает агента, два пункта выдачи (на 1 и 2 сотрудников) и трех сотрудников.
+        Данные создаются как зафиксированные (captureOnCommitCallbacks), чтобы кэш справочников
+        использовался так же, как после фиксации транзакции.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            self.agent = Agent.objects.create(name="Test Agent", email="agent@example.com", phone_number="1234567890")
+            self.point_1 = PickupPoint.objects.create(name="Pickup Point 1", address="123 Test St", agent=self.agent)
+            self.point_2 = PickupPoint.objects.create(
+                name="Pickup Point 2", address="456 Test Ave", agent=self.agent,
+                opening_time=time(10), closing_time=time(20), required_staff=2
+            )
+            self.employees = [
+                Employee.objects.create(
+                    first_name=f"Employee {index}", last_name="Doe", email=f"employee{index}@example.com",
+                    date_of_hire=date(2024, 1, 1), position="Operator", agent=self.agent,
+                    default_pickup_point=point
+                )
+                for index, point in enumerate([self.point_1, self.point_2, self.point_2])
+            ]
+        self.url = reverse('plan_coverage')
+        self.period = {'agent_id': self.agent.id, 'start_date': '2024-08-05', 'end_date': '2024-08-11'}
+
+    def test_local_search_fills_slot_left_by_greedy(self):
+        """
+        Проверяет, что локальный поиск закрывает потребность, которую жадный проход оставил пустой.
+        Сотрудник 1 может работать оба дня (но не более одного дня в неделю), сотрудник 2 - только в понедельник.
+        """
+        monday, tuesday = date(2024, 8, 5), date(2024, 8, 6)
+        slots = [CoverageSlot(1, monday, time(9), time(21)), CoverageSlot(1, tuesday, time(9), time(21))]
+        planner = CoveragePlanner(
+            slots, {1: (None, date(2024, 1, 1)), 2: (None, date(2024, 1, 1))},
+            unavailable={2: {tuesday}}, work_days={}, max_days_per_week=1,
+        )
+        planner.greedy()
+        self.assertEqual([slot.employee_id for slot in slots], [1, None])
+        planner.improve()
+        self.assertEqual([slot.employee_id for slot in slots], [2, 1])
+
+    def test_greedy_stops_when_time_budget_is_exhausted(self):
+        """
+        Проверяет, что жадное заполнение соблюдает бюджет времени: по его исчерпании оставшиеся
+        потребности остаются незакрытыми, а свободные сотрудники выбираются из кучи даты по загрузке.
+        """
+        monday = date(2024, 8, 5)
+        employees = {employee_id: (None, date(2024, 1, 1)) for employee_id in range(1, 4)}
+        slots = [CoverageSlot(1, monday + timedelta(days=day), time(9), time(21)) for day in range(3)]
+        planner = CoveragePlanner(slots, employees, unavailable={}, work_days={1: {monday - timedelta(days=1)}})
+        with patch.object(planner, 'out_of_time', return_value=True):
+            planner.greedy()
+        self.assertEqual([slot.employee_id for slot in slots], [None, None, None])
+
+        planner.greedy()
+        self.assertEqual([slot.employee_id for slot in slots], [2, 3, 1])
+
+    def test_preview_and_save(self):
+        """
+        Проверяет план недели: соблюдение ограничения 5 дней в неделю, учет существующих смен,
+        предпочтение пункта выдачи по умолчанию, отчет о незакрытых потребностях и запись черновых графиков.
+        """
+        schedule = WorkSchedule.objects.create(
+            employee=self.employees[1], pickup_point=self.point_2,
+            start_date=date(2024, 8, 5), end_date=date(2024, 8, 11)
+        )
+        WorkShift.objects.create(
+            schedule=schedule, employee=self.employees[1], date=date(2024, 8, 5),
+            start_time=time(10), end_time=time(20)
+        )
+
+        response = self.client.post(self.url, dict(self.period, preview='1'))
+        data = response.json()
+        self.assertEqual(data['slots'], 3 * 7 - 1)
+        self.assertEqual(data['assigned'], 3 * 5 - 1)
+        self.assertEqual(sum(item['missing'] for item in data['unfilled']), 6)
+        self.assertEqual(WorkShift.objects.count(), 1)
+
+        response = self.client.post(self.url, self.period)
+        data = response.json()
+        self.assertEqual(data['created_shifts'], 14)
+        for employee in self.employees:
+            self.assertEqual(WorkShift.objects.filter(employee=employee).count(), 5)
+            self.assertTrue(WorkShift.objects.filter(
+                employee=employee, schedule__pickup_point=employee.default_pickup_point
+            ).exists())
+        self.assertEqual(
+            set(WorkShift.objects.filter(schedule__pickup_point=self.point_2).values_list('start_time', 'end_time')),
+            {(time(10), time(20))}
+        )
+        self.assertEqual(DailyWorkHours.objects.count(), 15)
+        # Существующий черновой график сотрудника используется повторно
+        self.assertEqual(WorkSchedule.objects.filter(employee=self.employees[1]).count(), 1)
+
+    def test_plan_uses_cached_active_employees(self):
+        """
+        Проверяет, что планирование берет сотрудников агента из кэша справочников (повторный план
+        не читает сотрудников из базы), а деактивированный сотрудник в план не попадает.
+        """
+        start_date, end_date = date(2024, 8, 5), date(2024, 8, 11)
+        employee_ids = {employee.id for employee in self.employees}
+        plan = plan_coverage(self.agent, start_date, end_date)
+        self.assertEqual({slot.employee_id for slot in plan.assigned}, employee_ids)
+        with CaptureQueriesContext(connection) as queries:
+            plan_coverage(self.agent, start_date, end_date)
+        self.assertFalse(any('"reference_books_employee"."is_active"' in query['sql'] for query in queries))
+
+        Employee.objects.filter(pk=self.employees[0].pk).update(is_active=False)
+        plan = plan_coverage(self.agent, start_date, end_date)
+        self.assertEqual({slot.employee_id for slot in plan.assigned}, employee_ids - {self.employees[0].id})
+
+    def test_invalid_parameters(self):
+        """
+        Проверяет, что запрос без периода отклоняется с кодом 400.
+        """
+        response = self.client.post(self.url, {'agent_id': self.agent.id})
+        self.assertEqual(response.status_code, 400)
+
+
+class SeedDataTest(TestCase):
+    """
+    Тесты для заполнения базы синтетическими данными и замера горячих путей.
+    """
+
+    def get_snapshot(self):
+        """
+        Возвращает содержимое смен и сотрудников без учета ID.
+        """
+        return (
+            list(Employee.objects.order_by('email').values_list('email', 'last_name', 'date_of_birth')),
+            list(WorkShift.objects.order_by('employee__email', 'date').values_list(
+                'employee__email', 'date', 'start_time', 'end_time', 'is_approved'
+            )),
+        )
+
+    def test_seed_is_deterministic(self):
+        """
+        Проверяет, что одно и то же зерно дает одинаковые данные, а регистр часов согласован со сменами.
+        """
+        with transaction.atomic():
+            counts = seed_data(scale=0.01, seed=7, start=date(2024, 7, 15), months=2)
+            first = self.get_snapshot()
+            self.assertEqual(verify_daily_hours(), [])
+            self.assertEqual(WorkSchedule.objects.filter(status='draft', start_date=date(2024, 8, 1)).count(), 8)
+            transaction.set_rollback(True)
+        self.assertEqual(counts['employees'], 8)
+        self.assertEqual(counts['work_schedules'], 16)
+        self.assertEqual(counts['work_shifts'], len(first[1]))
+
+        seed_data(scale=0.01, seed=7, start=date(2024, 7, 15), months=2)
+        self.assertEqual(self.get_snapshot(), first)
+        with self.assertRaises(SeedError):
+            seed_data(scale=0.01, seed=7)
+
+    def test_seed_data_command(self):
+        """
+        Проверяет команду seed_data.
+        """
+        out = StringIO()
+        call_command('seed_data', scale=0.01, seed=3, stdout=out)
+        self.assertIn('employees: 8', out.getvalue())
+        self.assertEqual(Agent.objects.count(), 1)
+
+    def test_benchmark_hot_paths_writes_json(self):
+        """
+        Проверяет, что замер горячих путей сохраняет результаты в JSON и не изменяет базу.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory) / 'result.json'
+            call_command('benchmark_hot_paths', scales='0.01', repeat=1, output=str(output), stdout=StringIO())
+            data = json.loads(output.read_text(encoding='utf-8'))
+        results = data['runs'][0]['results']
+        self.assertIn('approve_schedule', results)
+        self.assertIn('api /api/employees/', results)
+        self.assertEqual(results['check_conflicts']['count'], 1)
+        self.assertFalse(Agent.objects.exists())
+
+
+class LoadTestCommandTest(TransactionTestCase):
+    """
+    Тесты для команды нагрузочного тестирования.
+
+    TransactionTestCase: запросы выполняются из рабочих потоков со своими соединениями,
+    которые не видят данные незавершенной транзакции TestCase.
+    """
+
+    def test_load_test_reports_endpoints(self):
+        """
+        Проверяет, что команда выполняет все запросы смеси и сохраняет сводку по видам запросов.
+        """
+        seed_data(scale=0.01, seed=5, start=date(2024, 8, 1))
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory) / 'load.json'
+            out = StringIO()
+            call_command('load_test', workers=1, requests=40, seed=1, output=str(output), stdout=out)
+            data = json.loads(output.read_text(encoding='utf-8'))
+        endpoints = data['endpoints']
+        self.assertEqual(endpoints['total']['requests'], 40)
+        self.assertEqual(endpoints['total']['errors'], {})
+        self.assertEqual(set(endpoints), {'api', 'create_shift', 'approve', 'report', 'total'})
+        self.assertIn('p99_ms', endpoints['api'])
+        self.assertIn('total', out.getvalue())
+
+    def test_lock_errors_are_classified(self):
+        """
+        Проверяет, что ошибки блокировки SQLite учитываются отдельно от остальных ошибок.
+        """
+        self.assertEqual(classify_error(None, 'database is locked'), 'sqlite_locked')
+        self.assertEqual(classify_error(None, 'database table is locked: documents_workshift'), 'sqlite_locked')
+        self.assertEqual(classify_error(500, None), 'HTTP 500')
+        self.assertIsNone(classify_error(302, None))
+
+    def test_load_test_rejects_unknown_mix(self):
+        """
+        Проверяет, что неизвестный вид запроса в смеси отклоняется.
+        """
+        with self.assertRaises(CommandError):
+            call_command('load_test', mix='api=1,unknown=2', stdout=StringIO())
+
+
+class DocumentAdminTest(TestCase):
+    """
+    Тесты для админки документов и отчетов на большом количестве записей.
+    """
+
+    def setUp(self):
+        """
+        Устанавливает начальные данные для тестов: синтетические данные и администратора.
+        """
+        seed_data(scale=0.01, seed=11, start=date(2024, 8, 1))
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+
+    def get_query_count(self, url, params=None):
+        """
+        Выполняет GET-запрос и возвращает количество SQL-запросов.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelists_do_not_query_per_row(self):
+        """
+        Проверяет, что количество запросов списков изменения не зависит от количества строк.
+        """
+        for changelist in ('documents_workschedule', 'documents_workshift', 'reports_workschedulereport'):
+            url = reverse(f'admin:{changelist}_changelist')
+            self.assertLessEqual(self.get_query_count(url, {'p': 1}), 12, changelist)
+        shifts_url = reverse('admin:documents_workshift_changelist')
+        few = self.get_query_count(shifts_url, {'date__gte': '2024-08-30'})
+        many = self.get_query_count(shifts_url)
+        self.assertEqual(few, many)
+
+    def test_changelist_count_is_limited(self):
+        """
+        Проверяет, что количество записей в списке изменения считается не дальше предела пагинатора.
+        """
+        with patch.object(LimitedCountPaginator, 'count_limit', 5):
+            response = self.client.get(reverse('admin:documents_workshift_changelist'))
+        self.assertEqual(response.context['cl'].result_count, 6)
+
+    def test_change_form_uses_autocomplete(self):
+        """
+        Проверяет, что форма смены не выводит всех сотрудников и графики в выпадающих списках.
+        """
+        shift = WorkShift.objects.first()
+        response = self.client.get(reverse('admin:documents_workshift_change', args=[shift.pk]))
+        self.assertContains(response, 'admin-autocomplete')
+        self.assertNotContains(response, f'value="{Employee.objects.exclude(pk=shift.employee_id).first().pk}"')
+
+    def test_search_by_employee(self):
+        """
+        Проверяет поиск графиков по сотруднику через поисковый индекс.
+        """
+        employee = Employee.objects.first()
+        response = self.client.get(reverse('admin:documents_workschedule_changelist'), {'q': employee.last_name})
+        schedules = list(response.context['cl'].result_list)
+        self.assertIn(employee, [schedule.employee for schedule in schedules])
+        self.assertTrue(all(schedule.employee.last_name == employee.last_name for schedule in schedules))
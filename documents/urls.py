@@ -4,7 +4,13 @@ from django.urls import path
 from . import views
 
 urlpatterns = [
+    path('schedules/', views.work_schedule_list, name='schedule_list'),
+    path('schedules/<int:pk>/', views.work_schedule_detail, name='schedule_detail'),
     path('create_schedule/', views.create_work_schedule, name='create_schedule'),
     path('create_shift/<int:schedule_id>/', views.create_work_shift, name='create_shift'),
+    path('import_shifts/<int:schedule_id>/', views.import_work_shifts, name='import_shifts'),
+    path('generate_shifts/', views.generate_work_shifts, name='generate_shifts'),
+    path('plan_coverage/', views.plan_work_coverage, name='plan_coverage'),
     path('approve_schedule/<int:schedule_id>/', views.approve_work_schedule, name='approve_schedule'),
+    path('approve_schedules/', views.batch_update_work_schedules, name='batch_update_schedules'),
 ]
@@ -1,8 +1,23 @@
 # documents/views.py
 
-from django.shortcuts import render, redirect, get_object_or_404
+from collections import Counter
+from datetime import date
+from django.db import transaction
+from django.db.models import Q
+from django.http import JsonResponse
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
+from django.views.decorators.http import require_POST
+from reference_books.models import AccountingPeriod, Agent
+from registers.models import WorkScheduleRegister
 from .models import WorkSchedule, WorkShift
 from .forms import WorkScheduleForm, WorkShiftForm
+from .conflicts import find_employee_double_bookings
+from .imports import ShiftImportError, parse_shift_rows, import_shifts
+from .recurrence import generate_shifts
+from .coverage import MAX_TIME_BUDGET, plan_coverage, save_coverage_plan
+
+# Количество графиков на странице списка
+SCHEDULE_LIST_PAGE_SIZE = 100
 
 def create_work_schedule(request):
     """
@@ -24,7 +39,8 @@ def create_work_shift(request, schedule_id):
     """
     Представление для создания смены.
 
-    Если запрос POST, проверяет данные формы на конфликт и сохраняет смену.
+    Если запрос POST, проверяет данные формы на конфликт со сменами графика
+    и с другими сменами сотрудника во всех графиках, и сохраняет смену.
     """
     schedule = get_object_or_404(WorkSchedule, id=schedule_id)
     if request.method == 'POST':
@@ -32,15 +48,73 @@ def create_work_shift(request, schedule_id):
         if form.is_valid():
             shift = form.save(commit=False)
             shift.schedule = schedule
-            if schedule.check_conflicts():
+            conflicts = schedule.find_conflicts(new_shifts=[shift]) + find_employee_double_bookings([shift])
+            if not conflicts:
                 shift.save()
                 return redirect('schedule_detail', pk=schedule.id)
-            else:
-                form.add_error(None, 'Конфликт смен в расписании')
+            others = {}
+            for shift_a, shift_b in conflicts:
+                other = shift_b if shift_a is shift else shift_a
+                others[other.pk] = other
+            for other in others.values():
+                form.add_error(None, f'Конфликт смен в расписании: {other}')
     else:
         form = WorkShiftForm(initial={'schedule': schedule})
     return render(request, 'documents/create_work_shift.html', {'form': form, 'schedule': schedule})
 
+def parse_schedule_cursor(value):
+    """
+    Разбирает курсор страницы списка графиков вида '<дата начала>.<ID>' (последний график предыдущей страницы).
+
+    Возвращает:
+        tuple: (дата начала, ID) или None, если курсор не задан или неверен.
+    """
+    start_date, _, schedule_id = value.partition('.')
+    try:
+        return date.fromisoformat(start_date), int(schedule_id)
+    except ValueError:
+        return None
+
+async def work_schedule_list(request):
+    """
+    Асинхронное представление для вывода списка графиков работы.
+
+    Необязательные фильтры (GET): pickup_point_id, employee_id, status.
+    Сотрудник и пункт выдачи загружаются тем же запросом.
+    Список выводится страницами по SCHEDULE_LIST_PAGE_SIZE графиков с курсором (keyset) в параметре
+    after: следующая страница выбирается условием по (start_date, id) без OFFSET, поэтому
+    любая страница стоит столько же, сколько первая.
+    """
+    schedules = WorkSchedule.objects.select_related('employee', 'pickup_point').order_by('-start_date', 'id')
+    for param in ('pickup_point_id', 'employee_id'):
+        if request.GET.get(param, '').isdigit():
+            schedules = schedules.filter(**{param: int(request.GET[param])})
+    if request.GET.get('status'):
+        schedules = schedules.filter(status=request.GET['status'])
+    cursor = parse_schedule_cursor(request.GET.get('after', ''))
+    if cursor:
+        start_date, schedule_id = cursor
+        schedules = schedules.filter(Q(start_date__lt=start_date) | Q(start_date=start_date, id__gt=schedule_id))
+    schedules = [schedule async for schedule in schedules[:SCHEDULE_LIST_PAGE_SIZE + 1]]
+
+    next_url = None
+    if len(schedules) > SCHEDULE_LIST_PAGE_SIZE:
+        schedules = schedules[:SCHEDULE_LIST_PAGE_SIZE]
+        params = request.GET.copy()
+        params['after'] = f'{schedules[-1].start_date.isoformat()}.{schedules[-1].pk}'
+        next_url = f'{request.path}?{params.urlencode()}'
+    return render(request, 'documents/work_schedule_list.html', {'schedules': schedules, 'next_url': next_url})
+
+async def work_schedule_detail(request, pk):
+    """
+    Асинхронное представление для вывода графика работы и его смен.
+
+    Смены вместе с сотрудниками читаются одним запросом в порядке даты и времени начала.
+    """
+    schedule = await aget_object_or_404(WorkSchedule.objects.select_related('employee', 'pickup_point'), pk=pk)
+    shifts = [shift async for shift in schedule.shifts.select_related('employee').order_by('date', 'start_time')]
+    return render(request, 'documents/work_schedule_detail.html', {'schedule': schedule, 'shifts': shifts})
+
 def approve_work_schedule(request, schedule_id):
     """
     Представление для утверждения графика работы.
@@ -50,3 +124,203 @@ def approve_work_schedule(request, schedule_id):
     schedule = get_object_or_404(WorkSchedule, id=schedule_id)
     schedule.approve_schedule()
     return redirect('schedule_list')
+
+def apply_schedule_action(schedule_ids, action, comment=None):
+    """
+    Утверждает или отклоняет графики работы пакетом.
+
+    Статусы графиков и смен обновляются set-based запросами, а записи
+    WorkScheduleRegister создаются одним bulk_create в той же транзакции.
+
+    Аргументы:
+        schedule_ids (set): ID графиков.
+        action (str): 'approve' или 'reject'.
+        comment (str): Необязательный комментарий для записей регистра.
+
+    Возвращает:
+        dict: Действие, ID обработанных графиков и ID не найденных графиков.
+    """
+    with transaction.atomic():
+        found_ids = sorted(
+            WorkSchedule.objects.select_for_update().filter(id__in=schedule_ids).values_list('id', flat=True)
+        )
+        schedules = WorkSchedule.objects.filter(id__in=found_ids)
+        if action == 'approve':
+            schedules.approve()
+            status = 'approved'
+        else:
+            schedules.reject()
+            status = 'rejected'
+        WorkScheduleRegister.objects.bulk_create([
+            WorkScheduleRegister(work_schedule_id=schedule_id, status=status, comment=comment)
+            for schedule_id in found_ids
+        ])
+
+    return {
+        'action': action,
+        'updated': found_ids,
+        'not_found': sorted(set(schedule_ids).difference(found_ids)),
+    }
+
+@require_POST
+def batch_update_work_schedules(request):
+    """
+    Представление для пакетного утверждения или отклонения графиков работы (см. apply_schedule_action).
+    Для больших пакетов - фоновое задание documents.batch_update_schedules (см. documents.jobs).
+
+    Ожидает POST-параметры:
+        schedule_ids (list): Список ID графиков (повторяющийся параметр).
+        action (str): 'approve' или 'reject'.
+        comment (str): Необязательный комментарий для записей регистра.
+
+    Возвращает:
+        JsonResponse: Действие, ID обработанных графиков и ID не найденных графиков.
+    """
+    action = request.POST.get('action')
+    if action not in ('approve', 'reject'):
+        return JsonResponse({'error': "Параметр action должен быть 'approve' или 'reject'"}, status=400)
+    try:
+        schedule_ids = {int(schedule_id) for schedule_id in request.POST.getlist('schedule_ids')}
+    except ValueError:
+        return JsonResponse({'error': 'Параметр schedule_ids должен содержать целые числа'}, status=400)
+    return JsonResponse(apply_schedule_action(schedule_ids, action, request.POST.get('comment') or None))
+
+@require_POST
+def import_work_shifts(request, schedule_id):
+    """
+    Представление для массового импорта смен в график из CSV или JSON.
+
+    Данные принимаются либо файлом (multipart, поле file), либо телом запроса
+    с Content-Type text/csv или application/json. Формат файла определяется
+    параметром format ('csv' или 'json'), расширением файла или Content-Type.
+    Содержимое должно быть в кодировке UTF-8, иначе возвращается ошибка 400.
+
+    Все строки проверяются за один проход; при наличии ошибок ничего не сохраняется.
+
+    Возвращает:
+        JsonResponse: {'created': N} с кодом 201 или {'created': 0, 'errors': [...]} с кодом 400,
+            где errors - список {'row': номер строки, 'errors': [сообщения]}.
+    """
+    schedule = get_object_or_404(WorkSchedule.objects.select_related('pickup_point'), id=schedule_id)
+    if request.content_type == 'multipart/form-data':
+        upload = request.FILES.get('file')
+        if upload is None:
+            return JsonResponse({'error': 'Не передан файл (поле file)'}, status=400)
+        name = upload.name.lower()
+        content_type = request.POST.get('format') or ('json' if name.endswith('.json') else 'csv')
+        data = upload.read()
+    else:
+        content_type = request.GET.get('format') or ('json' if 'json' in request.content_type else 'csv')
+        data = request.body
+    try:
+        content = data.decode('utf-8')
+    except UnicodeDecodeError:
+        return JsonResponse({'error': 'Файл должен быть в кодировке UTF-8'}, status=400)
+
+    try:
+        rows = parse_shift_rows(content, content_type)
+    except ShiftImportError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+    created, errors = import_shifts(schedule, rows)
+    if errors:
+        return JsonResponse({'created': 0, 'errors': errors}, status=400)
+    return JsonResponse({'created': created}, status=201)
+
+@require_POST
+def generate_work_shifts(request):
+    """
+    Представление для заполнения графиков сменами по шаблонам (ShiftTemplate).
+
+    Ожидает POST-параметры:
+        schedule_ids (list): Список ID графиков (повторяющийся параметр).
+        preview (str): Если '1', смены только вычисляются и возвращаются, без записи в базу.
+
+    Возвращает:
+        JsonResponse: Количество созданных (или вычисленных) и пропущенных из-за пересечений смен,
+            ID графиков без шаблона; в режиме preview - также список смен.
+    """
+    try:
+        schedule_ids = {int(schedule_id) for schedule_id in request.POST.getlist('schedule_ids')}
+    except ValueError:
+        return JsonResponse({'error': 'Параметр schedule_ids должен содержать целые числа'}, status=400)
+    preview = request.POST.get('preview') == '1'
+    result = generate_shifts(WorkSchedule.objects.filter(id__in=schedule_ids).order_by('id'), preview=preview)
+
+    data = {
+        'preview': preview,
+        'created': 0 if preview else len(result.shifts),
+        'generated': len(result.shifts),
+        'skipped': len(result.skipped),
+        'schedules_without_template': result.schedules_without_template,
+    }
+    if preview:
+        data['shifts'] = [
+            {
+                'schedule_id': shift.schedule_id,
+                'employee_id': shift.employee_id,
+                'date': shift.date.isoformat(),
+                'start_time': shift.start_time.isoformat(timespec='minutes'),
+                'end_time': shift.end_time.isoformat(timespec='minutes'),
+            }
+            for shift in result.shifts
+        ]
+    return JsonResponse(data)
+
+@require_POST
+def plan_work_coverage(request):
+    """
+    Представление для автоматического планирования смен агента по потребностям пунктов выдачи.
+
+    Ожидает POST-параметры:
+        agent_id (int): ID агента (необязателен, если указан accounting_period_id).
+        start_date, end_date (str): Период планирования (YYYY-MM-DD); по умолчанию - период accounting_period_id.
+        accounting_period_id (int): Необязательный учетный период.
+        time_budget (float): Ограничение времени планирования в секундах (не более MAX_TIME_BUDGET).
+        preview (str): Если '1', план только вычисляется, без записи в базу.
+
+    Возвращает:
+        JsonResponse: Количество потребностей, назначенных и созданных смен и графиков,
+            время планирования и незакрытые потребности в разрезе пункта выдачи и даты.
+    """
+    try:
+        agent_id = int(request.POST['agent_id']) if request.POST.get('agent_id') else None
+        start_date = date.fromisoformat(request.POST['start_date']) if request.POST.get('start_date') else None
+        end_date = date.fromisoformat(request.POST['end_date']) if request.POST.get('end_date') else None
+        time_budget = min(float(request.POST.get('time_budget') or 2), MAX_TIME_BUDGET)
+        if request.POST.get('accounting_period_id'):
+            period = get_object_or_404(AccountingPeriod, id=int(request.POST['accounting_period_id']))
+            agent_id = agent_id or period.agent_id
+            start_date = start_date or period.start_date
+            end_date = end_date or period.end_date
+    except ValueError:
+        return JsonResponse({'error': 'Некорректные параметры планирования'}, status=400)
+    if agent_id is None or start_date is None or end_date is None or start_date > end_date:
+        return JsonResponse({'error': 'Укажите агента и период (или учетный период)'}, status=400)
+    agent = get_object_or_404(Agent, id=agent_id)
+
+    preview = request.POST.get('preview') == '1'
+    plan = plan_coverage(agent, start_date, end_date, time_budget=time_budget)
+    if not preview:
+        save_coverage_plan(plan)
+
+    unfilled = Counter(
+        (slot.pickup_point_id, slot.date, slot.start_time, slot.end_time) for slot in plan.unfilled
+    )
+    return JsonResponse({
+        'preview': preview,
+        'slots': len(plan.slots),
+        'assigned': len(plan.assigned),
+        'created_shifts': plan.created_shifts,
+        'created_schedules': plan.created_schedules,
+        'elapsed_ms': round(plan.elapsed * 1000),
+        'unfilled': [
+            {
+                'pickup_point_id': pickup_point_id,
+                'date': slot_date.isoformat(),
+                'start_time': start_time.isoformat(timespec='minutes'),
+                'end_time': end_time.isoformat(timespec='minutes'),
+                'missing': missing,
+            }
+            for (pickup_point_id, slot_date, start_time, end_time), missing in sorted(unfilled.items())
+        ],
+    })
@@ -1,7 +1,29 @@
 # reference_books/admin.py
 
 from django.contrib import admin
-from .models import Agent, PickupPoint, Employee, AccountingPeriod
+from .models import Agent, PickupPoint, Employee, AccountingPeriod, ShiftTemplate, EmployeeAbsence
+from .search import filter_by_search
+
+
+class SearchIndexAdminMixin:
+    """
+    Поиск в списке изменения (и в автодополнении) по полнотекстовому индексу вместо icontains
+    по search_fields: каждое слово ищется по префиксу, найденные элементы отбираются подзапросом
+    к индексу (см. reference_books.search.filter_by_search).
+
+    Атрибуты:
+        search_index_model (Model): Модель индекса (Employee или PickupPoint), по умолчанию модель админки.
+        search_index_field (str): Поле модели админки, по которому отбираются найденные ID
+            (например, 'employee' для документов сотрудника).
+    """
+    search_index_model = None
+    search_index_field = 'pk'
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return super().get_search_results(request, queryset, search_term)
+        return filter_by_search(queryset, search_term, self.search_index_model, self.search_index_field), False
+
 
 @admin.register(Agent)
 class AgentAdmin(admin.ModelAdmin):
@@ -21,31 +43,31 @@ class AgentAdmin(admin.ModelAdmin):
 
 
 @admin.register(PickupPoint)
-class PickupPointAdmin(admin.ModelAdmin):
+class PickupPointAdmin(SearchIndexAdminMixin, admin.ModelAdmin):
     """
     Админ-класс для модели PickupPoint с настройками отображения, фильтрации и поиска.
 
     Атрибуты:
         list_display (tuple): Поля для отображения в списке пунктов самовывоза.
         list_filter (tuple): Поля для фильтрации пунктов самовывоза.
-        search_fields (tuple): Поля для поиска пунктов самовывоза.
+        search_fields (tuple): Поля для поиска пунктов самовывоза (поиск выполняется по индексу, см. SearchIndexAdminMixin).
         ordering (tuple): Поля для сортировки пунктов самовывоза.
     """
-    list_display = ('name', 'address', 'agent', 'created_at', 'updated_at')
+    list_display = ('name', 'address', 'agent', 'opening_time', 'closing_time', 'required_staff', 'created_at', 'updated_at')
     list_filter = ('agent', 'created_at')
     search_fields = ('name', 'address')
     ordering = ('name',)
     
 
 @admin.register(Employee)
-class EmployeeAdmin(admin.ModelAdmin):
+class EmployeeAdmin(SearchIndexAdminMixin, admin.ModelAdmin):
     """
     Админ-класс для модели Employee с настройками отображения, фильтрации и поиска.
 
     Атрибуты:
         list_display (tuple): Поля для отображения в списке сотрудников.
         list_filter (tuple): Поля для фильтрации сотрудников.
-        search_fields (tuple): Поля для поиска сотрудников.
+        search_fields (tuple): Поля для поиска сотрудников (поиск выполняется по индексу, см. SearchIndexAdminMixin).
         ordering (tuple): Поля для сортировки сотрудников.
         actions (list): Список доступных действий в админке.
     """
@@ -85,3 +107,37 @@ class AccountingPeriodAdmin(admin.ModelAdmin):
     list_filter = ('start_date', 'end_date', 'agent')
     search_fields = ('agent__name',)
     ordering = ('-start_date',)
+
+
+@admin.register(ShiftTemplate)
+class ShiftTemplateAdmin(admin.ModelAdmin):
+    """
+    Админ-класс для модели ShiftTemplate с настройками отображения, фильтрации и поиска.
+
+    Атрибуты:
+        list_display (tuple): Поля для отображения в списке шаблонов смен.
+        list_filter (tuple): Поля для фильтрации шаблонов смен.
+        search_fields (tuple): Поля для поиска шаблонов смен.
+        ordering (tuple): Поля для сортировки шаблонов смен.
+    """
+    list_display = ('name', 'employee', 'pickup_point', 'anchor_date', 'pattern', 'is_active')
+    list_filter = ('is_active', 'pickup_point')
+    search_fields = ('name', 'employee__last_name', 'pickup_point__name')
+    ordering = ('name',)
+
+
+@admin.register(EmployeeAbsence)
+class EmployeeAbsenceAdmin(admin.ModelAdmin):
+    """
+    Админ-класс для модели EmployeeAbsence с настройками отображения, фильтрации и поиска.
+
+    Атрибуты:
+        list_display (tuple): Поля для отображения в списке периодов недоступности.
+        list_filter (tuple): Поля для фильтрации периодов недоступности.
+        search_fields (tuple): Поля для поиска периодов недоступности.
+        ordering (tuple): Поля для сортировки периодов недоступности.
+    """
+    list_display = ('employee', 'name', 'start_date', 'end_date')
+    list_filter = ('start_date',)
+    search_fields = ('employee__last_name', 'employee__first_name', 'name')
+    ordering = ('-start_date',)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ReferenceBooksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'reference_books'
+
+    def ready(self):
+        from . import signals  # Подключение обработчиков сигналов (поисковый индекс)
@@ -0,0 +1,64 @@
+# reference_books/cache.py
+
+from core.cache import cached_query
+from .models import Agent, PickupPoint, Employee, AccountingPeriod
+
+# Связи, загружаемые вместе с элементом справочника, и модели, от которых зависит закэшированный элемент
+RELATED_FIELDS = {
+    Agent: (),
+    PickupPoint: ('agent',),
+    Employee: ('agent', 'default_pickup_point'),
+    AccountingPeriod: ('agent',),
+}
+DEPENDENCIES = {
+    Agent: (Agent,),
+    PickupPoint: (PickupPoint, Agent),
+    Employee: (Employee, Agent, PickupPoint),
+    AccountingPeriod: (AccountingPeriod, Agent),
+}
+
+
+def get_reference_book(model, pk):
+    """
+    Возвращает элемент справочника по ID через кэш.
+
+    Аргументы:
+        model (Model): Agent, PickupPoint, Employee или AccountingPeriod.
+        pk (int): ID элемента.
+
+    Возвращает:
+        Model: Элемент справочника со связанными объектами (RELATED_FIELDS) или None, если он не найден.
+    """
+    return cached_query(
+        f'{model._meta.model_name}:{int(pk)}', DEPENDENCIES[model],
+        lambda: model.objects.select_related(*RELATED_FIELDS[model]).filter(pk=pk).first(),
+    )
+
+
+def get_agent_pickup_points(agent_id):
+    """
+    Возвращает пункты выдачи агента через кэш.
+
+    Возвращает:
+        list: Пункты выдачи агента, упорядоченные по ID.
+    """
+    return cached_query(
+        f'agent:{int(agent_id)}:pickup_points', (PickupPoint,),
+        lambda: list(PickupPoint.objects.filter(agent_id=agent_id).order_by('id')),
+    )
+
+
+def get_active_employees(agent_id):
+    """
+    Возвращает активных сотрудников агента через кэш.
+
+    Возвращает:
+        list: Активные сотрудники агента (с пунктом выдачи по умолчанию), упорядоченные по фамилии и имени.
+    """
+    return cached_query(
+        f'agent:{int(agent_id)}:active_employees', (Employee, PickupPoint),
+        lambda: list(
+            Employee.objects.filter(agent_id=agent_id, is_active=True)
+            .select_related('default_pickup_point').order_by('last_name', 'first_name', 'id')
+        ),
+    )
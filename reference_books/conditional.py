@@ -0,0 +1,67 @@
+# reference_books/conditional.py
+
+import hashlib
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils.cache import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+from core.cache import get_cache
+
+
+class ConditionalListMixin:
+    """
+    Примесь для ViewSet справочников: условный GET (ETag / If-None-Match) и необязательный
+    серверный кэш ответов списка.
+
+    Валидатор списка вычисляется без выборки строк, только по состоянию базы: по max(updated_at)
+    и количеству строк модели и моделей, данные которых попадают в ответ (etag_dependencies),
+    и параметрам запроса (курсор и размер страницы). Поэтому все процессы сервера и перезапуски
+    выдают для одних и тех же данных один ETag. Массовые UPDATE справочников тоже обновляют
+    updated_at (см. core.models.ReferenceBookQuerySet), удаление меняет количество строк.
+    Если клиент прислал тот же ETag в If-None-Match, возвращается 304 без выборки и сериализации.
+
+    Если REFERENCE_API_RESPONSE_CACHE_TIMEOUT > 0, данные ответа кэшируются для каждого
+    пользователя по ключу с ETag, поэтому любая запись в справочник делает их недоступными.
+
+    Атрибуты:
+        etag_dependencies (tuple): Модели, помимо модели queryset, от которых зависит ответ.
+    """
+    etag_dependencies = ()
+
+    def get_etag_models(self):
+        """
+        Возвращает модели, от которых зависит ответ списка.
+        """
+        return (self.get_queryset().model,) + tuple(self.etag_dependencies)
+
+    def get_list_etag(self, request):
+        """
+        Возвращает ETag списка (в кавычках).
+        """
+        models = self.get_etag_models()
+        parts = [request.path, request.META.get('QUERY_STRING', '')]
+        for model in models:
+            # Оба агрегата вычисляются по индексу updated_at (покрывающему), без чтения строк таблицы
+            state = model._default_manager.aggregate(last_update=Max('updated_at'), count=Count('pk'))
+            parts.append(f"{model._meta.label_lower}:{state['last_update']}:{state['count']}")
+        return quote_etag(hashlib.md5('|'.join(parts).encode()).hexdigest())
+
+    def list(self, request, *args, **kwargs):
+        etag = self.get_list_etag(request)
+        if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+        if etag in if_none_match or '*' in if_none_match:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        timeout = getattr(settings, 'REFERENCE_API_RESPONSE_CACHE_TIMEOUT', 0)
+        cache_key = f'refbook:response:{request.user.pk}:{etag}'
+        data = get_cache().get(cache_key) if timeout else None
+        if data is not None:
+            response = Response(data)
+        else:
+            response = super().list(request, *args, **kwargs)
+            if timeout and response.status_code == status.HTTP_200_OK:
+                get_cache().set(cache_key, response.data, timeout)
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
@@ -0,0 +1,99 @@
+# reference_books/fieldsets.py
+
+from rest_framework.exceptions import ValidationError
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def parse_field_list(value):
+    """
+    Разбирает значение параметра fields/exclude ("id,name" или повторяющийся параметр).
+
+    Возвращает:
+        list: Имена полей без пустых значений и повторов.
+    """
+    names = []
+    for item in value:
+        for name in item.split(','):
+            name = name.strip()
+            if name and name not in names:
+                names.append(name)
+    return names
+
+
+def get_requested_fields(request, available):
+    """
+    Возвращает поля ответа с учетом параметров ?fields= и ?exclude=.
+
+    Аргументы:
+        request (Request): Запрос DRF.
+        available (iterable): Имена всех полей сериализатора в порядке вывода.
+
+    Возвращает:
+        list: Имена выбранных полей или None, если параметры не заданы.
+
+    Исключения:
+        ValidationError: Если указаны неизвестные поля.
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    fields = parse_field_list(request.query_params.getlist('fields'))
+    exclude = parse_field_list(request.query_params.getlist('exclude'))
+    if not fields and not exclude:
+        return None
+    available = list(available)
+    unknown = [name for name in fields + exclude if name not in available]
+    if unknown:
+        raise ValidationError({'fields': f'Неизвестные поля: {", ".join(unknown)}'})
+    return [name for name in available if (not fields or name in fields) and name not in exclude]
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Примесь для ModelSerializer: оставляет в ответе только поля из ?fields= (без полей из ?exclude=).
+    Параметры учитываются только для чтения (GET, HEAD, OPTIONS).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = get_requested_fields(self.context.get('request'), self.fields)
+        if requested is not None:
+            for name in list(self.fields):
+                if name not in requested:
+                    self.fields.pop(name)
+
+
+class SparseFieldsetViewMixin:
+    """
+    Примесь для ViewSet: сокращает SQL-запрос до полей, выбранных через ?fields= / ?exclude=.
+
+    Основная таблица читается через only() (первичный ключ и столбцы выбранных полей),
+    связанные объекты присоединяются (select_related) только для выбранных полей-связей.
+    Если среди выбранных есть поле, не соответствующее столбцу модели, запрос не сокращается.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        request = getattr(self, 'request', None)
+        if request is None or request.method not in SAFE_METHODS:
+            return queryset
+        if not request.query_params.get('fields') and not request.query_params.get('exclude'):
+            return queryset
+
+        serializer_class = self.get_serializer_class()
+        fields = serializer_class(context=self.get_serializer_context()).fields
+        model_fields = {field.name: field for field in queryset.model._meta.concrete_fields}
+        only = {queryset.model._meta.pk.name}
+        related = []
+        for field in fields.values():
+            name = field.source.split('.')[0]
+            if name not in model_fields:
+                return queryset
+            only.add(name)
+            if model_fields[name].is_relation:
+                related.append(name)
+        queryset = queryset.select_related(None)
+        if related:
+            # select_related() без аргументов присоединил бы все связи
+            queryset = queryset.select_related(*related)
+        return queryset.only(*only)
@@ -0,0 +1,32 @@
+# reference_books/management/commands/rebuild_search_index.py
+
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from reference_books.search import is_supported, rebuild_index
+
+
+class Command(BaseCommand):
+    """
+    Команда для полной перестройки поискового индекса сотрудников и пунктов выдачи.
+
+    Индекс поддерживается сигналами при сохранении, удалении и массовых операциях справочников;
+    перестройка нужна после изменений в обход ORM (SQL, загрузка копии базы).
+
+    Пример:
+        python manage.py rebuild_search_index
+    """
+    help = 'Перестраивает полнотекстовый индекс сотрудников и пунктов выдачи'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Псевдоним базы данных')
+
+    def handle(self, *args, **options):
+        if not is_supported(connections[options['database']]):
+            raise CommandError('Полнотекстовый индекс поддерживается только для SQLite')
+        started = time.perf_counter()
+        with transaction.atomic(using=options['database']):
+            counts = rebuild_index(options['database'])
+        for kind, count in counts.items():
+            self.stdout.write(f'{kind}: {count}')
+        self.stdout.write(f'Готово за {time.perf_counter() - started:.1f} с')
@@ -0,0 +1,46 @@
+# Generated by Django 5.1 on 2026-10-18 19:52
+
+import datetime
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reference_books', '0002_shift_templates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pickuppoint',
+            name='closing_time',
+            field=models.TimeField(default=datetime.time(21, 0)),
+        ),
+        migrations.AddField(
+            model_name='pickuppoint',
+            name='opening_time',
+            field=models.TimeField(default=datetime.time(9, 0)),
+        ),
+        migrations.AddField(
+            model_name='pickuppoint',
+            name='required_staff',
+            field=models.PositiveSmallIntegerField(default=1),
+        ),
+        migrations.CreateModel(
+            name='EmployeeAbsence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='absences', to='reference_books.employee')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
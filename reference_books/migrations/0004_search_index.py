@@ -0,0 +1,43 @@
+# Полнотекстовый индекс FTS5 по сотрудникам и пунктам выдачи (см. reference_books.search)
+
+from django.db import migrations
+
+# Заполнение индекса существующими записями; значения совпадают с reference_books.search.get_document
+FILL_SQL = (
+    "INSERT INTO reference_books_search (kind, object_id, agent_id, title, details) "
+    "SELECT 'employee', id, agent_id, "
+    "replace(replace(trim(last_name || ' ' || first_name || ' ' || coalesce(middle_name, '')), 'ё', 'е'), 'Ё', 'Е'), "
+    "replace(replace(email || coalesce(' ' || nullif(phone_number, ''), '') || coalesce(' ' || nullif(position, ''), ''), "
+    "'ё', 'е'), 'Ё', 'Е') FROM reference_books_employee",
+    "INSERT INTO reference_books_search (kind, object_id, agent_id, title, details) "
+    "SELECT 'pickup_point', id, agent_id, replace(replace(name, 'ё', 'е'), 'Ё', 'Е'), "
+    "replace(replace(address, 'ё', 'е'), 'Ё', 'Е') FROM reference_books_pickuppoint",
+)
+
+
+def create_search_index(apps, schema_editor):
+    from reference_books.search import CREATE_TABLE_SQL, is_supported
+
+    if not is_supported(schema_editor.connection):
+        return
+    schema_editor.execute(CREATE_TABLE_SQL)
+    for sql in FILL_SQL:
+        schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    from reference_books.search import DROP_TABLE_SQL, is_supported
+
+    if is_supported(schema_editor.connection):
+        schema_editor.execute(DROP_TABLE_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reference_books', '0003_coverage_requirements'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
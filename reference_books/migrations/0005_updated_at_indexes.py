@@ -0,0 +1,39 @@
+# Generated by Django 5.1 on 2026-10-18 20:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reference_books', '0004_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='accountingperiod',
+            index=models.Index(fields=['updated_at'], name='accountingperiod_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='agent',
+            index=models.Index(fields=['updated_at'], name='agent_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['updated_at'], name='employee_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employeeabsence',
+            index=models.Index(fields=['updated_at'], name='employeeabsence_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pickuppoint',
+            index=models.Index(fields=['updated_at'], name='pickuppoint_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shifttemplate',
+            index=models.Index(fields=['updated_at'], name='shifttemplate_updated_idx'),
+        ),
+    ]
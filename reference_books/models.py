@@ -1,5 +1,7 @@
 # reference_books/models.py
 
+from datetime import time
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.contrib.auth.models import User
 from core.models import ReferenceBook
@@ -18,6 +20,7 @@ class Agent(ReferenceBook):
     def get_pickup_points(self):
         """
         Возвращает все пункты выдачи, связанные с агентом.
+        Закэшированный список пунктов выдачи агента возвращает reference_books.cache.get_agent_pickup_points.
 
         Возвращает:
             QuerySet: Набор пунктов выдачи, связанных с агентом.
@@ -35,9 +38,15 @@ class PickupPoint(ReferenceBook):
     Атрибуты:
         address (CharField): Адрес пункта выдачи.
         agent (ForeignKey): Связь с моделью Agent.
+        opening_time (TimeField): Время открытия пункта выдачи.
+        closing_time (TimeField): Время закрытия пункта выдачи.
+        required_staff (PositiveSmallIntegerField): Количество сотрудников, одновременно необходимых в смене.
     """
     address = models.CharField(max_length=255)
     agent = models.ForeignKey(Agent, related_name='pickup_points', on_delete=models.CASCADE)
+    opening_time = models.TimeField(default=time(9, 0))
+    closing_time = models.TimeField(default=time(21, 0))
+    required_staff = models.PositiveSmallIntegerField(default=1)
 
     def __str__(self):
         return self.name
@@ -84,7 +93,7 @@ class Employee(ReferenceBook):
     default_pickup_point = models.ForeignKey(PickupPoint, on_delete=models.SET_NULL, blank=True, null=True)
     is_active = models.BooleanField(default=True)
     
-    class Meta:
+    class Meta(ReferenceBook.Meta):
         permissions = [
             ('manage_employees', 'Can manage employees'),
             ('view_personal_data', 'Can view personal data of employees')
@@ -110,6 +119,24 @@ class Employee(ReferenceBook):
         self.save()
 
 
+class EmployeeAbsence(ReferenceBook):
+    """
+    Справочник EmployeeAbsence представляет период недоступности сотрудника (отпуск, больничный и т.п.).
+    В эти дни сотрудник не назначается на смены при автоматическом планировании.
+
+    Атрибуты:
+        employee (ForeignKey): Сотрудник.
+        start_date (DateField): Первый день недоступности.
+        end_date (DateField): Последний день недоступности.
+    """
+    employee = models.ForeignKey(Employee, related_name='absences', on_delete=models.CASCADE)
+    start_date = models.DateField()
+    end_date = models.DateField()
+
+    def __str__(self):
+        return f"{self.employee}: {self.start_date} - {self.end_date}"
+
+
 class AccountingPeriod(ReferenceBook):
     """
     Справочник AccountingPeriod представляет учетный период, связанный с агентом.
@@ -141,3 +168,79 @@ class AccountingPeriod(ReferenceBook):
         from django.utils import timezone
         today = timezone.now().date()
         return self.start_date <= today <= self.end_date
+
+
+class ShiftTemplate(ReferenceBook):
+    """
+    Справочник ShiftTemplate представляет повторяющийся шаблон смен (2/2, 5/2, день/ночь и т.п.).
+
+    Шаблон привязывается к сотруднику, к пункту выдачи или к обоим. Для графика работы
+    используется наиболее точный шаблон: сотрудник и пункт выдачи, затем только сотрудник,
+    затем только пункт выдачи.
+
+    Шаблон задается циклом дней через запятую, начиная с anchor_date. День цикла - это
+    выходной ("-") или один или несколько интервалов "ЧЧ:ММ-ЧЧ:ММ" через точку с запятой.
+    Интервал не может переходить через полночь: ночная смена записывается двумя
+    интервалами соседних дней. Интервалы одного дня не должны пересекаться (смежные допустимы).
+    Примеры:
+        2/2: "09:00-21:00,09:00-21:00,-,-"
+        день/ночь: "08:00-20:00,20:00-23:59,00:00-08:00,-"
+
+    Атрибуты:
+        employee (ForeignKey): Сотрудник, к которому привязан шаблон (необязательно).
+        pickup_point (ForeignKey): Пункт выдачи, к которому привязан шаблон (необязательно).
+        anchor_date (DateField): Дата, с которой начинается первый день цикла.
+        pattern (CharField): Цикл дней шаблона.
+        is_active (BooleanField): Используется ли шаблон при заполнении графиков.
+    """
+    employee = models.ForeignKey(Employee, related_name='shift_templates', on_delete=models.CASCADE, blank=True, null=True)
+    pickup_point = models.ForeignKey(
+        PickupPoint, related_name='shift_templates', on_delete=models.CASCADE, blank=True, null=True
+    )
+    anchor_date = models.DateField()
+    pattern = models.CharField(max_length=1000)
+    is_active = models.BooleanField(default=True)
+
+    def clean(self):
+        """
+        Проверяет привязку шаблона и корректность цикла дней.
+        """
+        if self.employee_id is None and self.pickup_point_id is None:
+            raise ValidationError('Шаблон должен быть привязан к сотруднику или к пункту выдачи')
+        try:
+            self.get_cycle()
+        except ValueError as error:
+            raise ValidationError({'pattern': str(error)})
+
+    def get_cycle(self):
+        """
+        Разбирает цикл дней шаблона.
+
+        Возвращает:
+            list: Для каждого дня цикла список интервалов (start_time, end_time); пустой список - выходной.
+
+        Исключения:
+            ValueError: Если цикл задан неверно или интервалы одного дня пересекаются.
+        """
+        cycle = []
+        for day in self.pattern.split(','):
+            day = day.strip()
+            intervals = []
+            if day != '-':
+                for interval in day.split(';'):
+                    try:
+                        start, end = (time.fromisoformat(value.strip()) for value in interval.split('-'))
+                    except ValueError:
+                        raise ValueError(f'Некорректный интервал "{interval}", ожидается ЧЧ:ММ-ЧЧ:ММ')
+                    if start >= end:
+                        raise ValueError(f'Начало интервала "{interval}" должно быть раньше окончания')
+                    intervals.append((start, end))
+            intervals.sort()
+            for (_, previous_end), (start, end) in zip(intervals, intervals[1:]):
+                if start < previous_end:
+                    raise ValueError(f'Интервалы дня "{day}" пересекаются')
+            cycle.append(intervals)
+        return cycle
+
+    def __str__(self):
+        return self.name
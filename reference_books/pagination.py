@@ -0,0 +1,22 @@
+# reference_books/pagination.py
+
+from rest_framework.pagination import CursorPagination
+
+
+class ReferenceBookCursorPagination(CursorPagination):
+    """
+    Курсорная (keyset) пагинация для API справочников.
+
+    Страницы выбираются условием по первичному ключу (WHERE id > <курсор>) вместо OFFSET,
+    поэтому любая страница, сколь угодно далекая, стоит столько же, сколько первая.
+    Порядок по id стабилен: он не меняется при редактировании записей.
+
+    Атрибуты:
+        page_size (int): Размер страницы по умолчанию (берется из REST_FRAMEWORK['PAGE_SIZE']).
+        page_size_query_param (str): Параметр запроса для изменения размера страницы.
+        max_page_size (int): Максимальный размер страницы.
+        ordering (str): Поле упорядочивания.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    ordering = 'id'
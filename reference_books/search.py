@@ -0,0 +1,285 @@
+# reference_books/search.py
+
+import re
+from django.db import connections, router
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from .models import Employee, PickupPoint
+
+SEARCH_TABLE = 'reference_books_search'
+SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+INDEX_BATCH_SIZE = 2000
+# Вес совпадения в названии по сравнению с остальными полями (для bm25)
+TITLE_WEIGHT = 10.0
+# Более короткие слова ищутся целиком: префикс из одного символа совпадает с большой частью индекса
+MIN_PREFIX_LENGTH = 2
+
+# Виды элементов индекса и поля, по которым они ищутся без индекса (не SQLite)
+SEARCH_MODELS = {
+    'employee': Employee,
+    'pickup_point': PickupPoint,
+}
+FALLBACK_FIELDS = {
+    Employee: ('last_name', 'first_name', 'middle_name', 'email', 'phone_number', 'position'),
+    PickupPoint: ('name', 'address'),
+}
+
+CREATE_TABLE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+    "kind UNINDEXED, object_id UNINDEXED, agent_id UNINDEXED, title, details, "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+)
+DROP_TABLE_SQL = f'DROP TABLE IF EXISTS {SEARCH_TABLE}'
+
+
+def is_supported(connection):
+    """
+    Проверяет, поддерживает ли база полнотекстовый индекс (SQLite с FTS5).
+    """
+    return connection.vendor == 'sqlite'
+
+
+def normalize(text):
+    """
+    Приводит текст к виду, в котором он хранится в индексе: токенизатор unicode61 не отождествляет "ё" и "е".
+    """
+    return (text or '').replace('ё', 'е').replace('Ё', 'Е')
+
+
+def get_kind(model):
+    """
+    Возвращает вид элемента индекса для модели.
+    """
+    for kind, search_model in SEARCH_MODELS.items():
+        if search_model is model:
+            return kind
+    raise ValueError(f'Модель {model.__name__} не входит в поисковый индекс')
+
+
+def get_document(obj):
+    """
+    Возвращает строку индекса для сотрудника или пункта выдачи.
+
+    Возвращает:
+        tuple: (вид, ID, ID агента, название, остальные поля для поиска).
+    """
+    if isinstance(obj, Employee):
+        title = obj.get_full_name()
+        details = ' '.join(filter(None, (obj.email, obj.phone_number, obj.position)))
+    else:
+        title = obj.name
+        details = obj.address
+    return get_kind(type(obj)), obj.pk, obj.agent_id, normalize(title), normalize(details)
+
+
+def index_objects(model, pks):
+    """
+    Обновляет строки индекса для элементов справочника с указанными ID.
+
+    Удаленные элементы (которых уже нет в базе) удаляются из индекса.
+
+    Аргументы:
+        model (Model): Employee или PickupPoint.
+        pks (list): ID элементов.
+    """
+    connection = connections[router.db_for_write(model)]
+    if not is_supported(connection):
+        return
+    kind = get_kind(model)
+    pks = list(pks)
+    for start in range(0, len(pks), INDEX_BATCH_SIZE):
+        batch = pks[start:start + INDEX_BATCH_SIZE]
+        objects = model.objects.using(connection.alias).filter(pk__in=batch)
+        placeholders = ', '.join(['%s'] * len(batch))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {SEARCH_TABLE} WHERE kind = %s AND object_id IN ({placeholders})', [kind, *batch]
+            )
+            cursor.executemany(
+                f'INSERT INTO {SEARCH_TABLE} (kind, object_id, agent_id, title, details) VALUES (%s, %s, %s, %s, %s)',
+                [get_document(obj) for obj in objects],
+            )
+
+
+def remove_objects(model, pks):
+    """
+    Удаляет элементы справочника с указанными ID из индекса.
+    """
+    connection = connections[router.db_for_write(model)]
+    if not is_supported(connection):
+        return
+    pks = list(pks)
+    with connection.cursor() as cursor:
+        for start in range(0, len(pks), INDEX_BATCH_SIZE):
+            batch = pks[start:start + INDEX_BATCH_SIZE]
+            cursor.execute(
+                f"DELETE FROM {SEARCH_TABLE} WHERE kind = %s AND object_id IN ({', '.join(['%s'] * len(batch))})",
+                [get_kind(model), *batch],
+            )
+
+
+def rebuild_index(using='default'):
+    """
+    Полностью перестраивает индекс по всем сотрудникам и пунктам выдачи.
+
+    Возвращает:
+        dict: Количество проиндексированных элементов по видам.
+    """
+    connection = connections[using]
+    if not is_supported(connection):
+        return {}
+    counts = {}
+    with connection.cursor() as cursor:
+        cursor.execute(CREATE_TABLE_SQL)
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        for kind, model in SEARCH_MODELS.items():
+            counts[kind] = 0
+            rows = []
+            for obj in model.objects.using(using).order_by('pk').iterator(chunk_size=INDEX_BATCH_SIZE):
+                rows.append(get_document(obj))
+                if len(rows) == INDEX_BATCH_SIZE:
+                    counts[kind] += insert_rows(cursor, rows)
+                    rows = []
+            counts[kind] += insert_rows(cursor, rows)
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+    return counts
+
+
+def insert_rows(cursor, rows):
+    """
+    Добавляет строки в индекс и возвращает их количество.
+    """
+    cursor.executemany(
+        f'INSERT INTO {SEARCH_TABLE} (kind, object_id, agent_id, title, details) VALUES (%s, %s, %s, %s, %s)', rows
+    )
+    return len(rows)
+
+
+def build_match_query(query):
+    """
+    Строит выражение MATCH для FTS5: каждое слово запроса ищется по префиксу (слова короче
+    MIN_PREFIX_LENGTH - целиком), все слова обязательны.
+
+    Слова берутся в кавычки, поэтому операторы FTS5 (AND, OR, NEAR, *, ^) во вводе пользователя
+    не интерпретируются.
+
+    Возвращает:
+        str: Выражение MATCH или пустая строка, если в запросе нет слов.
+    """
+    words = re.findall(r'\w+', normalize(query).lower())
+    return ' '.join(f'"{word}"*' if len(word) >= MIN_PREFIX_LENGTH else f'"{word}"' for word in words)
+
+
+def search(query, kinds=None, agent_id=None, limit=SEARCH_LIMIT):
+    """
+    Ищет сотрудников и пункты выдачи по префиксам слов запроса.
+
+    Результаты упорядочены по релевантности (bm25, совпадение в названии весит TITLE_WEIGHT).
+    В SQLite используется индекс FTS5; в других базах - поиск icontains по тем же полям без ранжирования.
+
+    Аргументы:
+        query (str): Строка поиска.
+        kinds (list): Виды элементов из SEARCH_MODELS (по умолчанию все).
+        agent_id (int): Ограничение по агенту.
+        limit (int): Наибольшее количество результатов (None - без ограничения).
+
+    Возвращает:
+        list: Словари {'type', 'id', 'agent_id', 'title', 'details'}.
+    """
+    kinds = list(kinds or SEARCH_MODELS)
+    match = build_match_query(query)
+    if not match or not kinds:
+        return []
+    connection = connections[router.db_for_read(Employee)]
+    if not is_supported(connection):
+        return search_without_index(query, kinds, agent_id, limit)
+
+    conditions = [f"kind IN ({', '.join(['%s'] * len(kinds))})"]
+    params = [match, *kinds]
+    if agent_id is not None:
+        conditions.append('agent_id = %s')
+        params.append(agent_id)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT kind, object_id, agent_id, title, details FROM {SEARCH_TABLE} '
+            f"WHERE {SEARCH_TABLE} MATCH %s AND {' AND '.join(conditions)} "
+            f'ORDER BY bm25({SEARCH_TABLE}, 0, 0, 0, %s, 1.0), object_id LIMIT %s',
+            [*params, TITLE_WEIGHT, -1 if limit is None else limit],
+        )
+        rows = cursor.fetchall()
+    return [
+        {'type': kind, 'id': object_id, 'agent_id': agent, 'title': title, 'details': details}
+        for kind, object_id, agent, title, details in rows
+    ]
+
+
+def filter_without_index(model, query):
+    """
+    Возвращает набор элементов модели для поиска без FTS5: каждое слово запроса должно встречаться
+    (icontains) в одном из полей FALLBACK_FIELDS.
+    """
+    queryset = model.objects.all()
+    for word in re.findall(r'\w+', query):
+        condition = Q()
+        for field in FALLBACK_FIELDS[model]:
+            condition |= Q(**{f'{field}__icontains': word})
+        queryset = queryset.filter(condition)
+    return queryset
+
+
+def search_without_index(query, kinds, agent_id, limit):
+    """
+    Поиск icontains по полям FALLBACK_FIELDS для баз без FTS5 (см. filter_without_index).
+    """
+    results = []
+    for kind in kinds:
+        queryset = filter_without_index(SEARCH_MODELS[kind], query)
+        if agent_id is not None:
+            queryset = queryset.filter(agent_id=agent_id)
+        queryset = queryset.order_by('pk')
+        if limit is not None:
+            queryset = queryset[:limit - len(results)]
+        for obj in queryset:
+            kind, object_id, agent, title, details = get_document(obj)
+            results.append({'type': kind, 'id': object_id, 'agent_id': agent, 'title': title, 'details': details})
+    return results
+
+
+def search_ids(model, query, limit=None):
+    """
+    Возвращает ID элементов модели, найденных по запросу, в порядке релевантности
+    (для списков веб-интерфейса; ID передаются в запрос параметрами, поэтому задавайте limit).
+    """
+    return [result['id'] for result in search(query, kinds=[get_kind(model)], limit=limit)]
+
+
+def filter_by_search(queryset, query, model=None, field='pk'):
+    """
+    Отбирает элементы набора, найденные по запросу (без упорядочивания по релевантности).
+
+    Найденные ID не выбираются в Python, а подставляются в запрос подзапросом к индексу
+    (field IN (SELECT object_id ... MATCH ...)), поэтому размер запроса не зависит от количества
+    совпадений: широкий запрос по сотням тысяч элементов не упирается в ограничение SQLite
+    на количество параметров. В базах без FTS5 подзапросом служит поиск icontains (filter_without_index).
+
+    Аргументы:
+        queryset (QuerySet): Отбираемый набор.
+        query (str): Строка поиска.
+        model (Model): Модель индекса (Employee или PickupPoint), по умолчанию модель набора.
+        field (str): Поле набора, содержащее ID элемента модели (например, 'employee' для смен).
+
+    Возвращает:
+        QuerySet: Отобранный набор (пустой, если в запросе нет слов).
+    """
+    model = model or queryset.model
+    match = build_match_query(query)
+    if not match:
+        return queryset.none()
+    if is_supported(connections[queryset.db]):
+        ids = RawSQL(
+            f'SELECT object_id FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s AND kind = %s', (match, get_kind(model))
+        )
+    else:
+        ids = filter_without_index(model, query).values('pk')
+    return queryset.filter(**{f'{field}__in': ids})
@@ -2,8 +2,9 @@
 
 from rest_framework import serializers
 from .models import Agent, Employee, PickupPoint, AccountingPeriod
+from .fieldsets import SparseFieldsetSerializerMixin
 
-class AgentSerializer(serializers.ModelSerializer):
+class AgentSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     Сериализатор для модели Agent.
 
@@ -16,7 +17,7 @@ class AgentSerializer(serializers.ModelSerializer):
         model = Agent
         fields = '__all__'
 
-class PickupPointSerializer(serializers.ModelSerializer):
+class PickupPointSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     Сериализатор для модели PickupPoint.
 
@@ -31,7 +32,7 @@ class PickupPointSerializer(serializers.ModelSerializer):
         model = PickupPoint
         fields = '__all__'
 
-class EmployeeSerializer(serializers.ModelSerializer):
+class EmployeeSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     Сериализатор для модели Employee.
 
@@ -52,7 +53,7 @@ class EmployeeSerializer(serializers.ModelSerializer):
         model = Employee
         fields = '__all__'
 
-class AccountingPeriodSerializer(serializers.ModelSerializer):
+class AccountingPeriodSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     Сериализатор для модели AccountingPeriod.
 
@@ -0,0 +1,34 @@
+# reference_books/signals.py
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core.signals import reference_books_bulk_updated
+from .models import Employee, PickupPoint
+from .search import index_objects, remove_objects
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_save, sender=PickupPoint)
+def update_search_index_on_save(sender, instance, **kwargs):
+    """
+    Обновляет строку поискового индекса после сохранения сотрудника или пункта выдачи.
+    """
+    index_objects(sender, [instance.pk])
+
+
+@receiver(post_delete, sender=Employee)
+@receiver(post_delete, sender=PickupPoint)
+def update_search_index_on_delete(sender, instance, **kwargs):
+    """
+    Удаляет сотрудника или пункт выдачи из поискового индекса.
+    """
+    remove_objects(sender, [instance.pk])
+
+
+@receiver(reference_books_bulk_updated, sender=Employee)
+@receiver(reference_books_bulk_updated, sender=PickupPoint)
+def update_search_index_on_bulk_update(sender, pks, **kwargs):
+    """
+    Обновляет поисковый индекс после массового изменения (update, bulk_create, bulk_update).
+    """
+    index_objects(sender, pks)
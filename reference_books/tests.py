@@ -1,5 +1,6 @@
 # reference_books/tests.py
 
+from asgiref.sync import sync_to_async
 from django.contrib.auth.models import User
 from django.test import TestCase, Client
 from django.urls import reverse
@@ -8,6 +9,19 @@ from datetime import date
 from rest_framework.authtoken.models import Token
 from django.contrib.auth.models import Permission
 from django.utils import timezone
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+import tempfile
+from io import StringIO
+from django.core.management import call_command
+from django.contrib.admin.sites import site
+from django.db import transaction
+from django.test import override_settings
+from core.cache import get_cache
+from .admin import EmployeeAdmin
+from .cache import get_agent_pickup_points, get_reference_book, get_active_employees
+from .search import filter_by_search
 
 class AgentModelTest(TestCase):
     """
@@ -233,3 +247,500 @@ class AccountingPeriodModelTest(TestCase):
         )
         self.assertFalse(past_period.is_active())
 
+
+
+class ReferenceBookApiPaginationTest(TestCase):
+    """
+    Тесты для курсорной пагинации API справочников.
+    """
+
+    def setUp(self):
+        """
+        Устанавливает начальные данные для тестов.
+        Создает аутентифицированного клиента API, агента и 25 сотрудников.
+        """
+        self.user = User.objects.create_user(username='apiuser', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.agent = Agent.objects.create(name="Test Agent", email="agent@example.com", phone_number="1234567890")
+        Employee.objects.bulk_create([
+            Employee(
+                first_name=f"Name{i}", last_name="Doe", email=f"employee{i}@example.com",
+                date_of_hire=date(2024, 1, 1), position="Operator", agent=self.agent
+            )
+            for i in range(25)
+        ])
+
+    def test_pages_cover_all_rows(self):
+        """
+        Проверяет, что обход страниц по курсору возвращает все записи ровно один раз.
+        """
+        url = reverse('reference_books_api:employee-list')
+        ids = []
+        pages = 0
+        while url:
+            response = self.client.get(url, {'page_size': 10} if not pages else None)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+            pages += 1
+        self.assertEqual(pages, 3)
+        self.assertEqual(ids, list(Employee.objects.order_by('id').values_list('id', flat=True)))
+
+    def test_deep_page_uses_keyset_condition(self):
+        """
+        Проверяет, что следующая страница выбирается условием по ключу, а не OFFSET.
+        """
+        first = self.client.get(reverse('reference_books_api:employee-list'), {'page_size': 5})
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(first.data['next'])
+        sql = ' '.join(query['sql'] for query in queries)
+        self.assertNotIn('OFFSET', sql)
+        self.assertIn('"reference_books_employee"."id" >', sql)
+
+
+class ListQueryBudgetTest(TestCase):
+    """
+    Тесты бюджета запросов для списков справочников.
+    Количество запросов к базе не должно расти вместе с количеством строк в списке.
+    """
+
+    API_LISTS = [
+        'reference_books_api:agent-list',
+        'reference_books_api:pickuppoint-list',
+        'reference_books_api:employee-list',
+        'reference_books_api:accountingperiod-list',
+    ]
+    WEB_LISTS = [
+        'reference_books_web:agents_list',
+        'reference_books_web:pickup_points_list',
+        'reference_books_web:employees_list',
+        'reference_books_web:accounting_periods_list',
+    ]
+
+    def setUp(self):
+        """
+        Устанавливает начальные данные для тестов.
+        Создает аутентифицированного клиента API.
+        """
+        self.user = User.objects.create_user(username='apiuser', password='password')
+        self.api_client = APIClient()
+        self.api_client.force_authenticate(self.user)
+        self.batches = 0
+
+    def create_rows(self, count):
+        """
+        Создает count агентов, у каждого - пункт выдачи, сотрудника и учетный период.
+        """
+        for i in range(count):
+            n = self.batches * 1000 + i
+            agent = Agent.objects.create(name=f"Agent {n}", email=f"agent{n}@example.com", phone_number=str(n))
+            pickup_point = PickupPoint.objects.create(name=f"Point {n}", address="Test St", agent=agent)
+            Employee.objects.create(
+                first_name="John", last_name=f"Doe{n}", email=f"employee{n}@example.com",
+                date_of_hire=date(2024, 1, 1), position="Operator", agent=agent,
+                default_pickup_point=pickup_point
+            )
+            AccountingPeriod.objects.create(agent=agent, start_date=date(2024, 1, 1), end_date=date(2024, 1, 31))
+        self.batches += 1
+
+    def count_queries(self, client, url_name):
+        """
+        Выполняет GET-запрос к списку и возвращает количество выполненных запросов к базе.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse(url_name))
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def assertQueryCountConstant(self, client, url_names):
+        """
+        Проверяет, что количество запросов к каждому списку одинаково для 2 и 12 строк.
+        """
+        self.create_rows(2)
+        small = {url_name: self.count_queries(client, url_name) for url_name in url_names}
+        self.create_rows(10)
+        large = {url_name: self.count_queries(client, url_name) for url_name in url_names}
+        self.assertEqual(small, large)
+
+    def test_api_lists_query_budget(self):
+        """
+        Проверяет бюджет запросов списков API.
+        """
+        self.assertQueryCountConstant(self.api_client, self.API_LISTS)
+
+    def test_web_lists_query_budget(self):
+        """
+        Проверяет бюджет запросов веб-списков.
+        """
+        self.assertQueryCountConstant(self.client, self.WEB_LISTS)
+
+
+class ReferenceBookCacheTest(TestCase):
+    """
+    Тесты для версионированного кэша справочников.
+    """
+
+    def setUp(self):
+        """
+        Устанавливает начальные данные для тестов.
+        Очищает кэш, создает агента, пункт выдачи и двух сотрудников. Данные создаются
+        как зафиксированные (выполняются обработчики on_commit): в транзакции теста
+        измененные справочники читаются мимо кэша.
+        """
+        get_cache().clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.agent = Agent.objects.create(name="Test Agent", email="agent@example.com", phone_number="1234567890")
+            self.pickup_point = PickupPoint.objects.create(name="Pickup Point 1", address="123 Test St", agent=self.agent)
+            self.employees = [
+                Employee.objects.create(
+                    first_name="John", last_name=f"Doe{index}", email=f"john{index}@example.com",
+                    date_of_hire=date(2024, 1, 1), position="Operator", agent=self.agent,
+                    default_pickup_point=self.pickup_point
+                )
+                for index in range(2)
+            ]
+
+    def test_lookup_by_id_is_cached_and_invalidated_on_save(self):
+        """
+        Проверяет, что повторное чтение по ID не обращается к базе, а сохранение связанного агента
+        делает закэшированного сотрудника недоступным.
+        """
+        employee = get_reference_book(Employee, self.employees[0].pk)
+        self.assertEqual(employee.agent.name, "Test Agent")
+        with self.assertNumQueries(0):
+            self.assertEqual(get_reference_book(Employee, self.employees[0].pk), employee)
+
+        self.agent.name = "Renamed Agent"
+        self.agent.save()
+        self.assertEqual(get_reference_book(Employee, self.employees[0].pk).agent.name, "Renamed Agent")
+
+    def test_lists_are_invalidated_by_bulk_update(self):
+        """
+        Проверяет, что списки агента инвалидируются созданием пункта выдачи и массовой
+        деактивацией сотрудников в админке (queryset.update).
+        """
+        self.assertEqual(get_agent_pickup_points(self.agent.pk), [self.pickup_point])
+        self.assertEqual(len(get_active_employees(self.agent.pk)), 2)
+        with self.assertNumQueries(0):
+            get_agent_pickup_points(self.agent.pk)
+            get_active_employees(self.agent.pk)
+
+        new_point = PickupPoint.objects.create(name="Pickup Point 2", address="456 Test Ave", agent=self.agent)
+        self.assertEqual(get_agent_pickup_points(self.agent.pk), [self.pickup_point, new_point])
+
+        EmployeeAdmin(Employee, site).deactivate_employees(None, Employee.objects.filter(pk=self.employees[0].pk))
+        self.assertEqual(get_active_employees(self.agent.pk), [self.employees[1]])
+
+    async def test_agent_detail_with_cold_cache(self):
+        """
+        Проверяет, что страница агента при пустом кэше загружает пункты выдачи через ASGI и WSGI
+        (асинхронное представление не обращается к базе из шаблона).
+        """
+        url = reverse('reference_books_web:agent_detail', args=[self.agent.pk])
+        response = await self.async_client.get(url)
+        self.assertContains(response, 'Pickup Point 1 - 123 Test St')
+        get_cache().clear()
+        response = await sync_to_async(self.client.get)(url)
+        self.assertContains(response, 'Pickup Point 1 - 123 Test St')
+
+    def test_uncommitted_changes_are_not_cached(self):
+        """
+        Проверяет, что данные, измененные в откатываемой транзакции, не попадают в кэш.
+        """
+        get_reference_book(Agent, self.agent.pk)
+        try:
+            with transaction.atomic():
+                self.agent.name = "Uncommitted"
+                self.agent.save()
+                self.assertEqual(get_reference_book(Agent, self.agent.pk).name, "Uncommitted")
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertEqual(get_reference_book(Agent, self.agent.pk).name, "Test Agent")
+
+    def test_file_based_backend(self):
+        """
+        Проверяет работу кэша с файловым бэкендом Django.
+        """
+        with tempfile.TemporaryDirectory() as location:
+            file_cache = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location}
+            with override_settings(CACHES={'default': file_cache, 'reference_books': file_cache}):
+                self.assertEqual(get_reference_book(PickupPoint, self.pickup_point.pk), self.pickup_point)
+                with self.assertNumQueries(0):
+                    get_reference_book(PickupPoint, self.pickup_point.pk)
+                pickup_point_id = self.pickup_point.pk
+                self.pickup_point.delete()
+                self.assertIsNone(get_reference_book(PickupPoint, pickup_point_id))
+
+
+class ConditionalGetTest(TestCase):
+    """
+    Тесты для условного GET (ETag / If-None-Match) и серверного кэша ответов API справочников.
+    """
+
+    def setUp(self):
+        """
+        Устанавливает начальные данные для тестов.
+        Очищает кэш, создает аутентифицированного клиента API, агента и трех сотрудников.
+        """
+        get_cache().clear()
+        self.user = User.objects.create_user(username='apiuser', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.agent = Agent.objects.create(name="Test Agent", email="agent@example.com", phone_number="1234567890")
+        for i in range(3):
+            Employee.objects.create(
+                first_name=f"Name{i}", last_name="Doe", email=f"employee{i}@example.com",
+                date_of_hire=date(2024, 1, 1), position="Operator", agent=self.agent
+            )
+        self.url = reverse('reference_books_api:employee-list')
+
+    def row_queries(self, queries):
+        """
+        Возвращает запросы, выбирающие строки сотрудников (а не агрегаты валидатора).
+        """
+        return [query for query in queries if query['sql'].startswith('SELECT "reference_books_employee"."id"')]
+
+    def test_not_modified_without_serialization(self):
+        """
+        Проверяет, что при совпадении ETag возвращается 304 без выборки строк.
+        """
+        response = self.client.get(self.url)
+        etag = response['ETag']
+        self.assertEqual(response.status_code, 200)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(self.row_queries(queries), [])
+        self.assertNotEqual(self.client.get(self.url, {'page_size': 2})['ETag'], etag)
+
+    def test_etag_changes_on_writes(self):
+        """
+        Проверяет, что ETag меняется при изменении сотрудника, связанного агента и массовом UPDATE.
+        """
+        etags = [self.client.get(self.url)['ETag']]
+        self.agent.name = "Renamed Agent"
+        self.agent.save()
+        etags.append(self.client.get(self.url)['ETag'])
+        Employee.objects.filter(first_name="Name0").update(is_active=False)
+        etags.append(self.client.get(self.url)['ETag'])
+        self.assertEqual(len(set(etags)), 3)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etags[0])
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data['results'][0]['is_active'])
+
+    def test_etag_depends_only_on_database(self):
+        """
+        Проверяет, что ETag не зависит от кэша процесса (другой процесс или перезапуск
+        с пустым кэшем выдает тот же ETag), а bulk_update меняет updated_at и ETag.
+        """
+        etag = self.client.get(self.url)['ETag']
+        get_cache().clear()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        employee = Employee.objects.get(first_name="Name1")
+        updated_at = employee.updated_at
+        employee.position = "Manager"
+        Employee.objects.bulk_update([employee], ['position'])
+        employee.refresh_from_db()
+        self.assertGreater(employee.updated_at, updated_at)
+        self.assertNotEqual(self.client.get(self.url)['ETag'], etag)
+
+    @override_settings(REFERENCE_API_RESPONSE_CACHE_TIMEOUT=60)
+    def test_response_cache_per_user(self):
+        """
+        Проверяет серверный кэш ответов: повторный запрос пользователя не выбирает строки,
+        запрос другого пользователя и запрос после изменения данных - выбирают.
+        """
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(self.row_queries(queries), [])
+        self.assertEqual(len(response.data['results']), 3)
+
+        other_client = APIClient()
+        other_client.force_authenticate(User.objects.create_user(username='other', password='password'))
+        with CaptureQueriesContext(connection) as queries:
+            other_client.get(self.url)
+        self.assertEqual(len(self.row_queries(queries)), 1)
+
+        Employee.objects.filter(first_name="Name0").delete()
+        self.assertEqual(len(self.client.get(self.url).data['results']), 2)
+
+
+class SparseFieldsetTest(TestCase):
+    """
+    Тесты для выбора полей ответа API через ?fields= и ?exclude=.
+    """
+
+    def setUp(self):
+        """
+        Устанавливает начальные данные для тестов.
+        Создает аутентифицированного клиента API, агента, пункт выдачи и сотрудника.
+        """
+        self.user = User.objects.create_user(username='apiuser', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.agent = Agent.objects.create(name="Test Agent", email="agent@example.com", phone_number="1234567890")
+        self.pickup_point = PickupPoint.objects.create(name="Pickup Point 1", address="123 Test St", agent=self.agent)
+        self.employee = Employee.objects.create(
+            name="John Doe", first_name="John", last_name="Doe", email="john.doe@example.com",
+            date_of_hire=date(2024, 1, 1), position="Operator", agent=self.agent,
+            default_pickup_point=self.pickup_point
+        )
+        self.url = reverse('reference_books_api:employee-list')
+
+    def get_with_queries(self, params):
+        """
+        Выполняет GET-запрос к списку сотрудников и возвращает ответ и SQL выборки строк.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, params)
+        rows_sql = [query['sql'] for query in queries if query['sql'].startswith('SELECT "reference_books_employee"."id"')]
+        return response, rows_sql
+
+    def test_fields_trim_payload_and_sql(self):
+        """
+        Проверяет, что ?fields= сокращает и ответ, и список столбцов запроса, и убирает JOIN.
+        """
+        response, rows_sql = self.get_with_queries({'fields': 'id,name'})
+        self.assertEqual(response.data['results'], [{'id': self.employee.id, 'name': "John Doe"}])
+        self.assertEqual(len(rows_sql), 1)
+        self.assertNotIn('JOIN', rows_sql[0])
+        self.assertNotIn('"email"', rows_sql[0])
+
+    def test_related_field_keeps_join(self):
+        """
+        Проверяет, что выбранное поле-связь загружается тем же запросом.
+        """
+        response, rows_sql = self.get_with_queries({'fields': 'id,default_pickup_point'})
+        self.assertEqual(response.data['results'][0]['default_pickup_point'], "Pickup Point 1")
+        self.assertIn('JOIN "reference_books_pickuppoint"', rows_sql[0])
+        self.assertNotIn('"reference_books_agent"', rows_sql[0])
+
+    def test_exclude_and_unknown_fields(self):
+        """
+        Проверяет ?exclude= и отказ с кодом 400 для неизвестных полей.
+        """
+        response = self.client.get(self.url, {'exclude': 'description,created_at,updated_at,date_of_birth'})
+        item = response.data['results'][0]
+        self.assertNotIn('created_at', item)
+        self.assertIn('email', item)
+        response = self.client.get(self.url, {'fields': 'id,salary'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse('reference_books_api:employee-detail', args=[self.employee.id]), {'fields': 'email'})
+        self.assertEqual(response.data, {'email': "john.doe@example.com"})
+
+
+class SearchIndexTest(TestCase):
+    """
+    Тесты для полнотекстового поиска сотрудников и пунктов выдачи.
+    """
+
+    def setUp(self):
+        """
+        Устанавливает начальные данные для тестов.
+        Создает аутентифицированного клиента API, агента, пункт выдачи и двух сотрудников.
+        """
+        self.user = User.objects.create_user(username='apiuser', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.agent = Agent.objects.create(name="Test Agent", email="agent@example.com", phone_number="1234567890")
+        self.pickup_point = PickupPoint.objects.create(name="ПВЗ Садовая", address="ул. Садовая, д. 5", agent=self.agent)
+        self.employee = Employee.objects.create(
+            name="Пётр Смирнов", first_name="Пётр", last_name="Смирнов", email="smirnov@example.com",
+            phone_number="79991234567", date_of_hire=date(2024, 1, 1), position="Оператор", agent=self.agent,
+        )
+        self.other = Employee.objects.create(
+            name="Анна Садовская", first_name="Анна", last_name="Садовская", email="anna@example.com",
+            date_of_hire=date(2024, 1, 1), position="Кладовщик", agent=self.agent,
+        )
+        self.url = reverse('reference_books_api:search')
+
+    def get_ids(self, query, **params):
+        """
+        Выполняет поиск через API и возвращает пары (вид, ID) результатов.
+        """
+        response = self.client.get(self.url, {'q': query, **params})
+        self.assertEqual(response.status_code, 200)
+        return [(result['type'], result['id']) for result in response.data['results']]
+
+    def test_prefix_search_and_ranking(self):
+        """
+        Проверяет поиск по префиксам слов (с "ё" как "е") и приоритет совпадений в названии.
+        """
+        self.assertEqual(self.get_ids('петр смир'), [('employee', self.employee.id)])
+        self.assertEqual(self.get_ids('7999'), [('employee', self.employee.id)])
+        # "Садов" есть в названии пункта выдачи, фамилии сотрудника и адресе; адрес весит меньше
+        self.assertEqual(
+            self.get_ids('садов'), [('pickup_point', self.pickup_point.id), ('employee', self.other.id)]
+        )
+        self.assertEqual(self.get_ids('садов', type='employee'), [('employee', self.other.id)])
+        self.assertEqual(self.get_ids('"OR" NEAR(*'), [])
+
+    def test_index_follows_save_delete_and_bulk_update(self):
+        """
+        Проверяет, что индекс обновляется при сохранении, удалении и массовых операциях.
+        """
+        self.employee.last_name = "Кузнецов"
+        self.employee.save()
+        self.assertEqual(self.get_ids('смирнов'), [])
+        self.assertEqual(self.get_ids('кузнец'), [('employee', self.employee.id)])
+
+        Employee.objects.filter(pk=self.employee.pk).update(position="Администратор")
+        self.assertEqual(self.get_ids('админ'), [('employee', self.employee.id)])
+
+        self.other.first_name = "Мария"
+        Employee.objects.bulk_update([self.other], ['first_name'])
+        self.assertEqual(self.get_ids('мария'), [('employee', self.other.id)])
+
+        created = PickupPoint.objects.bulk_create([
+            PickupPoint(name="ПВЗ Лесная", address="ул. Лесная, д. 1", agent=self.agent)
+        ])
+        self.assertEqual(self.get_ids('лесн'), [('pickup_point', created[0].id)])
+
+        self.agent.delete()
+        self.assertEqual(self.get_ids('пвз'), [])
+
+    def test_rebuild_and_invalid_params(self):
+        """
+        Проверяет перестройку индекса командой и ответ 400 на неверные параметры.
+        """
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(self.get_ids('смирнов'), [('employee', self.employee.id)])
+        self.assertEqual(self.client.get(self.url, {'q': 'a', 'type': 'agent'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'q': 'a', 'limit': 'x'}).status_code, 400)
+
+    def test_admin_and_web_list_use_index(self):
+        """
+        Проверяет поиск в списке изменения админки и в веб-списке сотрудников.
+        """
+        admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        web = Client()
+        web.force_login(admin_user)
+        response = web.get(reverse('admin:reference_books_employee_changelist'), {'q': 'петр'})
+        self.assertEqual(list(response.context['cl'].result_list), [self.employee])
+        response = web.get(reverse('reference_books_web:employees_list'), {'q': 'анна'})
+        self.assertEqual(response.context['employees'], [self.other])
+
+    def test_filter_by_search_uses_subquery(self):
+        """
+        Проверяет, что отбор по поиску передает в запрос подзапрос к индексу, а не найденные ID:
+        количество параметров не зависит от количества совпадений.
+        """
+        Employee.objects.bulk_create([
+            Employee(
+                name=f"Сотрудник {index}", first_name="Иван", last_name=f"Иванов{index}", email=f"ivan{index}@example.com",
+                date_of_hire=date(2024, 1, 1), position="Оператор", agent=self.agent,
+            )
+            for index in range(50)
+        ])
+        with CaptureQueriesContext(connection) as queries:
+            found = list(filter_by_search(Employee.objects.all(), 'оператор'))
+        self.assertEqual(len(found), 51)
+        self.assertEqual(len(queries), 1)
+        self.assertIn('IN (SELECT object_id FROM reference_books_search WHERE', queries[0]['sql'])
+        self.assertEqual(list(filter_by_search(Employee.objects.all(), '!!!')), [])
@@ -14,6 +14,8 @@ router.register(r'pickup-points', views.PickupPointViewSet, basename='pickuppoin
 router.register(r'accounting-periods', views.AccountingPeriodViewSet, basename='accountingperiod')
 
 urlpatterns = [
+    # Поиск сотрудников и пунктов выдачи по полнотекстовому индексу
+    path('search/', views.SearchView.as_view(), name='search'),
     # Включение маршрутов, зарегистрированных в router
     path('', include(router.urls)),
 ]
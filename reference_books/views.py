@@ -1,15 +1,25 @@
 # reference_books/views.py
 
+from asgiref.sync import sync_to_async
 from rest_framework import viewsets
-from django.shortcuts import render, get_object_or_404, redirect
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.shortcuts import render, redirect
 from rest_framework.permissions import IsAuthenticated
 from .models import Agent, PickupPoint, Employee, AccountingPeriod
 from .serializers import AgentSerializer, PickupPointSerializer, EmployeeSerializer, AccountingPeriodSerializer
 from django.views.decorators.http import require_POST
+from django.http import Http404
+from .cache import get_agent_pickup_points, get_reference_book
+from .conditional import ConditionalListMixin
+from .fieldsets import SparseFieldsetViewMixin
+from .search import MAX_SEARCH_LIMIT, SEARCH_LIMIT, SEARCH_MODELS, search, search_ids
 
-class AgentViewSet(viewsets.ModelViewSet):
+class AgentViewSet(ConditionalListMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """
-    API ViewSet для модели Agent.
+    API ViewSet для модели Agent. Список поддерживает условный GET (см. ConditionalListMixin),
+    чтение - выбор полей через ?fields= и ?exclude= (см. SparseFieldsetViewMixin).
 
     Атрибуты:
         queryset (QuerySet): Набор всех агентов.
@@ -20,48 +30,115 @@ class AgentViewSet(viewsets.ModelViewSet):
     serializer_class = AgentSerializer
     permission_classes = [IsAuthenticated]
 
-class PickupPointViewSet(viewsets.ModelViewSet):
+class PickupPointViewSet(ConditionalListMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """
-    API ViewSet для модели PickupPoint.
+    API ViewSet для модели PickupPoint. Список поддерживает условный GET (см. ConditionalListMixin),
+    чтение - выбор полей через ?fields= и ?exclude= (см. SparseFieldsetViewMixin).
 
     Атрибуты:
-        queryset (QuerySet): Набор всех пунктов самовывоза.
+        queryset (QuerySet): Набор всех пунктов самовывоза (агент загружается тем же запросом).
         serializer_class (Serializer): Класс сериализатора для пункта самовывоза.
         permission_classes (list): Список классов разрешений.
+        etag_dependencies (tuple): Модели, данные которых входят в ответ.
     """
-    queryset = PickupPoint.objects.all()
+    queryset = PickupPoint.objects.select_related('agent')
+    etag_dependencies = (Agent,)
     serializer_class = PickupPointSerializer
     permission_classes = [IsAuthenticated]
 
-class EmployeeViewSet(viewsets.ModelViewSet):
+class EmployeeViewSet(ConditionalListMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """
-    API ViewSet для модели Employee.
+    API ViewSet для модели Employee. Список поддерживает условный GET (см. ConditionalListMixin),
+    чтение - выбор полей через ?fields= и ?exclude= (см. SparseFieldsetViewMixin).
 
     Атрибуты:
-        queryset (QuerySet): Набор всех сотрудников.
+        queryset (QuerySet): Набор всех сотрудников (агент и пункт выдачи загружаются тем же запросом).
         serializer_class (Serializer): Класс сериализатора для сотрудника.
         permission_classes (list): Список классов разрешений.
+        etag_dependencies (tuple): Модели, данные которых входят в ответ.
     """
-    queryset = Employee.objects.all()
+    queryset = Employee.objects.select_related('agent', 'default_pickup_point')
+    etag_dependencies = (Agent, PickupPoint)
     serializer_class = EmployeeSerializer
     permission_classes = [IsAuthenticated]
 
-class AccountingPeriodViewSet(viewsets.ModelViewSet):
+class AccountingPeriodViewSet(ConditionalListMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """
-    API ViewSet для модели AccountingPeriod.
+    API ViewSet для модели AccountingPeriod. Список поддерживает условный GET (см. ConditionalListMixin),
+    чтение - выбор полей через ?fields= и ?exclude= (см. SparseFieldsetViewMixin).
 
     Атрибуты:
-        queryset (QuerySet): Набор всех учетных периодов.
+        queryset (QuerySet): Набор всех учетных периодов (агент загружается тем же запросом).
         serializer_class (Serializer): Класс сериализатора для учетного периода.
         permission_classes (list): Список классов разрешений.
+        etag_dependencies (tuple): Модели, данные которых входят в ответ.
     """
-    queryset = AccountingPeriod.objects.all()
+    queryset = AccountingPeriod.objects.select_related('agent')
+    etag_dependencies = (Agent,)
     serializer_class = AccountingPeriodSerializer
     permission_classes = [IsAuthenticated]
 
-def agents_list(request):
+class SearchView(APIView):
     """
-    Представление для вывода списка агентов.
+    API поиска сотрудников и пунктов выдачи по полнотекстовому индексу (см. reference_books.search).
+
+    Каждое слово запроса ищется по префиксу (все слова обязательны), результаты упорядочены
+    по релевантности. Параметры запроса:
+        q - строка поиска;
+        type - виды элементов через запятую (employee, pickup_point), по умолчанию все;
+        agent - ID агента;
+        limit - количество результатов (по умолчанию SEARCH_LIMIT, не больше MAX_SEARCH_LIMIT).
+
+    Атрибуты:
+        permission_classes (list): Список классов разрешений.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        query = request.query_params.get('q', '')
+        kinds = [kind for kind in request.query_params.get('type', '').split(',') if kind]
+        unknown = [kind for kind in kinds if kind not in SEARCH_MODELS]
+        if unknown:
+            raise ValidationError({'type': f"Неизвестные виды: {', '.join(unknown)}. Допустимые: {', '.join(SEARCH_MODELS)}"})
+        try:
+            agent_id = int(request.query_params['agent']) if request.query_params.get('agent') else None
+            limit = int(request.query_params.get('limit', SEARCH_LIMIT))
+        except ValueError:
+            raise ValidationError('agent и limit должны быть целыми числами')
+        limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+        return Response({'results': search(query, kinds or None, agent_id, limit)})
+
+def get_reference_book_or_404(model, pk):
+    """
+    Возвращает элемент справочника из кэша или вызывает Http404, если он не найден.
+    """
+    instance = get_reference_book(model, pk)
+    if instance is None:
+        raise Http404(f'{model._meta.object_name} не найден')
+    return instance
+
+async def aget_reference_book_or_404(model, pk):
+    """
+    Асинхронная версия get_reference_book_or_404 для асинхронных представлений.
+    Кэш справочников синхронный, поэтому обращение к нему выполняется в потоке базы данных (sync_to_async).
+    """
+    return await sync_to_async(get_reference_book_or_404)(model, pk)
+
+async def afilter_by_search(request, queryset):
+    """
+    Возвращает список элементов набора; если задан параметр q, только найденные поиском:
+    MAX_SEARCH_LIMIT наиболее релевантных в порядке релевантности, как в API поиска.
+    """
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return [obj async for obj in queryset]
+    ids = await sync_to_async(search_ids)(queryset.model, query, MAX_SEARCH_LIMIT)
+    found = {obj.pk: obj async for obj in queryset.filter(pk__in=ids)}
+    return [found[pk] for pk in ids if pk in found]
+
+async def agents_list(request):
+    """
+    Асинхронное представление для вывода списка агентов.
 
     Атрибуты:
         request (HttpRequest): Объект запроса.
@@ -69,12 +146,12 @@ def agents_list(request):
     Возвращает:
         HttpResponse: Отображает список агентов.
     """
-    agents = Agent.objects.all()
+    agents = [agent async for agent in Agent.objects.all()]
     return render(request, 'reference_books/agents_list.html', {'agents': agents})
 
-def agent_detail(request, pk):
+async def agent_detail(request, pk):
     """
-    Представление для вывода деталей агента.
+    Асинхронное представление для вывода деталей агента.
 
     Атрибуты:
         request (HttpRequest): Объект запроса.
@@ -83,12 +160,15 @@ def agent_detail(request, pk):
     Возвращает:
         HttpResponse: Отображает детали агента.
     """
-    agent = get_object_or_404(Agent, pk=pk)
-    return render(request, 'reference_books/agent_detail.html', {'agent': agent})
+    agent = await aget_reference_book_or_404(Agent, pk)
+    # Пункты выдачи загружаются в потоке базы данных: шаблон асинхронного представления не должен обращаться к базе
+    pickup_points = await sync_to_async(get_agent_pickup_points)(agent.pk)
+    return render(request, 'reference_books/agent_detail.html', {'agent': agent, 'pickup_points': pickup_points})
 
-def employees_list(request):
+async def employees_list(request):
     """
-    Представление для вывода списка сотрудников.
+    Асинхронное представление для вывода списка сотрудников.
+    С параметром q выводятся найденные по поисковому индексу сотрудники в порядке релевантности.
 
     Атрибуты:
         request (HttpRequest): Объект запроса.
@@ -96,12 +176,12 @@ def employees_list(request):
     Возвращает:
         HttpResponse: Отображает список сотрудников.
     """
-    employees = Employee.objects.all()
+    employees = await afilter_by_search(request, Employee.objects.select_related('agent', 'default_pickup_point'))
     return render(request, 'reference_books/employees_list.html', {'employees': employees})
 
-def employee_detail(request, pk):
+async def employee_detail(request, pk):
     """
-    Представление для вывода деталей сотрудника.
+    Асинхронное представление для вывода деталей сотрудника.
 
     Атрибуты:
         request (HttpRequest): Объект запроса.
@@ -110,12 +190,13 @@ def employee_detail(request, pk):
     Возвращает:
         HttpResponse: Отображает детали сотрудника.
     """
-    employee = get_object_or_404(Employee, pk=pk)
+    employee = await aget_reference_book_or_404(Employee, pk)
     return render(request, 'reference_books/employee_detail.html', {'employee': employee})
 
-def pickup_points_list(request):
+async def pickup_points_list(request):
     """
-    Представление для вывода списка пунктов выдачи.
+    Асинхронное представление для вывода списка пунктов выдачи.
+    С параметром q выводятся найденные по поисковому индексу пункты в порядке релевантности.
 
     Атрибуты:
         request (HttpRequest): Объект запроса.
@@ -123,12 +204,12 @@ def pickup_points_list(request):
     Возвращает:
         HttpResponse: Отображает список пунктов выдачи.
     """
-    pickup_points = PickupPoint.objects.all()
+    pickup_points = await afilter_by_search(request, PickupPoint.objects.select_related('agent'))
     return render(request, 'reference_books/pickup_points_list.html', {'pickup_points': pickup_points})
 
-def pickup_point_detail(request, pk):
+async def pickup_point_detail(request, pk):
     """
-    Представление для вывода деталей пункта выдачи.
+    Асинхронное представление для вывода деталей пункта выдачи.
 
     Атрибуты:
         request (HttpRequest): Объект запроса.
@@ -137,12 +218,12 @@ def pickup_point_detail(request, pk):
     Возвращает:
         HttpResponse: Отображает детали пункта выдачи.
     """
-    pickup_point = get_object_or_404(PickupPoint, pk=pk)
+    pickup_point = await aget_reference_book_or_404(PickupPoint, pk)
     return render(request, 'reference_books/pickup_point_detail.html', {'pickup_point': pickup_point})
 
-def accounting_periods_list(request):
+async def accounting_periods_list(request):
     """
-    Представление для вывода списка учетных периодов.
+    Асинхронное представление для вывода списка учетных периодов.
 
     Атрибуты:
         request (HttpRequest): Объект запроса.
@@ -150,12 +231,12 @@ def accounting_periods_list(request):
     Возвращает:
         HttpResponse: Отображает список учетных периодов.
     """
-    accounting_periods = AccountingPeriod.objects.all()
+    accounting_periods = [period async for period in AccountingPeriod.objects.select_related('agent')]
     return render(request, 'reference_books/accounting_periods_list.html', {'accounting_periods': accounting_periods})
 
-def accounting_period_detail(request, pk):
+async def accounting_period_detail(request, pk):
     """
-    Представление для вывода деталей учетного периода.
+    Асинхронное представление для вывода деталей учетного периода.
 
     Атрибуты:
         request (HttpRequest): Объект запроса.
@@ -164,7 +245,7 @@ def accounting_period_detail(request, pk):
     Возвращает:
         HttpResponse: Отображает детали учетного периода.
     """
-    accounting_period = get_object_or_404(AccountingPeriod, pk=pk)
+    accounting_period = await aget_reference_book_or_404(AccountingPeriod, pk)
     return render(request, 'reference_books/accounting_period_detail.html', {'accounting_period': accounting_period})
 
 @require_POST
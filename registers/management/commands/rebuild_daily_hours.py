@@ -0,0 +1,31 @@
+# registers/management/commands/rebuild_daily_hours.py
+
+from django.core.management.base import BaseCommand, CommandError
+from registers.rollup import rebuild_daily_hours, verify_daily_hours
+
+
+class Command(BaseCommand):
+    """
+    Команда для перестроения или сверки регистра DailyWorkHours по сменам.
+
+    Пример:
+        python manage.py rebuild_daily_hours
+        python manage.py rebuild_daily_hours --verify
+    """
+    help = 'Перестраивает (или сверяет с --verify) дневной регистр отработанных часов по сменам'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify', action='store_true', help='Только сверить регистр со сменами, без изменений')
+
+    def handle(self, *args, **options):
+        if not options['verify']:
+            created = rebuild_daily_hours()
+            self.stdout.write(self.style.SUCCESS(f'Регистр перестроен, строк: {created}'))
+            return
+
+        mismatches = verify_daily_hours()
+        for key, expected, stored in mismatches:
+            self.stdout.write(f'{key}: ожидается {expected}, в регистре {stored}')
+        if mismatches:
+            raise CommandError(f'Найдено расхождений: {len(mismatches)}')
+        self.stdout.write(self.style.SUCCESS('Регистр соответствует сменам'))
@@ -0,0 +1,44 @@
+# Generated by Django 5.1 on 2026-10-18 19:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('documents', '0001_initial'),
+        ('reference_books', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkScheduleRegister',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('change_date', models.DateTimeField(auto_now_add=True)),
+                ('status', models.CharField(max_length=20)),
+                ('comment', models.TextField(blank=True, null=True)),
+                ('work_schedule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='documents.workschedule')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyWorkHours',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('total_minutes', models.IntegerField(default=0)),
+                ('approved_minutes', models.IntegerField(default=0)),
+                ('shift_count', models.IntegerField(default=0)),
+                ('approved_count', models.IntegerField(default=0)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='reference_books.employee')),
+                ('pickup_point', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='reference_books.pickuppoint')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['employee', 'date'], name='dailyworkhours_employee_idx'), models.Index(fields=['pickup_point', 'date'], name='dailyworkhours_point_idx')],
+                'unique_together': {('employee', 'pickup_point', 'date')},
+            },
+        ),
+    ]
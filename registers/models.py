@@ -2,6 +2,7 @@
 
 from django.db import models
 from documents.models import WorkSchedule, WorkShift
+from reference_books.models import Employee, PickupPoint
 
 class WorkScheduleRegister(models.Model):
     """
@@ -20,3 +21,38 @@ class WorkScheduleRegister(models.Model):
 
     def __str__(self):
         return f"{self.work_schedule} - {self.status} on {self.change_date}"
+
+
+class DailyWorkHours(models.Model):
+    """
+    Регистр накопления отработанного времени в разрезе сотрудника, пункта выдачи и дня.
+
+    Обновляется инкрементально при создании, изменении, удалении и утверждении смен
+    (см. registers/rollup.py), поэтому отчеты читают O(дней) строк вместо O(смен).
+
+    Атрибуты:
+        employee (ForeignKey): Сотрудник.
+        pickup_point (ForeignKey): Пункт выдачи, к графику которого относятся смены.
+        date (DateField): День.
+        total_minutes (IntegerField): Продолжительность всех смен за день в минутах.
+        approved_minutes (IntegerField): Продолжительность утвержденных смен за день в минутах.
+        shift_count (IntegerField): Количество смен за день.
+        approved_count (IntegerField): Количество утвержденных смен за день.
+    """
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE)
+    pickup_point = models.ForeignKey(PickupPoint, on_delete=models.CASCADE)
+    date = models.DateField()
+    total_minutes = models.IntegerField(default=0)
+    approved_minutes = models.IntegerField(default=0)
+    shift_count = models.IntegerField(default=0)
+    approved_count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('employee', 'pickup_point', 'date')
+        indexes = [
+            models.Index(fields=['employee', 'date'], name='dailyworkhours_employee_idx'),
+            models.Index(fields=['pickup_point', 'date'], name='dailyworkhours_point_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.employee} - {self.pickup_point} {self.date}: {self.total_minutes} мин."
@@ -0,0 +1,207 @@
+# registers/rollup.py
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, IntegerField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from documents.models import WorkSchedule, WorkShift
+from reports.aggregates import shift_minutes
+from .models import DailyWorkHours
+
+ROLLUP_FIELDS = ('total_minutes', 'approved_minutes', 'shift_count', 'approved_count')
+
+
+def get_rollup_rows(shifts):
+    """
+    Агрегирует смены в строки регистра DailyWorkHours одним сгруппированным запросом.
+
+    Аргументы:
+        shifts (QuerySet): Набор смен WorkShift.
+
+    Возвращает:
+        QuerySet: Словари с ключами employee_id, pickup_point_id, date и полями ROLLUP_FIELDS.
+    """
+    approved = Q(is_approved=True)
+    return shifts.order_by().values(
+        'employee_id', 'date', pickup_point_id=F('schedule__pickup_point_id')
+    ).annotate(
+        total_minutes=Sum(shift_minutes()),
+        approved_minutes=Coalesce(Sum(shift_minutes(), filter=approved), Value(0), output_field=IntegerField()),
+        shift_count=Count('id'),
+        approved_count=Count('id', filter=approved),
+    )
+
+
+def get_shift_contribution(shift_state):
+    """
+    Возвращает ключ строки регистра и вклад в нее одной смены.
+
+    Аргументы:
+        shift_state (tuple): (employee_id, pickup_point_id, date, start_time, end_time, is_approved).
+
+    Возвращает:
+        tuple: (ключ (employee_id, pickup_point_id, date), словарь вклада по полям ROLLUP_FIELDS).
+    """
+    employee_id, pickup_point_id, date, start_time, end_time, is_approved = shift_state
+    minutes = (end_time.hour * 60 + end_time.minute) - (start_time.hour * 60 + start_time.minute)
+    return (employee_id, pickup_point_id, date), {
+        'total_minutes': minutes,
+        'approved_minutes': minutes if is_approved else 0,
+        'shift_count': 1,
+        'approved_count': 1 if is_approved else 0,
+    }
+
+
+def get_stored_shift_state(shift_id):
+    """
+    Читает из базы сохраненное состояние смены, влияющее на регистр.
+
+    Возвращает:
+        tuple: Состояние смены для get_shift_contribution или None, если смена не найдена.
+    """
+    return WorkShift.objects.filter(pk=shift_id).values_list(
+        'employee_id', 'schedule__pickup_point_id', 'date', 'start_time', 'end_time', 'is_approved'
+    ).first()
+
+
+def get_shift_state(shift):
+    """
+    Возвращает состояние экземпляра смены, влияющее на регистр.
+
+    Пункт выдачи берется из уже загруженного графика, а если график не загружен - одним запросом.
+    """
+    schedule_field = WorkShift._meta.get_field('schedule')
+    if schedule_field.is_cached(shift) and shift.schedule.pk == shift.schedule_id:
+        pickup_point_id = shift.schedule.pickup_point_id
+    else:
+        pickup_point_id = WorkSchedule.objects.filter(pk=shift.schedule_id).values_list(
+            'pickup_point_id', flat=True
+        ).first()
+    field = WorkShift._meta.get_field
+    return (
+        shift.employee_id,
+        pickup_point_id,
+        field('date').to_python(shift.date),
+        field('start_time').to_python(shift.start_time),
+        field('end_time').to_python(shift.end_time),
+        bool(shift.is_approved),
+    )
+
+
+def apply_delta(key, delta):
+    """
+    Прибавляет вклад к строке регистра, создавая ее при необходимости.
+
+    Строки, в которых не осталось смен, удаляются.
+
+    Аргументы:
+        key (tuple): (employee_id, pickup_point_id, date).
+        delta (dict): Изменение по полям ROLLUP_FIELDS (может быть отрицательным).
+    """
+    if not any(delta.values()):
+        return
+    employee_id, pickup_point_id, date = key
+    rows = DailyWorkHours.objects.filter(employee_id=employee_id, pickup_point_id=pickup_point_id, date=date)
+    updates = {name: F(name) + value for name, value in delta.items()}
+    if rows.update(**updates):
+        if delta['shift_count'] < 0:
+            rows.filter(shift_count__lte=0).delete()
+        return
+    if delta['shift_count'] <= 0:
+        # Строки нет - регистр рассинхронизирован, уменьшать нечего (исправляется rebuild_daily_hours)
+        return
+    try:
+        with transaction.atomic():
+            DailyWorkHours.objects.create(
+                employee_id=employee_id, pickup_point_id=pickup_point_id, date=date, **delta
+            )
+    except IntegrityError:
+        # Строку успели создать параллельно
+        rows.update(**updates)
+
+
+def apply_shift_change(old_state, new_state):
+    """
+    Переносит изменение одной смены в регистр.
+
+    Аргументы:
+        old_state (tuple): Состояние смены до изменения или None для новой смены.
+        new_state (tuple): Состояние смены после изменения или None для удаленной смены.
+    """
+    old_key, old_delta = get_shift_contribution(old_state) if old_state else (None, None)
+    new_key, new_delta = get_shift_contribution(new_state) if new_state else (None, None)
+    if old_key is not None and old_key == new_key:
+        apply_delta(new_key, {name: new_delta[name] - old_delta[name] for name in ROLLUP_FIELDS})
+        return
+    if old_key is not None:
+        apply_delta(old_key, {name: -value for name, value in old_delta.items()})
+    if new_key is not None:
+        apply_delta(new_key, new_delta)
+
+
+def refresh_daily_hours(shifts, extra_pickup_point_ids=()):
+    """
+    Пересчитывает строки регистра, затронутые набором смен, set-based запросами.
+
+    Используется для массовых операций (UPDATE, bulk_create), минующих сигналы save/delete.
+    Пересчитываются все строки в пределах сотрудников, пунктов выдачи и дат набора смен.
+
+    Аргументы:
+        shifts (QuerySet): Набор затронутых смен.
+        extra_pickup_point_ids (iterable): Дополнительные пункты выдачи, строки которых нужно пересчитать
+            (например, прежний пункт выдачи графика).
+    """
+    keys = set(shifts.order_by().values_list('employee_id', 'schedule__pickup_point_id', 'date').distinct())
+    if not keys:
+        return
+    employee_ids = {key[0] for key in keys}
+    pickup_point_ids = {key[1] for key in keys}.union(extra_pickup_point_ids)
+    dates = {key[2] for key in keys}
+    rows = get_rollup_rows(WorkShift.objects.filter(
+        employee_id__in=employee_ids, schedule__pickup_point_id__in=pickup_point_ids, date__in=dates
+    ))
+    with transaction.atomic():
+        DailyWorkHours.objects.filter(
+            employee_id__in=employee_ids, pickup_point_id__in=pickup_point_ids, date__in=dates
+        ).delete()
+        DailyWorkHours.objects.bulk_create([DailyWorkHours(**row) for row in rows])
+
+
+def rebuild_daily_hours(batch_size=2000):
+    """
+    Полностью перестраивает регистр DailyWorkHours по сменам.
+
+    Возвращает:
+        int: Количество созданных строк регистра.
+    """
+    created = 0
+    with transaction.atomic():
+        DailyWorkHours.objects.all().delete()
+        batch = []
+        for row in get_rollup_rows(WorkShift.objects.all()).iterator(chunk_size=batch_size):
+            batch.append(DailyWorkHours(**row))
+            if len(batch) >= batch_size:
+                created += len(DailyWorkHours.objects.bulk_create(batch))
+                batch = []
+        created += len(DailyWorkHours.objects.bulk_create(batch))
+    return created
+
+
+def verify_daily_hours():
+    """
+    Сверяет регистр DailyWorkHours с расчетом по сменам.
+
+    Возвращает:
+        list: Список расхождений (ключ, ожидаемые значения, сохраненные значения); пустой, если расхождений нет.
+    """
+    def key_of(row):
+        return row['employee_id'], row['pickup_point_id'], row['date']
+
+    expected = {key_of(row): tuple(row[name] for name in ROLLUP_FIELDS)
+                for row in get_rollup_rows(WorkShift.objects.all()).iterator()}
+    stored = {key_of(row): tuple(row[name] for name in ROLLUP_FIELDS)
+              for row in DailyWorkHours.objects.values('employee_id', 'pickup_point_id', 'date', *ROLLUP_FIELDS).iterator()}
+    return [
+        (key, expected.get(key), stored.get(key))
+        for key in sorted(expected.keys() | stored.keys())
+        if expected.get(key) != stored.get(key)
+    ]
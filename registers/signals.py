@@ -0,0 +1,71 @@
+# registers/signals.py
+
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+from documents.models import WorkSchedule, WorkShift
+from documents.signals import shifts_bulk_updated
+from .rollup import apply_shift_change, get_shift_state, get_stored_shift_state, refresh_daily_hours
+
+
+@receiver(pre_save, sender=WorkShift)
+def remember_shift_state(sender, instance, **kwargs):
+    """
+    Запоминает сохраненное состояние смены перед изменением.
+    """
+    instance._rollup_state = get_stored_shift_state(instance.pk) if instance.pk else None
+
+
+@receiver(post_save, sender=WorkShift)
+def update_daily_hours_on_save(sender, instance, **kwargs):
+    """
+    Обновляет регистр DailyWorkHours после создания или изменения смены.
+    """
+    apply_shift_change(getattr(instance, '_rollup_state', None), get_shift_state(instance))
+    instance._rollup_state = None
+
+
+@receiver(pre_delete, sender=WorkShift)
+def remember_deleted_shift_state(sender, instance, **kwargs):
+    """
+    Запоминает состояние удаляемой смены, пока ее график еще доступен.
+    """
+    instance._rollup_state = get_stored_shift_state(instance.pk)
+
+
+@receiver(post_delete, sender=WorkShift)
+def update_daily_hours_on_delete(sender, instance, **kwargs):
+    """
+    Обновляет регистр DailyWorkHours после удаления смены.
+    """
+    apply_shift_change(getattr(instance, '_rollup_state', None), None)
+    instance._rollup_state = None
+
+
+@receiver(shifts_bulk_updated, sender=WorkShift)
+def refresh_daily_hours_on_bulk_update(sender, shifts, **kwargs):
+    """
+    Пересчитывает затронутые строки регистра после массового изменения смен.
+    """
+    refresh_daily_hours(shifts)
+
+
+@receiver(pre_save, sender=WorkSchedule)
+def remember_schedule_pickup_point(sender, instance, **kwargs):
+    """
+    Запоминает прежний пункт выдачи графика перед изменением.
+    """
+    instance._rollup_pickup_point_id = None
+    if instance.pk:
+        instance._rollup_pickup_point_id = WorkSchedule.objects.filter(pk=instance.pk).values_list(
+            'pickup_point_id', flat=True
+        ).first()
+
+
+@receiver(post_save, sender=WorkSchedule)
+def refresh_daily_hours_on_pickup_point_change(sender, instance, **kwargs):
+    """
+    Пересчитывает строки регистра, если смены графика перешли в другой пункт выдачи.
+    """
+    old_pickup_point_id = getattr(instance, '_rollup_pickup_point_id', None)
+    if old_pickup_point_id is not None and old_pickup_point_id != instance.pickup_point_id:
+        refresh_daily_hours(instance.shifts.all(), extra_pickup_point_ids=[old_pickup_point_id])
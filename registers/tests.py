@@ -1,3 +1,140 @@
+# registers/tests.py
+
+from datetime import date, time
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.test import TestCase
+from reference_books.models import Agent, PickupPoint, Employee
+from documents.models import WorkSchedule, WorkShift
+from .models import DailyWorkHours
+from .rollup import verify_daily_hours
+
+
+class DailyWorkHoursTest(TestCase):
+    """
+    Тесты для инкрементального обновления регистра DailyWorkHours.
+    """
+
+    def setUp(self):
+        """
+        Устанавливает начальные данные для тестов.
+        Создает агента, два пункта выдачи, сотрудника и по графику на каждый пункт.
+        """
+        self.agent = Agent.objects.create(name="Test Agent", email="agent@example.com", phone_number="1234567890")
+        self.point_1 = PickupPoint.objects.create(name="Pickup Point 1", address="123 Test St", agent=self.agent)
+        self.point_2 = PickupPoint.objects.create(name="Pickup Point 2", address="456 Test Ave", agent=self.agent)
+        self.employee = Employee.objects.create(
+            first_name="John", last_name="Doe", email="john.doe@example.com",
+            date_of_hire=date(2024, 1, 1), position="Operator", agent=self.agent
+        )
+        self.schedule_1 = WorkSchedule.objects.create(
+            employee=self.employee, pickup_point=self.point_1,
+            start_date=date(2024, 8, 1), end_date=date(2024, 8, 31)
+        )
+        self.schedule_2 = WorkSchedule.objects.create(
+            employee=self.employee, pickup_point=self.point_2,
+            start_date=date(2024, 8, 1), end_date=date(2024, 8, 31)
+        )
+
+    def create_shift(self, schedule, day, start_time, end_time, is_approved=False):
+        """
+        Создает смену сотрудника.
+        """
+        return WorkShift.objects.create(
+            schedule=schedule, employee=self.employee, date=date(2024, 8, day),
+            start_time=start_time, end_time=end_time, is_approved=is_approved
+        )
+
+    def get_row(self, pickup_point, day):
+        """
+        Возвращает значения строки регистра или None, если строки нет.
+        """
+        return DailyWorkHours.objects.filter(
+            employee=self.employee, pickup_point=pickup_point, date=date(2024, 8, day)
+        ).values_list('total_minutes', 'approved_minutes', 'shift_count', 'approved_count').first()
+
+    def test_create_and_edit_shift(self):
+        """
+        Проверяет обновление регистра при создании и изменении смен.
+        """
+        shift = self.create_shift(self.schedule_1, 1, time(9), time(13, 30))
+        self.create_shift(self.schedule_1, 1, time(14), time(18), is_approved=True)
+        self.assertEqual(self.get_row(self.point_1, 1), (510, 240, 2, 1))
+
+        shift.end_time = time(12)
+        shift.save()
+        self.assertEqual(self.get_row(self.point_1, 1), (420, 240, 2, 1))
+
+        shift.approve_shift()
+        self.assertEqual(self.get_row(self.point_1, 1), (420, 420, 2, 2))
+        self.assertEqual(verify_daily_hours(), [])
+
+    def test_move_shift_between_days_and_points(self):
+        """
+        Проверяет перенос смены в другой день и другой пункт выдачи.
+        """
+        shift = self.create_shift(self.schedule_1, 1, time(9), time(18))
+        shift.schedule = self.schedule_2
+        shift.date = date(2024, 8, 2)
+        shift.save()
+        self.assertIsNone(self.get_row(self.point_1, 1))
+        self.assertEqual(self.get_row(self.point_2, 2), (540, 0, 1, 0))
+        self.assertEqual(verify_daily_hours(), [])
+
+    def test_delete_shift_and_schedule(self):
+        """
+        Проверяет обновление регистра при удалении смены и каскадном удалении графика.
+        """
+        shift = self.create_shift(self.schedule_1, 1, time(9), time(13))
+        self.create_shift(self.schedule_1, 1, time(14), time(18))
+        self.create_shift(self.schedule_2, 3, time(9), time(18))
+        shift.delete()
+        self.assertEqual(self.get_row(self.point_1, 1), (240, 0, 1, 0))
+
+        self.schedule_2.delete()
+        self.assertIsNone(self.get_row(self.point_2, 3))
+        self.assertEqual(verify_daily_hours(), [])
+
+    def test_bulk_approval_updates_rollup(self):
+        """
+        Проверяет, что массовое утверждение графиков обновляет регистр.
+        """
+        self.create_shift(self.schedule_1, 1, time(9), time(13))
+        self.create_shift(self.schedule_2, 1, time(14), time(18))
+        WorkSchedule.objects.filter(pk=self.schedule_1.pk).approve()
+        self.assertEqual(self.get_row(self.point_1, 1), (240, 240, 1, 1))
+        self.assertEqual(self.get_row(self.point_2, 1), (240, 0, 1, 0))
+
+        self.schedule_2.approve_schedule()
+        self.assertEqual(self.get_row(self.point_2, 1), (240, 240, 1, 1))
+        self.assertEqual(verify_daily_hours(), [])
+
+    def test_rebuild_command(self):
+        """
+        Проверяет сверку и перестроение регистра командой rebuild_daily_hours.
+        """
+        self.create_shift(self.schedule_1, 1, time(9), time(13))
+        WorkShift.objects.bulk_create([
+            WorkShift(schedule=self.schedule_1, employee=self.employee, date=date(2024, 8, 2),
+                      start_time=time(9), end_time=time(18))
+        ])
+        with self.assertRaises(CommandError):
+            call_command('rebuild_daily_hours', verify=True, stdout=StringIO())
+
+        call_command('rebuild_daily_hours', stdout=StringIO())
+        self.assertEqual(self.get_row(self.point_1, 2), (540, 0, 1, 0))
+        out = StringIO()
+        call_command('rebuild_daily_hours', verify=True, stdout=out)
+        self.assertIn('Регистр соответствует сменам', out.getvalue())
 
-# Create your tests here.
+    def test_schedule_pickup_point_change(self):
+        """
+        Проверяет перенос смен в регистре при смене пункта выдачи графика.
+        """
+        self.create_shift(self.schedule_1, 1, time(9), time(18))
+        self.schedule_1.pickup_point = self.point_2
+        self.schedule_1.save()
+        self.assertIsNone(self.get_row(self.point_1, 1))
+        self.assertEqual(self.get_row(self.point_2, 1), (540, 0, 1, 0))
+        self.assertEqual(verify_daily_hours(), [])
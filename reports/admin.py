@@ -1,6 +1,37 @@
 # reports/admin.py
 
 from django.contrib import admin
+from core.admin import LimitedCountPaginator
+from reference_books.admin import SearchIndexAdminMixin
+from reference_books.models import Employee
 from .models import WorkScheduleReport
 
-admin.site.register(WorkScheduleReport)
\ No newline at end of file
+
+@admin.register(WorkScheduleReport)
+class WorkScheduleReportAdmin(SearchIndexAdminMixin, admin.ModelAdmin):
+    """
+    Админ-класс для модели WorkScheduleReport, рассчитанный на большое количество отчетов.
+
+    Атрибуты:
+        list_display (tuple): Поля для отображения в списке отчетов.
+        list_select_related (tuple): Связи, загружаемые вместе со списком.
+        list_filter (tuple): Поля для фильтрации отчетов.
+        date_hierarchy (str): Поле для навигации по датам.
+        search_fields (tuple): Поля для поиска отчетов.
+        autocomplete_fields (tuple): Связи, выбираемые автодополнением.
+        ordering (tuple): Поля для сортировки отчетов.
+        show_full_result_count (bool): Выполнять ли подсчет всех записей при фильтрации.
+        paginator (Paginator): Пагинатор с ограниченным подсчетом записей.
+    """
+    list_display = ('employee', 'pickup_point', 'report_date', 'period_start', 'period_end',
+                    'total_hours', 'approved_shifts', 'is_valid')
+    list_select_related = ('employee', 'pickup_point')
+    list_filter = ('is_valid', 'report_date')
+    date_hierarchy = 'report_date'
+    search_fields = ('employee__last_name',)
+    search_index_model = Employee
+    search_index_field = 'employee'
+    autocomplete_fields = ('employee', 'pickup_point')
+    ordering = ('-report_date', '-id')
+    show_full_result_count = False
+    paginator = LimitedCountPaginator
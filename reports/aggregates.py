@@ -0,0 +1,69 @@
+# reports/aggregates.py
+
+from decimal import Decimal
+from django.db.models import IntegerField, Sum, Value
+from django.db.models.functions import Coalesce, ExtractHour, ExtractMinute
+
+
+def _minutes_of_day(field_name):
+    """
+    Возвращает выражение, переводящее время (TimeField) в количество минут от начала суток.
+    """
+    return ExtractHour(field_name) * 60 + ExtractMinute(field_name)
+
+
+def shift_minutes():
+    """
+    Возвращает выражение продолжительности смены в минутах, вычисляемое на стороне базы данных.
+    """
+    return _minutes_of_day('end_time') - _minutes_of_day('start_time')
+
+
+def minutes_to_hours(minutes):
+    """
+    Переводит минуты в часы с точностью до сотых.
+
+    Аргументы:
+        minutes (int): Количество минут.
+
+    Возвращает:
+        Decimal: Количество часов, округленное до двух знаков.
+    """
+    return (Decimal(minutes or 0) / 60).quantize(Decimal('0.01'))
+
+
+def aggregate_approved_hours(daily_hours):
+    """
+    Считает утвержденные часы и смены по строкам регистра DailyWorkHours одним агрегирующим запросом.
+
+    Аргументы:
+        daily_hours (QuerySet): Набор строк регистра DailyWorkHours.
+
+    Возвращает:
+        dict: {'total_minutes': int, 'shift_count': int}.
+    """
+    return daily_hours.aggregate(
+        total_minutes=Coalesce(Sum('approved_minutes'), Value(0), output_field=IntegerField()),
+        shift_count=Coalesce(Sum('approved_count'), Value(0), output_field=IntegerField()),
+    )
+
+
+def aggregate_approved_hours_by_employee(daily_hours):
+    """
+    Считает утвержденные часы и смены по строкам регистра DailyWorkHours в разрезе сотрудников
+    одним сгруппированным запросом.
+
+    Аргументы:
+        daily_hours (QuerySet): Набор строк регистра DailyWorkHours.
+
+    Возвращает:
+        dict: Словарь {employee_id: {'total_minutes': int, 'shift_count': int}}.
+    """
+    rows = daily_hours.order_by().values('employee_id').annotate(
+        total_minutes=Sum('approved_minutes'),
+        shift_count=Sum('approved_count'),
+    )
+    return {
+        row['employee_id']: {'total_minutes': row['total_minutes'] or 0, 'shift_count': row['shift_count'] or 0}
+        for row in rows
+    }
@@ -0,0 +1,217 @@
+# reports/exports.py
+
+import csv
+from datetime import date
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from documents.models import WorkSchedule, WorkShift
+from reference_books.models import AccountingPeriod
+from .models import WorkScheduleReport
+
+EXPORT_CHUNK_SIZE = 2000  # строк на одно чтение из базы и на один фрагмент ответа
+
+
+class EchoBuffer:
+    """
+    Псевдо-буфер для csv.writer: вместо записи возвращает переданную строку.
+    """
+
+    def write(self, value):
+        return value
+
+
+def get_export_filters(params):
+    """
+    Разбирает параметры фильтрации выгрузки.
+
+    Поддерживаемые параметры: agent_id, pickup_point_id, accounting_period_id,
+    date_from и date_to (YYYY-MM-DD). Учетный период задает агента и интервал дат,
+    если они не указаны явно.
+
+    Аргументы:
+        params (QueryDict): Параметры запроса.
+
+    Возвращает:
+        dict: Ключи agent_id, pickup_point_id, date_from, date_to (значения могут быть None).
+
+    Исключения:
+        ValueError: Если параметры имеют неверный формат или учетный период не найден.
+    """
+    filters = {
+        'agent_id': int(params['agent_id']) if params.get('agent_id') else None,
+        'pickup_point_id': int(params['pickup_point_id']) if params.get('pickup_point_id') else None,
+        'date_from': date.fromisoformat(params['date_from']) if params.get('date_from') else None,
+        'date_to': date.fromisoformat(params['date_to']) if params.get('date_to') else None,
+    }
+    if params.get('accounting_period_id'):
+        period = AccountingPeriod.objects.filter(pk=int(params['accounting_period_id'])).first()
+        if period is None:
+            raise ValueError('Учетный период не найден')
+        filters['agent_id'] = filters['agent_id'] or period.agent_id
+        filters['date_from'] = filters['date_from'] or period.start_date
+        filters['date_to'] = filters['date_to'] or period.end_date
+    return filters
+
+
+def get_work_shifts_export(filters):
+    """
+    Возвращает параметры выгрузки смен: имя файла, заголовки, набор данных и поля столбцов.
+
+    Аргументы:
+        filters (dict): Фильтры из get_export_filters.
+
+    Возвращает:
+        tuple: (filename, header, queryset, fields) для stream_csv или write_csv.
+    """
+    shifts = WorkShift.objects.order_by('id')
+    if filters['agent_id']:
+        shifts = shifts.filter(employee__agent_id=filters['agent_id'])
+    if filters['pickup_point_id']:
+        shifts = shifts.filter(schedule__pickup_point_id=filters['pickup_point_id'])
+    if filters['date_from']:
+        shifts = shifts.filter(date__gte=filters['date_from'])
+    if filters['date_to']:
+        shifts = shifts.filter(date__lte=filters['date_to'])
+    return (
+        'work_shifts.csv',
+        ['ID', 'Дата', 'Начало', 'Окончание', 'Утверждена', 'ID сотрудника', 'Фамилия', 'Имя', 'Отчество',
+         'ID графика', 'ID пункта выдачи', 'Пункт выдачи'],
+        shifts,
+        ['id', 'date', 'start_time', 'end_time', 'is_approved', 'employee_id', 'employee__last_name',
+         'employee__first_name', 'employee__middle_name', 'schedule_id', 'schedule__pickup_point_id',
+         'schedule__pickup_point__name'],
+    )
+
+
+def get_work_schedules_export(filters):
+    """
+    Возвращает параметры выгрузки графиков работы (см. get_work_shifts_export).
+    По датам выбираются графики, пересекающиеся с интервалом.
+    """
+    schedules = WorkSchedule.objects.order_by('id')
+    if filters['agent_id']:
+        schedules = schedules.filter(pickup_point__agent_id=filters['agent_id'])
+    if filters['pickup_point_id']:
+        schedules = schedules.filter(pickup_point_id=filters['pickup_point_id'])
+    if filters['date_from']:
+        schedules = schedules.filter(end_date__gte=filters['date_from'])
+    if filters['date_to']:
+        schedules = schedules.filter(start_date__lte=filters['date_to'])
+    return (
+        'work_schedules.csv',
+        ['ID', 'ID сотрудника', 'Фамилия', 'Имя', 'Отчество', 'ID пункта выдачи', 'Пункт выдачи',
+         'Дата начала', 'Дата окончания', 'Статус'],
+        schedules,
+        ['id', 'employee_id', 'employee__last_name', 'employee__first_name', 'employee__middle_name',
+         'pickup_point_id', 'pickup_point__name', 'start_date', 'end_date', 'status'],
+    )
+
+
+def get_work_schedule_reports_export(filters):
+    """
+    Возвращает параметры выгрузки отчетов по графикам работы (см. get_work_shifts_export).
+    По датам выбираются отчеты, период которых пересекается с интервалом.
+    """
+    reports = WorkScheduleReport.objects.order_by('id')
+    if filters['agent_id']:
+        reports = reports.filter(employee__agent_id=filters['agent_id'])
+    if filters['pickup_point_id']:
+        reports = reports.filter(pickup_point_id=filters['pickup_point_id'])
+    if filters['date_from']:
+        reports = reports.filter(period_end__gte=filters['date_from'])
+    if filters['date_to']:
+        reports = reports.filter(period_start__lte=filters['date_to'])
+    return (
+        'work_schedule_reports.csv',
+        ['ID', 'ID сотрудника', 'Фамилия', 'Имя', 'Отчество', 'ID пункта выдачи', 'Начало периода',
+         'Окончание периода', 'Дата отчета', 'Отработано часов', 'Утвержденных смен', 'Актуален'],
+        reports,
+        ['id', 'employee_id', 'employee__last_name', 'employee__first_name', 'employee__middle_name',
+         'pickup_point_id', 'period_start', 'period_end', 'report_date', 'total_hours', 'approved_shifts',
+         'is_valid'],
+    )
+
+
+# Выгрузки по именам (для фоновых заданий, см. reports.jobs)
+EXPORTS = {
+    'shifts': get_work_shifts_export,
+    'schedules': get_work_schedules_export,
+    'reports': get_work_schedule_reports_export,
+}
+
+
+def iterate_csv(header, rows, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Формирует CSV по частям: каждые chunk_size строк отдаются одним фрагментом.
+
+    Аргументы:
+        header (list): Заголовки столбцов.
+        rows (iterable): Строки данных (кортежи).
+        chunk_size (int): Количество строк в одном фрагменте.
+
+    Возвращает:
+        generator: Фрагменты CSV (str). Первый фрагмент начинается с BOM, чтобы Excel
+            корректно открывал кириллицу.
+    """
+    writer = csv.writer(EchoBuffer())
+    chunk = ['\ufeff', writer.writerow(header)]
+    for row in rows:
+        chunk.append(writer.writerow(row))
+        if len(chunk) >= chunk_size:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+
+
+async def aiterate_chunks(chunks):
+    """
+    Отдает фрагменты синхронного генератора как асинхронный итератор.
+
+    Каждый фрагмент (вместе с чтением строк из базы) формируется в потоке базы данных
+    через sync_to_async, поэтому медленный клиент не блокирует цикл событий ASGI-сервера,
+    а выгрузка по-прежнему не загружается в память целиком.
+
+    Аргументы:
+        chunks (iterable): Синхронный итератор фрагментов.
+
+    Возвращает:
+        async generator: Те же фрагменты.
+    """
+    chunks = iter(chunks)
+    while True:
+        chunk = await sync_to_async(next)(chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+def stream_csv(request, filename, header, queryset, fields):
+    """
+    Возвращает потоковый CSV-ответ по набору данных.
+
+    Данные читаются через values_list(...).iterator(), без создания экземпляров моделей
+    и без загрузки всей выборки в память, поэтому потребление памяти не зависит от размера выгрузки.
+    При работе через ASGI ответ отдается асинхронным итератором (aiterate_chunks): синхронный
+    итератор Django под ASGI сначала целиком собирает в память.
+
+    Аргументы:
+        request (HttpRequest): Объект запроса (WSGIRequest или ASGIRequest).
+        filename (str): Имя файла выгрузки.
+        header (list): Заголовки столбцов.
+        queryset (QuerySet): Набор данных.
+        fields (list): Поля (в том числе через связи), выгружаемые в столбцы.
+
+    Возвращает:
+        StreamingHttpResponse: Потоковый ответ с CSV.
+    """
+    # База выбирается сейчас: строки читаются уже после выхода из представления и middleware,
+    # которое направляет чтение запроса на реплику
+    rows = queryset.using(queryset.db).values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    chunks = iterate_csv(header, rows)
+    if isinstance(request, ASGIRequest):
+        chunks = aiterate_chunks(chunks)
+    response = StreamingHttpResponse(chunks, content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,171 @@
+# reports/jobs.py
+
+from core.jobs import JobError, parse_id, register_job, save_result_file
+from reference_books.models import AccountingPeriod, Agent, Employee, PickupPoint
+from .exports import EXPORT_CHUNK_SIZE, EXPORTS, get_export_filters, iterate_csv
+from .payroll import get_payroll_sheet
+from .views import build_work_schedule_report, build_work_schedule_reports, get_report_period
+
+
+def validate_employee_params(params):
+    """
+    Проверяет параметры задачи reports.work_schedule_report.
+    """
+    return {'employee_id': parse_id(params, 'employee_id')}
+
+
+def validate_reports_params(params):
+    """
+    Проверяет параметры задачи reports.work_schedule_reports: нужен agent_id или pickup_point_id.
+    """
+    params = {
+        'agent_id': parse_id(params, 'agent_id', required=False),
+        'pickup_point_id': parse_id(params, 'pickup_point_id', required=False),
+    }
+    if params['agent_id'] is None and params['pickup_point_id'] is None:
+        raise JobError('Укажите agent_id или pickup_point_id')
+    return {name: value for name, value in params.items() if value is not None}
+
+
+def validate_payroll_params(params):
+    """
+    Проверяет параметры задачи reports.payroll.
+    """
+    return {'accounting_period_id': parse_id(params, 'accounting_period_id')}
+
+
+def validate_export_params(params):
+    """
+    Проверяет параметры задачи reports.export: имя выгрузки и формат фильтров.
+    """
+    if params['export'] not in EXPORTS:
+        raise JobError(f'Неизвестная выгрузка {params["export"]!r}. Доступные: {", ".join(EXPORTS)}')
+    filters = params.get('filters') or {}
+    if not isinstance(filters, dict):
+        raise JobError('Фильтры выгрузки должны быть объектом')
+    try:
+        get_export_filters(filters)
+    except (TypeError, ValueError) as error:
+        raise JobError(f'Неверные фильтры выгрузки: {error}')
+    return params
+
+
+@register_job('reports.work_schedule_report', validate=validate_employee_params)
+def work_schedule_report_job(job, employee_id):
+    """
+    Задача: пересчитывает отчет сотрудника за последние REPORT_PERIOD_DAYS дней.
+
+    Возвращает:
+        dict: ID отчета, отработанные часы и количество утвержденных смен.
+    """
+    employee = Employee.objects.filter(pk=employee_id).first()
+    if employee is None:
+        raise JobError(f'Сотрудник {employee_id} не найден')
+    report = build_work_schedule_report(employee, *get_report_period())
+    return {'report_id': report.pk, 'total_hours': str(report.total_hours), 'approved_shifts': report.approved_shifts}
+
+
+@register_job('reports.work_schedule_reports', validate=validate_reports_params)
+def work_schedule_reports_job(job, agent_id=None, pickup_point_id=None):
+    """
+    Задача: формирует отчеты по всем сотрудникам агента или пункта выдачи (см. build_work_schedule_reports)
+    и сохраняет сводную ведомость часов в CSV (файл результата).
+
+    Возвращает:
+        dict: Количество отчетов, сумма часов и количество утвержденных смен.
+    """
+    if pickup_point_id:
+        pickup_point = PickupPoint.objects.filter(pk=pickup_point_id).first()
+        if pickup_point is None:
+            raise JobError(f'Пункт выдачи {pickup_point_id} не найден')
+        reports = build_work_schedule_reports(pickup_point=pickup_point)
+    elif agent_id:
+        agent = Agent.objects.filter(pk=agent_id).first()
+        if agent is None:
+            raise JobError(f'Агент {agent_id} не найден')
+        reports = build_work_schedule_reports(agent=agent)
+    else:
+        raise JobError('Укажите agent_id или pickup_point_id')
+    job.set_progress(80, 'Сохранение ведомости')
+
+    save_result_file(job, 'work_schedule_reports.csv', iterate_csv(
+        ['ID сотрудника', 'Сотрудник', 'Начало периода', 'Окончание периода', 'Отработано часов', 'Утвержденных смен'],
+        (
+            (report.employee_id, report.employee.get_full_name(), report.period_start, report.period_end,
+             report.total_hours, report.approved_shifts)
+            for report in reports
+        ),
+    ))
+    return {
+        'reports': len(reports),
+        'total_hours': str(sum(report.total_hours for report in reports)),
+        'approved_shifts': sum(report.approved_shifts for report in reports),
+    }
+
+
+@register_job('reports.payroll', validate=validate_payroll_params)
+def payroll_job(job, accounting_period_id):
+    """
+    Задача: рассчитывает отработанное время сотрудников агента за учетный период (см. get_payroll_sheet)
+    и сохраняет расчетную ведомость в CSV (файл результата): по строке на сотрудника.
+
+    Возвращает:
+        dict: Количество сотрудников, сумма часов и сверхурочных часов.
+    """
+    period = AccountingPeriod.objects.filter(pk=accounting_period_id).first()
+    if period is None:
+        raise JobError(f'Учетный период {accounting_period_id} не найден')
+    sheet = get_payroll_sheet(period)
+    job.set_progress(80, 'Сохранение ведомости')
+
+    save_result_file(job, 'payroll.csv', iterate_csv(
+        ['ID сотрудника', 'Сотрудник', 'Отработано часов', 'Сверхурочных часов', 'Отработано дней'],
+        (
+            (employee.pk, employee.get_full_name(), item['total_hours'], item['overtime_hours'], item['worked_days'])
+            for employee, item in sheet
+        ),
+    ))
+    return {
+        'employees': len(sheet),
+        'total_hours': round(sum(item['total_hours'] for employee, item in sheet), 2),
+        'overtime_hours': round(sum(item['overtime_hours'] for employee, item in sheet), 2),
+    }
+
+
+@register_job('reports.export', validate=validate_export_params)
+def export_job(job, export, filters=None):
+    """
+    Задача: сохраняет выгрузку в CSV (файл результата), обновляя прогресс каждые EXPORT_CHUNK_SIZE строк.
+
+    Аргументы:
+        export (str): Выгрузка из EXPORTS ('shifts', 'schedules', 'reports').
+        filters (dict): Фильтры выгрузки, как параметры запроса представлений выгрузки
+            (agent_id, pickup_point_id, accounting_period_id, date_from, date_to).
+
+    Возвращает:
+        dict: Количество выгруженных строк.
+    """
+    try:
+        filename, header, queryset, fields = EXPORTS[export](get_export_filters(filters or {}))
+    except ValueError as error:
+        raise JobError(f'Неверные фильтры выгрузки: {error}')
+    total = queryset.count()
+    exported = 0
+
+    def rows():
+        # Строки читаются страницами по ID (выгрузки упорядочены по id, первый столбец - id): прогресс
+        # записывается, когда чтение страницы завершено. Запись при открытом курсоре чтения в SQLite (WAL)
+        # сразу завершается ошибкой "database is locked", если базу тем временем изменил другой процесс.
+        nonlocal exported
+        last_id = 0
+        while True:
+            page = list(queryset.filter(pk__gt=last_id).values_list(*fields)[:EXPORT_CHUNK_SIZE])
+            yield from page
+            exported += len(page)
+            if len(page) < EXPORT_CHUNK_SIZE:
+                break
+            last_id = page[-1][0]
+            job.set_progress(exported * 100 // max(total, 1), f'Выгружено строк: {exported} из {total}')
+
+    save_result_file(job, filename, iterate_csv(header, rows()))
+    return {'rows': exported}
@@ -0,0 +1,33 @@
+# Generated by Django 5.1 on 2026-10-18 19:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('reference_books', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkScheduleReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report_date', models.DateField()),
+                ('period_start', models.DateField()),
+                ('period_end', models.DateField()),
+                ('total_hours', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('approved_shifts', models.IntegerField()),
+                ('is_valid', models.BooleanField(default=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='reference_books.employee')),
+                ('pickup_point', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='reference_books.pickuppoint')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(condition=models.Q(('pickup_point__isnull', True)), fields=('employee', 'period_start', 'period_end'), name='workschedulereport_employee_period_uniq'), models.UniqueConstraint(condition=models.Q(('pickup_point__isnull', False)), fields=('employee', 'pickup_point', 'period_start', 'period_end'), name='workschedulereport_point_period_uniq')],
+            },
+        ),
+    ]
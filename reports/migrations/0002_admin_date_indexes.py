@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-18 20:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reference_books', '0004_search_index'),
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='workschedulereport',
+            index=models.Index(fields=['report_date'], name='workschedulereport_date_idx'),
+        ),
+    ]
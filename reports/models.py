@@ -1,22 +1,81 @@
 # reports/models.py
 
 from django.db import models
-from reference_books.models import Employee
+from reference_books.models import Employee, PickupPoint
+
+
+class WorkScheduleReportQuerySet(models.QuerySet):
+    """
+    Набор отчетов по графикам работы с выборкой и сбросом отчетов, затронутых изменением смен.
+    """
+
+    def covering(self, employee_ids, date_from, date_to):
+        """
+        Возвращает отчеты сотрудников, период которых пересекается с интервалом дат.
+
+        Аргументы:
+            employee_ids (iterable): ID сотрудников.
+            date_from (date): Начало интервала.
+            date_to (date): Окончание интервала.
+        """
+        return self.filter(employee_id__in=employee_ids, period_start__lte=date_to, period_end__gte=date_from)
+
+    def invalidate(self):
+        """
+        Помечает отчеты набора как устаревшие одним UPDATE-запросом.
+
+        Возвращает:
+            int: Количество помеченных отчетов.
+        """
+        return self.filter(is_valid=True).update(is_valid=False)
+
 
 class WorkScheduleReport(models.Model):
     """
     Модель для отчетов по графикам работы.
 
+    Отчет однозначно определяется сотрудником, периодом и (необязательно) пунктом выдачи
+    и переиспользуется, пока он актуален. При изменении смен сотрудника в пределах периода
+    отчет помечается устаревшим (is_valid=False) и пересчитывается при следующем запросе.
+
     Атрибуты:
         employee (ForeignKey): Ссылка на сотрудника, для которого создается отчет.
+        pickup_point (ForeignKey): Пункт выдачи, смены которого учтены в отчете (пусто - все пункты выдачи).
         report_date (DateField): Дата создания отчета.
+        period_start (DateField): Дата начала отчетного периода.
+        period_end (DateField): Дата окончания отчетного периода.
         total_hours (DecimalField): Общее количество отработанных часов.
         approved_shifts (IntegerField): Количество утвержденных смен.
+        is_valid (BooleanField): Актуален ли отчет.
     """
     employee = models.ForeignKey(Employee, on_delete=models.CASCADE)
+    pickup_point = models.ForeignKey(PickupPoint, on_delete=models.CASCADE, blank=True, null=True)
     report_date = models.DateField()
+    period_start = models.DateField()
+    period_end = models.DateField()
     total_hours = models.DecimalField(max_digits=5, decimal_places=2)
     approved_shifts = models.IntegerField()
+    is_valid = models.BooleanField(default=True)
+
+    objects = WorkScheduleReportQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['employee', 'period_start', 'period_end'],
+                condition=models.Q(pickup_point__isnull=True),
+                name='workschedulereport_employee_period_uniq',
+            ),
+            models.UniqueConstraint(
+                fields=['employee', 'pickup_point', 'period_start', 'period_end'],
+                condition=models.Q(pickup_point__isnull=False),
+                name='workschedulereport_point_period_uniq',
+            ),
+        ]
+        indexes = [
+            # Сортировка и навигация по датам в админке
+            models.Index(fields=['report_date'], name='workschedulereport_date_idx'),
+        ]
 
     def __str__(self):
         return f"Отчет {self.employee} за {self.report_date}"
@@ -0,0 +1,116 @@
+# reports/payroll.py
+
+import numpy as np
+from django.db.models import Sum
+from reference_books.models import Employee
+from registers.models import DailyWorkHours
+
+DAILY_NORM_HOURS = 8  # норма часов в день, сверх которой время считается сверхурочным
+
+
+class PayrollCalculation:
+    """
+    Результат расчета отработанного времени за учетный период в колоночном представлении.
+
+    Значения хранятся в массивах NumPy: строки соответствуют сотрудникам (employee_ids),
+    столбцы - дням периода (dates).
+
+    Атрибуты:
+        accounting_period (AccountingPeriod): Учетный период расчета.
+        employee_ids (ndarray): ID сотрудников агента по возрастанию, форма (n,).
+        dates (ndarray): Дни периода (datetime64[D]), форма (d,).
+        hours (ndarray): Утвержденные часы по сотрудникам и дням, форма (n, d).
+        overtime_hours (ndarray): Сверхурочные часы по сотрудникам и дням, форма (n, d).
+        total_hours (ndarray): Всего часов за период по сотрудникам, форма (n,).
+        total_overtime_hours (ndarray): Всего сверхурочных часов за период по сотрудникам, форма (n,).
+        worked_days (ndarray): Количество отработанных дней по сотрудникам, форма (n,).
+    """
+
+    def __init__(self, accounting_period, employee_ids, dates, hours, daily_norm_hours):
+        self.accounting_period = accounting_period
+        self.employee_ids = employee_ids
+        self.dates = dates
+        self.hours = hours
+        self.overtime_hours = np.maximum(hours - daily_norm_hours, 0)
+        self.total_hours = hours.sum(axis=1)
+        self.total_overtime_hours = self.overtime_hours.sum(axis=1)
+        self.worked_days = np.count_nonzero(hours, axis=1)
+
+    def get_employee_totals(self):
+        """
+        Возвращает итоги по сотрудникам.
+
+        Возвращает:
+            dict: Словарь {employee_id: {'total_hours': float, 'overtime_hours': float, 'worked_days': int}}.
+        """
+        return {
+            int(employee_id): {
+                'total_hours': round(float(total), 2),
+                'overtime_hours': round(float(overtime), 2),
+                'worked_days': int(days),
+            }
+            for employee_id, total, overtime, days in zip(
+                self.employee_ids, self.total_hours, self.total_overtime_hours, self.worked_days
+            )
+        }
+
+
+def calculate_payroll(accounting_period, daily_norm_hours=DAILY_NORM_HOURS):
+    """
+    Рассчитывает отработанные и сверхурочные часы всех сотрудников агента за учетный период.
+
+    Данные загружаются одним сгруппированным запросом из дневного регистра DailyWorkHours
+    (часы по всем пунктам выдачи за день складываются базой данных) в колоночные массивы,
+    после чего матрица "сотрудник x день", сверхурочные и итоги считаются векторными
+    операциями NumPy без циклов по объектам.
+
+    Аргументы:
+        accounting_period (AccountingPeriod): Учетный период.
+        daily_norm_hours (float): Норма часов в день.
+
+    Возвращает:
+        PayrollCalculation: Результат расчета.
+    """
+    start = np.datetime64(accounting_period.start_date, 'D')
+    end = np.datetime64(accounting_period.end_date, 'D')
+    dates = np.arange(start, end + 1)
+
+    employee_ids = np.fromiter(
+        Employee.objects.filter(agent_id=accounting_period.agent_id).order_by('id').values_list('id', flat=True),
+        dtype=np.int64,
+    )
+    rows = DailyWorkHours.objects.filter(
+        employee__agent_id=accounting_period.agent_id,
+        date__range=(accounting_period.start_date, accounting_period.end_date),
+        approved_minutes__gt=0,
+    ).order_by().values_list('employee_id', 'date').annotate(minutes=Sum('approved_minutes'))
+    rows = list(rows)
+
+    hours = np.zeros((len(employee_ids), len(dates)))
+    if rows:
+        row_employee_ids, row_dates, minutes = zip(*rows)
+        employee_index = np.searchsorted(employee_ids, np.array(row_employee_ids, dtype=np.int64))
+        day_index = (np.array(row_dates, dtype='datetime64[D]') - start).astype(np.int64)
+        flat_index = employee_index * len(dates) + day_index
+        hours = np.bincount(
+            flat_index, weights=np.array(minutes, dtype=np.float64) / 60, minlength=hours.size
+        ).reshape(hours.shape)
+
+    return PayrollCalculation(accounting_period, employee_ids, dates, hours, daily_norm_hours)
+
+
+def get_payroll_sheet(accounting_period, daily_norm_hours=DAILY_NORM_HOURS):
+    """
+    Возвращает расчетную ведомость за учетный период: итоги calculate_payroll по каждому сотруднику агента.
+
+    Аргументы:
+        accounting_period (AccountingPeriod): Учетный период.
+        daily_norm_hours (float): Норма часов в день.
+
+    Возвращает:
+        list: Пары (сотрудник, итоги) в порядке ID сотрудников; итоги - словарь
+            с ключами total_hours, overtime_hours и worked_days (см. PayrollCalculation.get_employee_totals).
+    """
+    totals = calculate_payroll(accounting_period, daily_norm_hours).get_employee_totals()
+    employees = Employee.objects.in_bulk(list(totals))
+    return [(employees[employee_id], item) for employee_id, item in totals.items()]
@@ -0,0 +1,74 @@
+# reports/signals.py
+
+from django.db.models import Max, Min
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from documents.models import WorkSchedule, WorkShift
+from documents.signals import shifts_bulk_updated
+from .models import WorkScheduleReport
+
+
+@receiver(pre_save, sender=WorkShift)
+def invalidate_reports_before_shift_change(sender, instance, **kwargs):
+    """
+    Сбрасывает отчеты, в которые входила смена до изменения (прежние сотрудник и дата).
+    """
+    if not instance.pk:
+        return
+    stored = WorkShift.objects.filter(pk=instance.pk).values_list('employee_id', 'date').first()
+    if stored is not None:
+        employee_id, date = stored
+        WorkScheduleReport.objects.covering([employee_id], date, date).invalidate()
+
+
+@receiver(post_save, sender=WorkShift)
+@receiver(post_delete, sender=WorkShift)
+def invalidate_reports_on_shift_change(sender, instance, **kwargs):
+    """
+    Сбрасывает отчеты сотрудника, период которых включает дату созданной, измененной или удаленной смены.
+    """
+    date = WorkShift._meta.get_field('date').to_python(instance.date)
+    WorkScheduleReport.objects.covering([instance.employee_id], date, date).invalidate()
+
+
+@receiver(shifts_bulk_updated, sender=WorkShift)
+def invalidate_reports_on_bulk_update(sender, shifts, **kwargs):
+    """
+    Сбрасывает отчеты, затронутые массовым изменением смен.
+    """
+    employee_ids = set(shifts.order_by().values_list('employee_id', flat=True).distinct())
+    if not employee_ids:
+        return
+    bounds = shifts.aggregate(date_from=Min('date'), date_to=Max('date'))
+    WorkScheduleReport.objects.covering(employee_ids, bounds['date_from'], bounds['date_to']).invalidate()
+
+
+@receiver(pre_save, sender=WorkSchedule)
+def remember_schedule_pickup_point_for_reports(sender, instance, **kwargs):
+    """
+    Запоминает прежний пункт выдачи графика перед изменением.
+    """
+    instance._report_pickup_point_id = None
+    if instance.pk:
+        instance._report_pickup_point_id = WorkSchedule.objects.filter(pk=instance.pk).values_list(
+            'pickup_point_id', flat=True
+        ).first()
+
+
+@receiver(post_save, sender=WorkSchedule)
+def invalidate_reports_on_pickup_point_change(sender, instance, **kwargs):
+    """
+    Сбрасывает отчеты прежнего и нового пунктов выдачи по сотрудникам и датам смен графика,
+    если график перенесен в другой пункт выдачи. Отчеты по всем пунктам (без пункта выдачи) не меняются.
+    """
+    old_pickup_point_id = getattr(instance, '_report_pickup_point_id', None)
+    if old_pickup_point_id is None or old_pickup_point_id == instance.pickup_point_id:
+        return
+    shifts = instance.shifts.all()
+    employee_ids = set(shifts.order_by().values_list('employee_id', flat=True).distinct())
+    if not employee_ids:
+        return
+    bounds = shifts.aggregate(date_from=Min('date'), date_to=Max('date'))
+    WorkScheduleReport.objects.covering(employee_ids, bounds['date_from'], bounds['date_to']).filter(
+        pickup_point_id__in=[old_pickup_point_id, instance.pickup_point_id]
+    ).invalidate()
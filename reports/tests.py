@@ -1,3 +1,492 @@
-from django.test import TestCase
+# reports/tests.py
 
-# Create your tests here.
+import csv
+import tempfile
+from unittest.mock import patch
+from datetime import date, time, timedelta
+from decimal import Decimal
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from reference_books.models import Agent, PickupPoint, Employee, AccountingPeriod
+from documents.models import WorkSchedule, WorkShift
+from core.jobs import JobError, claim_next_job, enqueue, run_job
+from .models import WorkScheduleReport, WorkScheduleReportQuerySet
+from .payroll import calculate_payroll
+from .views import get_report_period
+
+
+class WorkScheduleReportTest(TestCase):
+    """
+    Тесты для генерации отчетов по графикам работы.
+    Проверяет агрегацию часов на стороне базы данных и пакетную генерацию отчетов.
+    """
+
+    def setUp(self):
+        """
+        Устанавливает начальные данные для тестов.
+        Создает агента, два пункта выдачи, трех сотрудников и смены за последние дни.
+        """
+        self.today = timezone.now().date()
+        self.agent = Agent.objects.create(name="Test Agent", email="agent@example.com", phone_number="1234567890")
+        self.point_1 = PickupPoint.objects.create(name="Pickup Point 1", address="123 Test St", agent=self.agent)
+        self.point_2 = PickupPoint.objects.create(name="Pickup Point 2", address="456 Test Ave", agent=self.agent)
+        self.employee = self.create_employee("John", "Doe", self.point_1)
+        self.colleague = self.create_employee("Jane", "Roe", self.point_2)
+        self.idle = self.create_employee("Jim", "Poe", self.point_1)
+        self.schedule_1 = self.create_schedule(self.employee, self.point_1)
+        self.schedule_2 = self.create_schedule(self.colleague, self.point_2)
+
+        # 8:30 + 4:15 утвержденных часов у сотрудника в пункте 1, неутвержденная и старая смены не учитываются
+        self.create_shift(self.schedule_1, self.employee, 1, time(9, 0), time(17, 30), True)
+        self.create_shift(self.schedule_1, self.employee, 2, time(10, 0), time(14, 15), True)
+        self.create_shift(self.schedule_1, self.employee, 3, time(9, 0), time(18, 0), False)
+        self.create_shift(self.schedule_1, self.employee, 40, time(9, 0), time(18, 0), True)
+        # Коллега работал в пункте 2, а один раз - в пункте 1
+        self.create_shift(self.schedule_2, self.colleague, 1, time(8, 0), time(20, 0), True)
+        self.create_shift(self.schedule_1, self.colleague, 2, time(15, 0), time(16, 45), True)
+
+    def create_employee(self, first_name, last_name, pickup_point):
+        """
+        Создает сотрудника тестового агента.
+        """
+        return Employee.objects.create(
+            first_name=first_name, last_name=last_name, email=f"{first_name.lower()}@example.com",
+            date_of_hire=self.today - timedelta(days=365), position="Operator",
+            agent=self.agent, default_pickup_point=pickup_point
+        )
+
+    def create_schedule(self, employee, pickup_point):
+        """
+        Создает график работы на последние 60 дней.
+        """
+        return WorkSchedule.objects.create(
+            employee=employee, pickup_point=pickup_point,
+            start_date=self.today - timedelta(days=60), end_date=self.today
+        )
+
+    def create_shift(self, schedule, employee, days_ago, start_time, end_time, is_approved):
+        """
+        Создает смену days_ago дней назад.
+        """
+        return WorkShift.objects.create(
+            schedule=schedule, employee=employee, date=self.today - timedelta(days=days_ago),
+            start_time=start_time, end_time=end_time, is_approved=is_approved
+        )
+
+    def test_report_counts_minutes(self):
+        """
+        Проверяет, что отчет учитывает минуты и только утвержденные смены за период.
+        """
+        response = self.client.get(reverse('generate_report', args=[self.employee.pk]))
+        self.assertEqual(response.status_code, 200)
+        report = WorkScheduleReport.objects.get(employee=self.employee)
+        self.assertEqual(report.total_hours, Decimal('12.75'))
+        self.assertEqual(report.approved_shifts, 2)
+
+    def test_batch_reports_for_agent(self):
+        """
+        Проверяет пакетную генерацию отчетов по всем сотрудникам агента.
+        """
+        response = self.client.get(reverse('generate_reports'), {'agent_id': self.agent.pk})
+        self.assertEqual(response.status_code, 200)
+        reports = {
+            report.employee_id: (report.total_hours, report.approved_shifts)
+            for report in WorkScheduleReport.objects.all()
+        }
+        self.assertEqual(reports, {
+            self.employee.pk: (Decimal('12.75'), 2),
+            self.colleague.pk: (Decimal('13.75'), 2),
+            self.idle.pk: (Decimal('0.00'), 0),
+        })
+
+    def test_batch_reports_for_pickup_point(self):
+        """
+        Проверяет, что отчеты по пункту выдачи учитывают только смены этого пункта.
+        """
+        response = self.client.get(reverse('generate_reports'), {'pickup_point_id': self.point_1.pk})
+        self.assertEqual(response.status_code, 200)
+        reports = {
+            report.employee_id: (report.total_hours, report.approved_shifts)
+            for report in WorkScheduleReport.objects.all()
+        }
+        self.assertEqual(reports, {
+            self.employee.pk: (Decimal('12.75'), 2),
+            self.colleague.pk: (Decimal('1.75'), 1),
+            self.idle.pk: (Decimal('0.00'), 0),
+        })
+
+    def test_batch_reports_query_count_is_constant(self):
+        """
+        Проверяет, что количество запросов не зависит от числа сотрудников.
+        """
+        for i in range(10):
+            self.create_employee(f"Extra{i}", "Worker", self.point_1)
+        # агент, сотрудники, актуальные отчеты, агрегирующий запрос, замена отчетов в транзакции
+        with self.assertNumQueries(8):
+            self.client.get(reverse('generate_reports'), {'agent_id': self.agent.pk})
+        # повторный запрос отдает сохраненные отчеты без пересчета
+        with self.assertNumQueries(3):
+            self.client.get(reverse('generate_reports'), {'agent_id': self.agent.pk})
+
+    def test_batch_reports_require_owner(self):
+        """
+        Проверяет, что без agent_id и pickup_point_id возвращается ошибка 400.
+        """
+        response = self.client.get(reverse('generate_reports'))
+        self.assertEqual(response.status_code, 400)
+
+    def test_batch_reports_reject_invalid_owner_id(self):
+        """
+        Проверяет, что нечисловой или слишком большой ID агента или пункта выдачи дает ошибку 400,
+        а такие же параметры фонового задания отклоняются при постановке в очередь.
+        """
+        for params in ({'agent_id': 'abc'}, {'pickup_point_id': '1.5'}, {'agent_id': str(2 ** 63)}):
+            response = self.client.get(reverse('generate_reports'), params)
+            self.assertEqual(response.status_code, 400)
+            with self.assertRaises(JobError):
+                enqueue('reports.work_schedule_reports', params)
+        self.assertFalse(WorkScheduleReport.objects.exists())
+
+    def test_report_is_reused_until_shift_changes(self):
+        """
+        Проверяет, что повторный запрос отдает сохраненный отчет, а изменение смены его сбрасывает.
+        """
+        url = reverse('generate_report', args=[self.employee.pk])
+        self.client.get(url)
+        self.client.get(url)
+        report = WorkScheduleReport.objects.get(employee=self.employee)
+        self.assertTrue(report.is_valid)
+
+        self.create_shift(self.schedule_1, self.colleague, 5, time(9, 0), time(10, 0), True)
+        report.refresh_from_db()
+        self.assertTrue(report.is_valid)
+
+        shift = self.create_shift(self.schedule_1, self.employee, 5, time(9, 0), time(10, 0), True)
+        report.refresh_from_db()
+        self.assertFalse(report.is_valid)
+
+        self.client.get(url)
+        report = WorkScheduleReport.objects.get(employee=self.employee)
+        self.assertTrue(report.is_valid)
+        self.assertEqual(report.total_hours, Decimal('13.75'))
+
+        shift.delete()
+        report.refresh_from_db()
+        self.assertFalse(report.is_valid)
+
+    def test_shift_moved_out_of_period_invalidates_report(self):
+        """
+        Проверяет, что перенос смены за пределы периода сбрасывает отчет, в который она входила.
+        """
+        shift = self.create_shift(self.schedule_1, self.employee, 5, time(9, 0), time(10, 0), True)
+        self.client.get(reverse('generate_report', args=[self.employee.pk]))
+        shift.date = self.today - timedelta(days=50)
+        shift.save()
+        self.assertFalse(WorkScheduleReport.objects.get(employee=self.employee).is_valid)
+
+    def test_pickup_point_change_invalidates_reports_of_both_points(self):
+        """
+        Проверяет, что перенос графика в другой пункт выдачи сбрасывает отчеты прежнего и нового пунктов,
+        и пересчитанные отчеты учитывают смены графика в новом пункте.
+        """
+        self.client.get(reverse('generate_reports'), {'pickup_point_id': self.point_1.pk})
+        self.client.get(reverse('generate_reports'), {'pickup_point_id': self.point_2.pk})
+        self.client.get(reverse('generate_reports'), {'agent_id': self.agent.pk})
+        self.schedule_1.pickup_point = self.point_2
+        self.schedule_1.save()
+
+        point_reports = WorkScheduleReport.objects.filter(pickup_point__isnull=False)
+        self.assertEqual(
+            set(point_reports.filter(is_valid=False).values_list('pickup_point_id', 'employee_id')),
+            {(self.point_1.pk, self.employee.pk), (self.point_1.pk, self.colleague.pk),
+             (self.point_2.pk, self.colleague.pk)}
+        )
+        self.assertTrue(all(WorkScheduleReport.objects.filter(pickup_point=None).values_list('is_valid', flat=True)))
+
+        response = self.client.get(reverse('generate_reports'), {'pickup_point_id': self.point_2.pk})
+        hours = {report.employee_id: report.total_hours for report in response.context['reports']}
+        self.assertEqual(hours[self.employee.pk], Decimal('12.75'))
+        self.assertEqual(hours[self.colleague.pk], Decimal('13.75'))
+
+    def test_concurrently_saved_reports_are_replaced(self):
+        """
+        Проверяет, что отчеты, сохраненные параллельным запросом между удалением и вставкой
+        (нарушение уникального ограничения), заменяются повторной попыткой, а не дают ошибку 500.
+        """
+        bulk_create = WorkScheduleReportQuerySet.bulk_create
+        start_period, today = get_report_period()
+
+        def racing_bulk_create(queryset, objs, *args, **kwargs):
+            if racing_bulk_create.raced:
+                return bulk_create(queryset, objs, *args, **kwargs)
+            racing_bulk_create.raced = True
+            bulk_create(queryset, [WorkScheduleReport(
+                employee=self.employee, report_date=today, period_start=start_period, period_end=today,
+                total_hours=0, approved_shifts=0,
+            )])
+            return bulk_create(queryset, objs, *args, **kwargs)
+
+        racing_bulk_create.raced = False
+        with patch.object(WorkScheduleReportQuerySet, 'bulk_create', autospec=True, side_effect=racing_bulk_create):
+            response = self.client.get(reverse('generate_reports'), {'agent_id': self.agent.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(racing_bulk_create.raced)
+        self.assertEqual(WorkScheduleReport.objects.count(), 3)
+        self.assertEqual(WorkScheduleReport.objects.get(employee=self.employee).total_hours, Decimal('12.75'))
+
+    def test_bulk_approval_invalidates_reports(self):
+        """
+        Проверяет, что массовое утверждение графика сбрасывает отчеты сотрудников.
+        """
+        self.client.get(reverse('generate_reports'), {'agent_id': self.agent.pk})
+        self.schedule_1.approve_schedule()
+        self.assertEqual(
+            set(WorkScheduleReport.objects.filter(is_valid=False).values_list('employee_id', flat=True)),
+            {self.employee.pk, self.colleague.pk}
+        )
+        self.client.get(reverse('generate_reports'), {'agent_id': self.agent.pk})
+        self.assertEqual(
+            WorkScheduleReport.objects.get(employee=self.employee).total_hours, Decimal('21.75')
+        )
+
+
+    def test_reports_job_builds_hours_sheet(self):
+        """
+        Проверяет фоновое задание отчетов по агенту: отчеты и сводная ведомость часов в файле результата.
+        """
+        with tempfile.TemporaryDirectory() as directory, override_settings(MEDIA_ROOT=directory):
+            job = enqueue('reports.work_schedule_reports', {'agent_id': self.agent.pk})
+            self.assertEqual(run_job(claim_next_job('test').pk), 'succeeded')
+            job.refresh_from_db()
+            with job.result_file.open('rb') as file:
+                rows = list(csv.reader(file.read().decode('utf-8-sig').splitlines()))
+        self.assertEqual(job.result, {'reports': 3, 'total_hours': '26.50', 'approved_shifts': 4})
+        self.assertEqual([row[1] for row in rows[1:]], ['Doe John', 'Poe Jim', 'Roe Jane'])
+        self.assertEqual(rows[1][4], '12.75')
+
+
+class PayrollCalculationTest(TestCase):
+    """
+    Тесты для векторного расчета отработанного времени за учетный период.
+    """
+
+    def setUp(self):
+        """
+        Устанавливает начальные данные для тестов.
+        Создает агента с двумя пунктами выдачи, сотрудников, учетный период и смены.
+        """
+        self.agent = Agent.objects.create(name="Test Agent", email="agent@example.com", phone_number="1234567890")
+        other_agent = Agent.objects.create(name="Other Agent", email="other@example.com", phone_number="0987654321")
+        point_1 = PickupPoint.objects.create(name="Pickup Point 1", address="123 Test St", agent=self.agent)
+        point_2 = PickupPoint.objects.create(name="Pickup Point 2", address="456 Test Ave", agent=self.agent)
+        self.employee = Employee.objects.create(
+            first_name="John", last_name="Doe", email="john@example.com",
+            date_of_hire=date(2024, 1, 1), position="Operator", agent=self.agent
+        )
+        self.idle = Employee.objects.create(
+            first_name="Jim", last_name="Poe", email="jim@example.com",
+            date_of_hire=date(2024, 1, 1), position="Operator", agent=self.agent
+        )
+        outsider = Employee.objects.create(
+            first_name="Olga", last_name="Other", email="olga@example.com",
+            date_of_hire=date(2024, 1, 1), position="Operator", agent=other_agent
+        )
+        self.period = AccountingPeriod.objects.create(
+            agent=self.agent, start_date=date(2024, 8, 1), end_date=date(2024, 8, 31)
+        )
+        schedule_1 = WorkSchedule.objects.create(
+            employee=self.employee, pickup_point=point_1, start_date=date(2024, 8, 1), end_date=date(2024, 8, 31)
+        )
+        schedule_2 = WorkSchedule.objects.create(
+            employee=self.employee, pickup_point=point_2, start_date=date(2024, 8, 1), end_date=date(2024, 8, 31)
+        )
+        # 1 августа: 6 ч в пункте 1 и 4,5 ч в пункте 2 - 2,5 ч сверхурочно
+        self.create_shift(schedule_1, self.employee, date(2024, 8, 1), time(8), time(14), True)
+        self.create_shift(schedule_2, self.employee, date(2024, 8, 1), time(15), time(19, 30), True)
+        # 31 августа: 8 ч, сверхурочных нет; неутвержденная и вне периода смены не учитываются
+        self.create_shift(schedule_1, self.employee, date(2024, 8, 31), time(9), time(17), True)
+        self.create_shift(schedule_1, self.employee, date(2024, 8, 15), time(9), time(17), False)
+        self.create_shift(schedule_1, self.employee, date(2024, 9, 1), time(9), time(17), True)
+        self.create_shift(schedule_1, outsider, date(2024, 8, 1), time(9), time(17), True)
+
+    def create_shift(self, schedule, employee, shift_date, start_time, end_time, is_approved):
+        """
+        Создает смену.
+        """
+        return WorkShift.objects.create(
+            schedule=schedule, employee=employee, date=shift_date,
+            start_time=start_time, end_time=end_time, is_approved=is_approved
+        )
+
+    def test_calculate_payroll(self):
+        """
+        Проверяет часы по дням, сверхурочные и итоги по сотрудникам агента.
+        """
+        with self.assertNumQueries(2):
+            payroll = calculate_payroll(self.period)
+        self.assertEqual(list(payroll.employee_ids), [self.employee.pk, self.idle.pk])
+        self.assertEqual(payroll.hours.shape, (2, 31))
+        self.assertEqual(payroll.hours[0, 0], 10.5)
+        self.assertEqual(payroll.overtime_hours[0, 0], 2.5)
+        self.assertEqual(payroll.hours[0, 30], 8)
+        self.assertEqual(payroll.get_employee_totals(), {
+            self.employee.pk: {'total_hours': 18.5, 'overtime_hours': 2.5, 'worked_days': 2},
+            self.idle.pk: {'total_hours': 0.0, 'overtime_hours': 0.0, 'worked_days': 0},
+        })
+
+    def test_payroll_report_view(self):
+        """
+        Проверяет представление расчетной ведомости за учетный период.
+        """
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('payroll_report', args=[self.period.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(employee.pk, totals['total_hours'], totals['overtime_hours']) for employee, totals in response.context['sheet']],
+            [(self.employee.pk, 18.5, 2.5), (self.idle.pk, 0.0, 0.0)]
+        )
+        self.assertEqual(self.client.get(reverse('payroll_report', args=[self.period.pk + 100])).status_code, 404)
+
+    def test_payroll_job_builds_payroll_sheet(self):
+        """
+        Проверяет фоновое задание расчета за учетный период: итоги и расчетная ведомость
+        с часами, сверхурочными и отработанными днями по каждому сотруднику агента.
+        """
+        with tempfile.TemporaryDirectory() as directory, override_settings(MEDIA_ROOT=directory):
+            job = enqueue('reports.payroll', {'accounting_period_id': str(self.period.pk)})
+            self.assertEqual(job.params, {'accounting_period_id': self.period.pk})
+            self.assertEqual(run_job(claim_next_job('test').pk), 'succeeded')
+            job.refresh_from_db()
+            with job.result_file.open('rb') as file:
+                rows = list(csv.reader(file.read().decode('utf-8-sig').splitlines()))
+        self.assertEqual(job.result, {'employees': 2, 'total_hours': 18.5, 'overtime_hours': 2.5})
+        self.assertEqual(rows[1:], [
+            [str(self.employee.pk), self.employee.get_full_name(), '18.5', '2.5', '2'],
+            [str(self.idle.pk), self.idle.get_full_name(), '0.0', '0.0', '0'],
+        ])
+        with self.assertRaises(JobError):
+            enqueue('reports.payroll', {})
+
+    def test_calculate_payroll_with_custom_norm(self):
+        """
+        Проверяет расчет сверхурочных при другой дневной норме.
+        """
+        payroll = calculate_payroll(self.period, daily_norm_hours=6)
+        self.assertEqual(payroll.get_employee_totals()[self.employee.pk]['overtime_hours'], 6.5)
+
+
+class ExportTest(TestCase):
+    """
+    Тесты для потоковой выгрузки смен, графиков и отчетов в CSV.
+    """
+
+    def setUp(self):
+        """
+        Устанавливает начальные данные для тестов.
+        Создает двух агентов с пунктами выдачи, сотрудниками, графиками и сменами.
+        """
+        self.agent = Agent.objects.create(name="Test Agent", email="agent@example.com", phone_number="1234567890")
+        other_agent = Agent.objects.create(name="Other Agent", email="other@example.com", phone_number="0987654321")
+        self.point = PickupPoint.objects.create(name="Pickup Point 1", address="123 Test St", agent=self.agent)
+        other_point = PickupPoint.objects.create(name="Pickup Point 2", address="456 Test Ave", agent=other_agent)
+        self.employee = Employee.objects.create(
+            first_name="Иван", last_name="Петров", email="ivan@example.com",
+            date_of_hire=date(2024, 1, 1), position="Operator", agent=self.agent
+        )
+        outsider = Employee.objects.create(
+            first_name="Olga", last_name="Other", email="olga@example.com",
+            date_of_hire=date(2024, 1, 1), position="Operator", agent=other_agent
+        )
+        self.period = AccountingPeriod.objects.create(
+            agent=self.agent, start_date=date(2024, 8, 1), end_date=date(2024, 8, 31)
+        )
+        self.schedule = WorkSchedule.objects.create(
+            employee=self.employee, pickup_point=self.point, start_date=date(2024, 8, 1), end_date=date(2024, 8, 31)
+        )
+        other_schedule = WorkSchedule.objects.create(
+            employee=outsider, pickup_point=other_point, start_date=date(2024, 8, 1), end_date=date(2024, 8, 31)
+        )
+        for day in (1, 2, 3):
+            WorkShift.objects.create(
+                schedule=self.schedule, employee=self.employee, date=date(2024, 8, day),
+                start_time=time(9), end_time=time(18)
+            )
+        WorkShift.objects.create(
+            schedule=self.schedule, employee=self.employee, date=date(2024, 9, 1),
+            start_time=time(9), end_time=time(18)
+        )
+        WorkShift.objects.create(
+            schedule=other_schedule, employee=outsider, date=date(2024, 8, 1),
+            start_time=time(9), end_time=time(18)
+        )
+
+    def read_csv(self, response):
+        """
+        Собирает потоковый ответ и разбирает его как CSV.
+        """
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        return list(csv.reader(content.splitlines()))
+
+    def test_export_shifts_by_accounting_period(self):
+        """
+        Проверяет выгрузку смен агента за учетный период.
+        """
+        response = self.client.get(reverse('export_shifts'), {'accounting_period_id': self.period.pk})
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        rows = self.read_csv(response)
+        self.assertEqual(rows[0][:3], ['ID', 'Дата', 'Начало'])
+        self.assertEqual([row[1] for row in rows[1:]], ['2024-08-01', '2024-08-02', '2024-08-03'])
+        self.assertEqual(rows[1][6:8], ['Петров', 'Иван'])
+
+    def test_export_schedules_by_pickup_point(self):
+        """
+        Проверяет выгрузку графиков пункта выдачи.
+        """
+        rows = self.read_csv(self.client.get(reverse('export_schedules'), {'pickup_point_id': self.point.pk}))
+        self.assertEqual([row[0] for row in rows[1:]], [str(self.schedule.pk)])
+
+    def test_export_reports_by_agent(self):
+        """
+        Проверяет выгрузку отчетов сотрудников агента.
+        """
+        WorkScheduleReport.objects.create(
+            employee=self.employee, report_date=date(2024, 8, 31), period_start=date(2024, 8, 1),
+            period_end=date(2024, 8, 31), total_hours=Decimal('27.00'), approved_shifts=3
+        )
+        rows = self.read_csv(self.client.get(reverse('export_reports'), {'agent_id': self.agent.pk}))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][9], '27.00')
+
+    def test_export_invalid_filter(self):
+        """
+        Проверяет, что неверный формат фильтра возвращает ошибку 400.
+        """
+        response = self.client.get(reverse('export_shifts'), {'date_from': '01.08.2024'})
+        self.assertEqual(response.status_code, 400)
+
+    async def test_export_streams_asynchronously_over_asgi(self):
+        """
+        Проверяет, что под ASGI выгрузка отдается асинхронным итератором, а не собирается в память.
+        """
+        response = await self.async_client.get(reverse('export_shifts'), {'accounting_period_id': self.period.pk})
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content]).decode('utf-8-sig')
+        rows = list(csv.reader(content.splitlines()))
+        self.assertEqual([row[1] for row in rows[1:]], ['2024-08-01', '2024-08-02', '2024-08-03'])
+
+    def test_export_job_matches_view(self):
+        """
+        Проверяет, что фоновое задание выгрузки сохраняет в файл те же строки, что и представление.
+        """
+        with tempfile.TemporaryDirectory() as directory, override_settings(MEDIA_ROOT=directory):
+            job = enqueue('reports.export', {'export': 'shifts', 'filters': {'accounting_period_id': self.period.pk}})
+            self.assertEqual(run_job(claim_next_job('test').pk), 'succeeded')
+            job.refresh_from_db()
+            with job.result_file.open('rb') as file:
+                rows = list(csv.reader(file.read().decode('utf-8-sig').splitlines()))
+        response = self.client.get(reverse('export_shifts'), {'accounting_period_id': self.period.pk})
+        self.assertEqual(rows, self.read_csv(response))
+        self.assertEqual(job.result, {'rows': 3})
+        self.assertTrue(job.result_file.name.startswith(f'jobs/{job.pk}/'))
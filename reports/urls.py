@@ -5,4 +5,9 @@ from . import views
 
 urlpatterns = [
     path('generate_report/<int:employee_id>/', views.generate_work_schedule_report, name='generate_report'),
+    path('generate_reports/', views.generate_work_schedule_reports, name='generate_reports'),
+    path('payroll/<int:accounting_period_id>/', views.payroll_report, name='payroll_report'),
+    path('export/shifts/', views.export_work_shifts, name='export_shifts'),
+    path('export/schedules/', views.export_work_schedules, name='export_schedules'),
+    path('export/reports/', views.export_work_schedule_reports, name='export_reports'),
 ]
\ No newline at end of file
@@ -1,31 +1,242 @@
 # reports/views.py
 
-from django.shortcuts import render
-from documents.models import WorkShift
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.http import HttpResponseBadRequest
+from django.shortcuts import render, get_object_or_404
+from core.models import MAX_ID
+from registers.models import DailyWorkHours
 from .models import WorkScheduleReport
-from reference_books.models import Employee
+from .payroll import get_payroll_sheet
+from .aggregates import aggregate_approved_hours, aggregate_approved_hours_by_employee, minutes_to_hours
+from .exports import (
+    get_export_filters, get_work_schedule_reports_export, get_work_schedules_export, get_work_shifts_export,
+    stream_csv,
+)
+from reference_books.models import AccountingPeriod, Agent, Employee, PickupPoint
 from django.utils import timezone
 from datetime import timedelta
 
-def generate_work_schedule_report(request, employee_id):
+REPORT_PERIOD_DAYS = 30  # отчет за последние 30 дней
+REPORT_SAVE_ATTEMPTS = 3  # попыток сохранения отчетов при конфликте с параллельным запросом
+
+
+def get_report_period():
     """
-    Представление для генерации отчета по графику работы.
+    Возвращает период отчета: последние REPORT_PERIOD_DAYS дней, включая сегодняшний.
 
-    Генерирует отчет по отработанным часам и утвержденным сменам для сотрудника.
+    Возвращает:
+        tuple: (дата начала, дата окончания).
     """
-    employee = Employee.objects.get(id=employee_id)
     today = timezone.now().date()
-    start_period = today - timedelta(days=30)  # отчет за последние 30 дней
-    shifts = WorkShift.objects.filter(employee=employee, date__range=(start_period, today), is_approved=True)
+    return today - timedelta(days=REPORT_PERIOD_DAYS), today
 
-    total_hours = sum((shift.end_time.hour - shift.start_time.hour) for shift in shifts)
-    approved_shifts_count = shifts.count()
 
-    report = WorkScheduleReport.objects.create(
+def build_work_schedule_report(employee, start_period, end_period):
+    """
+    Считает и сохраняет отчет сотрудника за период вместо устаревшего.
+
+    Часы и количество смен считаются базой данных одним агрегирующим запросом
+    с точностью до минут по дневному регистру DailyWorkHours.
+
+    Возвращает:
+        WorkScheduleReport: Актуальный отчет.
+    """
+    daily_hours = DailyWorkHours.objects.filter(employee=employee, date__range=(start_period, end_period))
+    totals = aggregate_approved_hours(daily_hours)
+    report, _ = WorkScheduleReport.objects.update_or_create(
         employee=employee,
-        report_date=today,
-        total_hours=total_hours,
-        approved_shifts=approved_shifts_count
+        pickup_point=None,
+        period_start=start_period,
+        period_end=end_period,
+        defaults={
+            'report_date': end_period,
+            'total_hours': minutes_to_hours(totals['total_minutes']),
+            'approved_shifts': totals['shift_count'],
+            'is_valid': True,
+        }
     )
+    return report
+
+
+async def generate_work_schedule_report(request, employee_id):
+    """
+    Асинхронное представление для генерации отчета по графику работы.
+
+    Генерирует отчет по отработанным часам и утвержденным сменам для сотрудника.
+    Если актуальный отчет за период уже есть, он читается асинхронным ORM и отдается без пересчета;
+    иначе отчет пересчитывается (build_work_schedule_report) в потоке базы данных.
+    """
+    employee = await Employee.objects.aget(id=employee_id)
+    start_period, today = get_report_period()
+    report = await WorkScheduleReport.objects.filter(
+        employee=employee, pickup_point=None, period_start=start_period, period_end=today, is_valid=True
+    ).afirst()
+
+    if report is None:
+        report = await sync_to_async(build_work_schedule_report)(employee, start_period, today)
+    report.employee = employee
 
     return render(request, 'reports/work_schedule_report.html', {'report': report})
+
+
+def build_work_schedule_reports(agent=None, pickup_point=None):
+    """
+    Формирует отчеты за последние REPORT_PERIOD_DAYS дней по всем сотрудникам агента или пункта выдачи.
+
+    Для агента отчеты строятся по всем его сотрудникам, для пункта выдачи - по сотрудникам,
+    закрепленным за пунктом или работавшим в нем (учитываются только смены этого пункта).
+    Актуальные отчеты переиспользуются, а для остальных часы считаются одним сгруппированным
+    запросом по дневному регистру DailyWorkHours, и отчеты сохраняются одним bulk_create.
+    Если параллельный запрос успел сохранить отчеты за тот же период (IntegrityError по
+    уникальному ограничению), сохранение повторяется до REPORT_SAVE_ATTEMPTS раз.
+
+    Аргументы:
+        agent (Agent): Агент (если не указан пункт выдачи).
+        pickup_point (PickupPoint): Пункт выдачи.
+
+    Возвращает:
+        list: Отчеты в порядке фамилий и имен сотрудников (с загруженным сотрудником).
+    """
+    start_period, today = get_report_period()
+    daily_hours = DailyWorkHours.objects.filter(date__range=(start_period, today))
+
+    if pickup_point is None:
+        daily_hours = daily_hours.filter(employee__agent=agent)
+        employees = Employee.objects.filter(agent=agent)
+    else:
+        daily_hours = daily_hours.filter(pickup_point=pickup_point)
+        employees = Employee.objects.filter(
+            Q(default_pickup_point=pickup_point) | Q(id__in=daily_hours.values('employee_id'))
+        )
+
+    employees = list(employees.order_by('last_name', 'first_name'))
+    period_reports = WorkScheduleReport.objects.filter(
+        pickup_point=pickup_point, period_start=start_period, period_end=today
+    )
+    reports = {
+        report.employee_id: report
+        for report in period_reports.filter(employee__in=employees, is_valid=True)
+    }
+
+    stale_ids = [employee.id for employee in employees if employee.id not in reports]
+    if stale_ids:
+        totals = aggregate_approved_hours_by_employee(daily_hours.filter(employee_id__in=stale_ids))
+        empty = {'total_minutes': 0, 'shift_count': 0}
+        for attempt in range(REPORT_SAVE_ATTEMPTS):
+            try:
+                with transaction.atomic():
+                    period_reports.filter(employee_id__in=stale_ids).delete()
+                    created = WorkScheduleReport.objects.bulk_create([
+                        WorkScheduleReport(
+                            employee_id=employee_id,
+                            pickup_point=pickup_point,
+                            report_date=today,
+                            period_start=start_period,
+                            period_end=today,
+                            total_hours=minutes_to_hours(totals.get(employee_id, empty)['total_minutes']),
+                            approved_shifts=totals.get(employee_id, empty)['shift_count']
+                        )
+                        for employee_id in stale_ids
+                    ])
+                break
+            except IntegrityError:
+                # Параллельный запрос сохранил отчеты за тот же период между удалением и вставкой:
+                # его отчеты удаляются и заменяются при повторной попытке
+                if attempt == REPORT_SAVE_ATTEMPTS - 1:
+                    raise
+        reports.update((report.employee_id, report) for report in created)
+
+    for employee in employees:
+        reports[employee.id].employee = employee
+    return [reports[employee.id] for employee in employees]
+
+
+def parse_request_id(params, name):
+    """
+    Возвращает параметр запроса name как ID объекта.
+
+    Исключения:
+        ValueError: Если параметр не является положительным целым числом в пределах MAX_ID.
+    """
+    try:
+        value = int(params[name])
+    except ValueError:
+        raise ValueError(f'Параметр {name} должен быть целым числом')
+    if not 0 < value <= MAX_ID:
+        raise ValueError(f'Параметр {name} вне допустимого диапазона')
+    return value
+
+
+def generate_work_schedule_reports(request):
+    """
+    Представление для пакетной генерации отчетов по всем сотрудникам агента или пункта выдачи
+    (см. build_work_schedule_reports). Для больших агентов отчеты лучше формировать фоновым
+    заданием reports.work_schedule_reports (см. reports.jobs).
+
+    Ожидает GET-параметр agent_id или pickup_point_id (целое число); неверный ID - ответ 400.
+    """
+    try:
+        if request.GET.get('agent_id'):
+            model, filter_name, owner_id = Agent, 'agent', parse_request_id(request.GET, 'agent_id')
+        elif request.GET.get('pickup_point_id'):
+            model, filter_name, owner_id = PickupPoint, 'pickup_point', parse_request_id(request.GET, 'pickup_point_id')
+        else:
+            return HttpResponseBadRequest('Укажите agent_id или pickup_point_id')
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    owner = get_object_or_404(model, id=owner_id)
+    reports = build_work_schedule_reports(**{filter_name: owner})
+    return render(request, 'reports/work_schedule_reports.html', {'owner': owner, 'reports': reports})
+
+
+def payroll_report(request, accounting_period_id):
+    """
+    Представление расчетной ведомости за учетный период: отработанные и сверхурочные часы
+    и отработанные дни по каждому сотруднику агента (см. reports.payroll.get_payroll_sheet).
+    Для больших агентов ведомость лучше формировать фоновым заданием reports.payroll (см. reports.jobs).
+    """
+    period = get_object_or_404(AccountingPeriod.objects.select_related('agent'), id=accounting_period_id)
+    return render(request, 'reports/payroll.html', {'period': period, 'sheet': get_payroll_sheet(period)})
+
+
+async def export_work_shifts(request):
+    """
+    Асинхронное представление для потоковой выгрузки смен в CSV.
+
+    Фильтры (GET): agent_id, pickup_point_id, accounting_period_id, date_from, date_to.
+    """
+    try:
+        filters = await sync_to_async(get_export_filters)(request.GET)
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    return stream_csv(request, *get_work_shifts_export(filters))
+
+
+async def export_work_schedules(request):
+    """
+    Асинхронное представление для потоковой выгрузки графиков работы в CSV.
+
+    Фильтры (GET): agent_id, pickup_point_id, accounting_period_id, date_from, date_to.
+    По датам выбираются графики, пересекающиеся с интервалом.
+    """
+    try:
+        filters = await sync_to_async(get_export_filters)(request.GET)
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    return stream_csv(request, *get_work_schedules_export(filters))
+
+
+async def export_work_schedule_reports(request):
+    """
+    Асинхронное представление для потоковой выгрузки отчетов по графикам работы в CSV.
+
+    Фильтры (GET): agent_id, pickup_point_id, accounting_period_id, date_from, date_to.
+    По датам выбираются отчеты, период которых пересекается с интервалом.
+    """
+    try:
+        filters = await sync_to_async(get_export_filters)(request.GET)
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    return stream_csv(request, *get_work_schedule_reports_export(filters))